@@ -1,117 +1,109 @@
 # src/cli/main.py
 from typing import List
-from src.patch.llm.runner import suggest_sc002_ops
-from src.patch.dryrun import dry_run_apply
+from src.patch.llm.runner import SC002Lane, suggest_sc002_ops
+from src.patch.llm.suggest_sc003 import PreviewStage
+from src.patch.dryrun import dry_run_batch, strip_location
 from src.config import get_config
 from src.llm.logger import log_llm
 import json
 import os
 import pathlib
 import typer
-from src.inspect.storageclass import inspect_storageclass
 from src.explain.loader import load_explanation
-from src.inspect.requests_limits import inspect_requests_limits
-from src.inspect.ingress import inspect_ingress_class
 from src.report.writer import format_violations
-from src.patch.validator import path_exists_in_yaml
 from src.patch.generator import build_patches
+from src.manifest.document import ManifestStore, ParsedManifest, parse_manifest
+from src.manifest.loader import backend as yaml_backend
+from src.scan.worker import RELEVANT_KINDS, run_inspections, scan_files
 
 
 app = typer.Typer(help="k3s→AKS Copilot (MVP)")
 
 
-def _run_inspections(text: str) -> list:
-    """Run all inspections on a single file's content."""
-    violations = inspect_storageclass(text)
-    violations += inspect_requests_limits(text)
-    violations += inspect_ingress_class(text)
-    return violations
+def _run_inspections(manifest: ParsedManifest) -> list:
+    """Run all registered rules on a single parsed file (see src/inspect/registry.py)."""
+    return run_inspections(manifest)
+
+
+REPORT_HEADER = ["# Migration Copilot Report", "", "**Violations Found**"]
+
+
+def _live_info():
+    from src.patch.generator import sc001_patch_ops
+    try:
+        _, chosen_sc, live_set = sc001_patch_ops("", use_live=True)
+        return (chosen_sc, live_set)
+    except Exception:
+        return None
 
 
 def _generate_report(all_violations: list, live: bool):
     """Generate the report.md file."""
     report_path = pathlib.Path("report.md")
-    lines = ["# Migration Copilot Report", "", "**Violations Found**"]
+    lines = list(REPORT_HEADER)
     if not all_violations:
         lines += ["", "- None"]
     else:
-        live_info = None
-        if live:
-            from src.patch.generator import sc001_patch_ops
-            try:
-                _, chosen_sc, live_set = sc001_patch_ops("", use_live=True)
-                live_info = (chosen_sc, live_set)
-            except Exception:
-                pass
+        live_info = _live_info() if live else None
         lines += format_violations(all_violations, live_info)
     report_path.write_text("\n".join(lines), encoding="utf-8")
 
 
-def _generate_patch(all_violations: list, extra_ops: list, file_texts: dict, live: bool):
-    """Generate the patch.json file."""
-    sc001_ops = build_patches([v for v in all_violations if v.get(
-        "patch") == "auto" and v["id"] == "SC001"], use_live=live)
+def _auto_sc001(violations: list) -> list:
+    return [v for v in violations if v.get("patch") == "auto" and v["id"] == "SC001"]
 
-    combined_ops = sc001_ops + extra_ops
 
-    # Per-file dry-run
-    final_ops = []
-    for op in combined_ops:
-        filepath_str = op.get("file")
-        if not filepath_str:
-            continue
-
-        text = file_texts.get(filepath_str)
-        if not text:
-            continue
-
-        # The file path is needed for the dry run, but not in the final patch.json
-        op_copy = op.copy()
-        del op_copy["file"]
+def _generate_patch(all_violations: list, extra_ops: list, manifests: ManifestStore, live: bool):
+    """Generate the patch.json file."""
+    sc001_ops = build_patches(_auto_sc001(all_violations), use_live=live)
 
-        ok, reason = dry_run_apply(text, [op_copy])
-        log_llm({"file": filepath_str, "rule": "ALL", "stage": "dryrun",
-                 "ok": ok, "reason": ("" if ok else reason)})
-        if ok:
-            final_ops.append(op_copy)
+    final_ops = _dry_run_ops(sc001_ops + extra_ops, manifests)
 
     pathlib.Path("patch.json").write_text(
         json.dumps(final_ops, indent=2), encoding="utf-8")
 
 
-def _process_files(files: List[pathlib.Path], live: bool):
-    """Shared logic for file processing, validation, and patch generation."""
-    all_violations = []
-    extra_ops = []
+def _dry_run_ops(combined_ops: list, manifests: ManifestStore) -> list:
+    """Dry-run ops per file; returns the surviving ops without 'file' or location keys."""
+    return [op for op in _dry_run_keep(combined_ops, manifests) if op is not None]
 
-    typer.echo(f"Found {len(files)} files:")
-    for f in files:
-        typer.echo(f"- {f.name}")
 
-    file_texts = {}
-    for f in files:
-        try:
-            text = f.read_text(encoding="utf-8")
-            file_texts[str(f)] = text
-        except Exception as e:
-            typer.echo(f"[WARN] skip {f}: {e}", err=True)
-            continue
+def _dry_run_keep(combined_ops: list, manifests: ManifestStore) -> list:
+    """Per input op: its patch.json form if it survives the dry run, else None.
 
-        vs = _run_inspections(text)
-
-        for v in vs:
-            v = dict(v)
-            v["file"] = str(f)
-            v["patch"] = "manual"
-            if v.get("id") == "SC001" and path_exists_in_yaml(text, v["path"]):
-                v["patch"] = "auto"
-            all_violations.append(v)
-
-    # LLM lane for SC002
-    for v in [vv for vv in all_violations if vv["id"] == "SC002"]:
+    Ops are grouped by file and each file's group is checked in one batch over
+    its already parsed manifest (src/patch/dryrun.py). Ops see the effect of
+    earlier ops in the group, and an op overlapping an earlier op's path on
+    the same document is rejected as a conflict.
+    """
+    by_file = {}
+    for pos, op in enumerate(combined_ops):
+        if op.get("file"):
+            by_file.setdefault(op["file"], []).append(pos)
+    kept = [None] * len(combined_ops)
+    for filepath_str, positions in by_file.items():
+        manifest = manifests.get(filepath_str)
+        if not manifest or not manifest.text:
+            continue
+        # The file path is needed for the dry run, but not in the final patch.json
+        batch = [{k: v for k, v in combined_ops[p].items() if k != "file"}
+                 for p in positions]
+        results = dry_run_batch(manifest, batch, conflicts=True)
+        for pos, op_copy, (ok, reason) in zip(positions, batch, results):
+            log_llm({"file": filepath_str, "rule": "ALL", "stage": "dryrun",
+                     "ok": ok, "reason": ("" if ok else reason)})
+            if ok:
+                kept[pos] = strip_location(op_copy)
+    return kept
+
+
+def _sc002_submit(violations: list, manifests: ManifestStore, lane) -> list:
+    """Queue an SC002 suggestion per violation on `lane` (SC002Lane); returns (violation, future) pairs in order."""
+    pending = []
+    for v in [vv for vv in violations if vv["id"] == "SC002"]:
         filepath_str = v["file"]
-        text = file_texts.get(filepath_str)
-        if not text:
+        manifest = manifests.get(filepath_str)
+        if not manifest or not manifest.text:
             continue
 
         container_path = v["path"].rsplit("/resources", 1)[0]
@@ -121,12 +113,23 @@ def _process_files(files: List[pathlib.Path], live: bool):
             idx = 0
         kind = "Deployment" if "/spec/template/spec/" in container_path else "Pod"
 
-        ops, reason = suggest_sc002_ops(kind, idx, text, filepath_str)
+        pending.append((v, lane.submit(kind, idx, manifest, filepath_str)))
+    return pending
+
+
+def _sc002_collect(pending: list, extra_ops: list):
+    """Attach suggested ops (tagged with their file) in submission order and set patch mode."""
+    for v, fut in pending:
+        filepath_str = v["file"]
+        ops, reason = fut.result()
         if ops:
             v["patch"] = "auto"
-            # Add file info to each op for per-file dry-run
+            # Add file info (and source location) to each op for per-file dry-run
             for op in ops:
                 op["file"] = filepath_str
+                for k in ("doc_index", "line"):
+                    if k in v:
+                        op[k] = v[k]
             extra_ops.extend(ops)
             log_llm({"file": filepath_str, "rule": "SC002",
                      "stage": "llm", "ok": True, "ops": len(ops)})
@@ -135,31 +138,277 @@ def _process_files(files: List[pathlib.Path], live: bool):
             log_llm({"file": filepath_str, "rule": "SC002",
                      "stage": "llm", "ok": False, "reason": reason})
 
-    _generate_report(all_violations, live)
-
-    _generate_patch(all_violations, extra_ops, file_texts, live)
 
-    # FR3 resources.md generation (non-fatal)
-    resources_note = ""
+def _sc002_lane(violations: list, manifests: ManifestStore, extra_ops: list, lane=None):
+    """LLM lane for SC002: attach suggested ops (tagged with their file) and set patch mode.
+    Requests run concurrently (llm_concurrency); results keep violation order. Pass the
+    run's `lane` (SC002Lane) so prompts are deduplicated across files; without one, a
+    lane is made for these violations only."""
+    if lane is not None:
+        _sc002_collect(_sc002_submit(violations, manifests, lane), extra_ops)
+        return
+    with SC002Lane() as lane:
+        _sc002_collect(_sc002_submit(violations, manifests, lane), extra_ops)
+
+
+def _file_ops(violations: list, manifests: ManifestStore, live: bool, lane=None):
+    """Dry-run-checked (sc001_ops, sc002_ops) for one file's violations.
+    The SC002 lane (the run's `lane`, if given) runs first because it sets each
+    violation's patch mode."""
+    sc002_ops = []
+    _sc002_lane(violations, manifests, sc002_ops, lane)
+    sc001_ops = build_patches(_auto_sc001(violations), use_live=live)
+    # one batch per file, like _generate_patch, so conflicts resolve the same way
+    kept = _dry_run_keep(sc001_ops + sc002_ops, manifests)
+    n = len(sc001_ops)
+    return [op for op in kept[:n] if op], [op for op in kept[n:] if op]
+
+
+def _iter_records(files: List[pathlib.Path], jobs: int, use_cache: bool, timings=None):
+    """Scan records in input order (serial, --jobs pool and/or scan cache); unreadable files are reported and skipped.
+    Per-rule timings carried by freshly scanned records are merged into `timings`."""
+    cache = None
+    if use_cache:
+        from src.scan.cache import open_scan_cache
+        from src.scan.worker import RULESET_VERSION
+        try:
+            cache = open_scan_cache(get_config(), RULESET_VERSION)
+        except Exception as e:
+            typer.echo(f"[WARN] scan cache disabled: {e}", err=True)
+    try:
+        for record, manifest in scan_files(files, jobs, cache=cache):
+            if record["error"]:
+                typer.echo(
+                    f"[WARN] skip {record['file']}: {record['error']}", err=True)
+                continue
+            if timings is not None:
+                timings.merge(record.get("rule_timings") or {})
+            yield record, manifest
+    finally:
+        if cache is not None:
+            cache.close()
+    if cache is not None:
+        typer.echo(f"Scan cache: {cache.summary()}")
+
+
+def _refresh_llm(refresh: bool):
+    """--refresh-llm: skip the LLM response cache for this run (see src/llm/cache.py)."""
+    if refresh:
+        from src.llm.cache import set_refresh
+        set_refresh(True)
+
+
+def _write_resources(violations: list, file_signals: dict) -> str:
+    """FR3 resources.md generation (non-fatal); returns the summary suffix."""
     try:
         from src.resources.generator import infer_resources, write_resources_md
-        resources, signals = infer_resources(all_violations, file_texts)
+        resources, signals = infer_resources(
+            violations, {}, file_signals=file_signals)
         write_resources_md(resources, signals, path="resources.md")
-        resources_note = f" + resources.md ({len(resources)} rows)"
+        return f" + resources.md ({len(resources)} rows)"
     except Exception as e:  # pragma: no cover
         typer.echo(f"[WARN] resources.md generation failed: {e}", err=True)
+        return ""
+
+
+def _process_files(files: List[pathlib.Path], live: bool, jobs: int = 1, use_cache: bool = False, stream: bool = False,
+                   rule_timings: bool = False):
+    """Shared logic for file processing, validation, and patch generation.
+
+    Read+parse+inspect runs in `jobs` worker processes when jobs > 1; records come
+    back in input order, so report.md and patch.json match a serial run. The LLM
+    lane and all output writing stay in this process. With use_cache, per-file
+    scan records are reused from the on-disk scan cache for unchanged files.
+    With stream, see _process_stream (same outputs, bounded memory).
+    With rule_timings, time spent in each rule is printed, slowest first.
+    """
+    typer.echo(f"Found {len(files)} files:")
+    for f in files:
+        typer.echo(f"- {f.name}")
+    typer.echo(f"YAML loader: {yaml_backend()}")
+
+    from src.inspect.registry import RuleTimings
+    timings = RuleTimings()
+    run = _process_stream if stream else _process_batch
+    count, resources_note, skipped = run(files, live, jobs, use_cache, timings)
+
+    typer.echo(f"Kind pre-filter: {skipped} bytes skipped")
+    if rule_timings:
+        typer.echo("Rule timings (cache hits excluded):")
+        for line in timings.lines() or ["- no documents inspected"]:
+            typer.echo(line)
+    typer.echo(
+        f"Wrote report.md and patch.json{resources_note} ({count} violations across {len(files)} files).")
+
+
+def _process_batch(files: List[pathlib.Path], live: bool, jobs: int, use_cache: bool, timings=None):
+    all_violations = []
+    extra_ops = []
+    manifests = ManifestStore()
+    file_signals = {}
+    skipped = 0
+    pending = []
+    with SC002Lane() as lane, PreviewStage() as previews:
+        for record, manifest in _iter_records(files, jobs, use_cache, timings):
+            if manifest is not None:
+                manifests.put(record["file"], manifest)
+            file_signals[record["file"]] = record["signals"]
+            skipped += record.get("skipped_bytes", 0)
+            all_violations.extend(record["violations"])
+            # queue each record's LLM requests as it arrives; workers keep parsing later files
+            pending += _sc002_submit(record["violations"], manifests, lane)
+            previews.submit(record["violations"])
+        _sc002_collect(pending, extra_ops)
+        previews.attach()
+
+    _generate_report(all_violations, live)
+
+    _generate_patch(all_violations, extra_ops, manifests, live)
+
+    return len(all_violations), _write_resources(all_violations, file_signals), skipped
+
 
+def _process_stream(files: List[pathlib.Path], live: bool, jobs: int, use_cache: bool, timings=None):
+    """Generator-driven pipeline: each file is read, inspected, patched and released in turn.
+
+    report.md and patch.json are written incrementally and are byte-identical to
+    batch mode. SC002 ops are spooled to a temp file because batch mode lists them
+    after every SC001 op. Only aggregated resource signals stay in memory, so peak
+    memory follows the largest single file rather than the whole tree.
+    """
+    import tempfile
+    from src.report.stream import JsonArrayStream, LineStream
+    from src.report.writer import format_violation
+
+    report = LineStream(open("report.md", "w", encoding="utf-8"))
+    patch = JsonArrayStream(open("patch.json", "w", encoding="utf-8"))
+    spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+    previews = PreviewStage()
+    lane = SC002Lane()  # one per run: prompt dedup and the thread pool span all files
+    report.write_lines(REPORT_HEADER)
+    live_info, live_probed = None, False
+    signals = {"ingress": set(), "pvc": set(), "images": set(), "secrets": set()}
+    total, saw_sc001, skipped = 0, False, 0
+    try:
+        for record, manifest in _iter_records(files, jobs, use_cache, timings):
+            manifests = ManifestStore()  # this file only; dropped after the iteration
+            if manifest is not None:
+                manifests.put(record["file"], manifest)
+            vs = record["violations"]
+            skipped += record.get("skipped_bytes", 0)
+            for k, v in record["signals"].items():
+                signals[k].update(v)
+            previews.submit(vs)  # runs while the SC002 lane does
+            sc001_ops, sc002_ops = _file_ops(vs, manifests, live, lane)
+            for op in sc001_ops:
+                patch.write(op)
+            for op in sc002_ops:
+                spool.write(json.dumps(op) + "\n")
+            if vs and live and not live_probed:
+                live_info, live_probed = _live_info(), True
+            previews.attach()
+            for v in vs:
+                report.write_lines(format_violation(v, live_info))
+            total += len(vs)
+            saw_sc001 = saw_sc001 or any(v["id"] == "SC001" for v in vs)
+        spool.seek(0)
+        for line in spool:
+            patch.write(json.loads(line))
+        report.write_lines(
+            ["", f"Total violations: {total}"] if total else ["", "- None"])
+    finally:
+        lane.close()
+        previews.close()
+        spool.close()
+        report.close()
+        patch.close()
+
+    # infer_resources only needs to know whether any SC001 was seen
+    return total, _write_resources([{"id": "SC001"}] if saw_sc001 else [], {"*": signals}), skipped
+
+
+def _process_stdin(live: bool):
+    """fix - : inspect a YAML stream from stdin one document at a time.
+
+    report.md is written incrementally. patch.json holds one envelope per
+    originating template (helm '# Source:' comment, else <stdin>):
+    {"file": template, "ops": [...]}. Ops are plain RFC 6902 like fix-tree's:
+    a stream position is not a document index in the template file, so the
+    location keys are not written (`apply` would route ops by them).
+    """
+    import sys
+    from src.report.stream import LineStream
+    from src.report.writer import format_violation
+    from src.scan.worker import STDIN, scan_stream
+
+    report = LineStream(open("report.md", "w", encoding="utf-8"))
+    report.write_lines(REPORT_HEADER)
+    previews = PreviewStage()
+    lane = SC002Lane()
+    by_template: dict = {}
+    live_info, live_probed = None, False
+    signals = {"ingress": set(), "pvc": set(), "images": set(), "secrets": set()}
+    docs, total, saw_sc001, skipped = 0, 0, False, 0
+    try:
+        for record, manifest in scan_stream(iter(sys.stdin.readline, "")):
+            docs += 1
+            skipped += record["skipped_bytes"]
+            if record["error"]:
+                typer.echo(
+                    f"[WARN] skip document {record['doc_index']}: {record['error']}", err=True)
+                continue
+            for k, v in record["signals"].items():
+                signals[k].update(v)
+            vs = record["violations"]
+            if not vs:
+                continue
+            manifests = ManifestStore()
+            manifests.put(STDIN, manifest)
+            previews.submit(vs)
+            sc001_ops, sc002_ops = _file_ops(vs, manifests, live, lane)
+            template = record["source"] or STDIN
+            by_template.setdefault(template, []).extend(sc001_ops + sc002_ops)
+            if live and not live_probed:
+                live_info, live_probed = _live_info(), True
+            previews.attach()
+            for v in vs:
+                # ops are resolved; from here on doc_index is the stream position
+                v["doc_index"] = record["doc_index"]
+                if record["source"]:
+                    v["source"] = record["source"]
+                report.write_lines(format_violation(v, live_info))
+            total += len(vs)
+            saw_sc001 = saw_sc001 or any(v["id"] == "SC001" for v in vs)
+        report.write_lines(
+            ["", f"Total violations: {total}"] if total else ["", "- None"])
+    finally:
+        lane.close()
+        previews.close()
+        report.close()
+    envelopes = [{"file": t, "ops": ops} for t, ops in by_template.items()]
+    pathlib.Path("patch.json").write_text(
+        json.dumps(envelopes, indent=2), encoding="utf-8")
+    resources_note = _write_resources(
+        [{"id": "SC001"}] if saw_sc001 else [], {"*": signals})
+    typer.echo(f"Read {docs} documents from stdin")
+    typer.echo(f"Kind pre-filter: {skipped} bytes skipped")
     typer.echo(
-        f"Wrote report.md and patch.json{resources_note} ({len(all_violations)} violations across {len(files)} files).")
+        f"Wrote report.md and patch.json{resources_note} ({total} violations across {docs} documents, "
+        f"{len(envelopes)} templates with patches).")
 
 
 @app.command()
-def fix(filepath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses")):
+def fix(filepath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses"),
+        refresh_llm: bool = typer.Option(False, "--refresh-llm", help="Bypass cached LLM responses (fresh ones are still cached)")):
     """
-    Read a single YAML file and:
+    Read a single YAML file (or '-' for a multi-document stream on stdin) and:
     - write report.md (violations summary)
     - write patch.json (JSON Patch ops to fix violations)
     """
+    _refresh_llm(refresh_llm)
+    if str(filepath) == "-":
+        _process_stdin(live)
+        return
     if not filepath.exists():
         typer.echo(f"[ERR] file not found: {filepath}", err=True)
         raise typer.Exit(code=1)
@@ -167,11 +416,16 @@ def fix(filepath: pathlib.Path, live: bool = typer.Option(False, "--live", help=
 
 
 @app.command("fix-folder")
-def fix_folder(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses")):
+def fix_folder(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses"),
+               jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes for read+parse+inspect (0 = one per CPU)"),
+               stream: bool = typer.Option(False, "--stream", help="Bounded-memory mode: process and write one file at a time"),
+               rule_timings: bool = typer.Option(False, "--rule-timings", help="Print time spent in each rule"),
+               refresh_llm: bool = typer.Option(False, "--refresh-llm", help="Bypass cached LLM responses (fresh ones are still cached)")):
     """
     Read all *.yml|*.yaml under <dir> (non-recursive), aggregate violations,
     write report.md + patch.json.
     """
+    _refresh_llm(refresh_llm)
     if not dirpath.exists() or not dirpath.is_dir():
         typer.echo(f"[ERR] not a directory: {dirpath}", err=True)
         raise typer.Exit(code=1)
@@ -180,15 +434,22 @@ def fix_folder(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live",
     if not files:
         typer.echo("[WARN] no *.yml|*.yaml found")
         raise typer.Exit(code=0)
-    _process_files(files, live)
+    _process_files(files, live, jobs, stream=stream, rule_timings=rule_timings)
 
 
 @app.command("fix-tree")
-def fix_tree(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses")):
+def fix_tree(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses"),
+             jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes for read+parse+inspect (0 = one per CPU)"),
+             no_cache: bool = typer.Option(False, "--no-cache", help="Ignore and do not update the on-disk scan cache"),
+             stream: bool = typer.Option(False, "--stream", help="Bounded-memory mode: process and write one file at a time"),
+             rule_timings: bool = typer.Option(False, "--rule-timings", help="Print time spent in each rule"),
+             refresh_llm: bool = typer.Option(False, "--refresh-llm", help="Bypass cached LLM responses (fresh ones are still cached)")):
     """
     Recursively read all *.yml|*.yaml under <dir>, aggregate violations,
     then write a single report.md + patch.json in CWD.
+    Unchanged files are served from the scan cache (see scan_cache_dir) unless --no-cache.
     """
+    _refresh_llm(refresh_llm)
     if not dirpath.exists() or not dirpath.is_dir():
         typer.echo(f"[ERR] not a directory: {dirpath}", err=True)
         raise typer.Exit(code=1)
@@ -198,20 +459,43 @@ def fix_tree(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live", h
     if not files:
         typer.echo("[WARN] no *.yml|*.yaml found")
         raise typer.Exit(code=0)
-    _process_files(files, live)
+    _process_files(files, live, jobs, use_cache=not no_cache,
+                   stream=stream, rule_timings=rule_timings)
+
+
+@app.command("watch")
+def watch(dirpath: pathlib.Path, live: bool = typer.Option(False, "--live", help="Probe cluster for StorageClasses"),
+          interval: float = typer.Option(0.2, "--interval", help="Seconds between polls for changed files"),
+          jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes for the initial scan (0 = one per CPU)"),
+          poll: bool = typer.Option(False, "--poll", help="Poll mtime/size instead of using inotify"),
+          refresh_llm: bool = typer.Option(False, "--refresh-llm", help="Bypass cached LLM responses (fresh ones are still cached)")):
+    """
+    Scan <dir> like fix-tree, then keep report.md + patch.json up to date:
+    only files that changed since the last pass are re-inspected.
+    """
+    _refresh_llm(refresh_llm)
+    if not dirpath.exists() or not dirpath.is_dir():
+        typer.echo(f"[ERR] not a directory: {dirpath}", err=True)
+        raise typer.Exit(code=1)
+    from src.cli.watch import run_watch
+    run_watch(dirpath, live, interval, jobs, poll, typer.echo)
 
 
 @app.command()
 def validate(filepath: pathlib.Path):
     """
-    Read a single YAML file and print SC00* violations (no files written).
+    Read a single YAML file (or '-' for stdin) and print SC00* violations (no files written).
     """
+    if str(filepath) == "-":
+        _validate_stdin()
+        return
     if not filepath.exists():
         typer.echo(f"[ERR] file not found: {filepath}", err=True)
         raise typer.Exit(code=1)
 
     text = filepath.read_text(encoding="utf-8")
-    violations = _run_inspections(text)
+    violations = _run_inspections(parse_manifest(
+        text, path=str(filepath), kinds=RELEVANT_KINDS))
 
     if not violations:
         typer.echo("No violations.")
@@ -219,28 +503,89 @@ def validate(filepath: pathlib.Path):
 
     typer.echo("# Violations")
     for v in violations:
+        where = f"{filepath}:{v['line']}" if v.get("line") else str(filepath)
         typer.echo(
-            f"- {v['id']} {v['resource']} {v['path']} found={v['found']} → expected={v['expected']}")
+            f"- {where} {v['id']} {v['resource']} {v['path']} found={v['found']} → expected={v['expected']}")
+
+
+def _validate_stdin():
+    """validate - : print violations per document as the stream is read."""
+    import sys
+    from src.scan.worker import STDIN, scan_stream
+
+    found = 0
+    for record, _ in scan_stream(iter(sys.stdin.readline, "")):
+        if record["error"]:
+            typer.echo(
+                f"[WARN] skip document {record['doc_index']}: {record['error']}", err=True)
+            continue
+        for v in record["violations"]:
+            if not found:
+                typer.echo("# Violations")
+            found += 1
+            where = f"{STDIN}:{v['line']}" if v.get("line") else STDIN
+            if record["source"]:
+                where += f" ({record['source']})"
+            typer.echo(
+                f"- {where} {v['id']} {v['resource']} {v['path']} found={v['found']} → expected={v['expected']}")
+    if not found:
+        typer.echo("No violations.")
+
+
+def _check_format(fmt: str) -> None:
+    from src.report.stream import FORMATS
+    if fmt not in FORMATS:
+        typer.echo(f"[ERR] --format must be one of: {', '.join(FORMATS)}", err=True)
+        raise typer.Exit(code=1)
 
 
 @app.command("apply")
-def apply_patch(patchfile: pathlib.Path = pathlib.Path("patch.json")):
+def apply_patch(patchfile: pathlib.Path = typer.Argument(pathlib.Path("patch.json")),
+                root: pathlib.Path = typer.Option(None, "--root", help="Directory envelope 'file' paths are relative to"),
+                target: pathlib.Path = typer.Option(None, "--target", help="Manifest to apply a flat op list (fix output) to"),
+                jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes, one file per task (0 = one per CPU)"),
+                dry_run: bool = typer.Option(False, "--dry-run", help="Report what would change without writing")):
     """
-    Stub: read patch.json and print planned changes (no real apply).
+    Apply patch.json to the manifest files, keeping comments and formatting.
+    Envelopes ({file, ops}) are grouped by file; each file is patched all-or-nothing
+    and written atomically (temp file + rename).
     """
+    import itertools
+    from src.patch.apply import apply_files, group_envelopes
+    from src.report.stream import iter_json_records
+
     if not patchfile.exists():
         typer.echo(f"[ERR] patch not found: {patchfile}", err=True)
         raise typer.Exit(code=1)
 
-    ops = json.loads(patchfile.read_text(encoding="utf-8"))
-    if not ops:
+    records = iter_json_records(patchfile)  # JSON array or NDJSON
+    first = next(records, None)
+    if first is None:
         typer.echo("No ops to apply.")
         raise typer.Exit(code=0)
 
-    typer.echo("# Apply Plan (stub)")
-    for i, op in enumerate(ops, 1):
-        typer.echo(f"{i}. {op['op']} {op['path']} -> {op.get('value')}")
-    typer.echo("Apply: simulated OK")
+    if isinstance(first, dict) and "ops" in first:
+        groups = group_envelopes(itertools.chain([first], records), str(root) if root else None)
+    elif target is not None:
+        groups = [(str(target), [first, *records])]
+    else:
+        typer.echo("[ERR] patch has no file envelopes; pass --target <manifest>", err=True)
+        raise typer.Exit(code=1)
+
+    results = apply_files(groups, jobs, write=not dry_run)
+    typer.echo("# Apply Plan (dry run)" if dry_run else "# Apply")
+    for r in results:
+        if r.ok:
+            typer.echo(f"- {r.file}: {r.ops} ops, +{r.added} -{r.removed} lines")
+        else:
+            typer.echo(f"- {r.file}: FAILED {r.error}")
+    done = [r for r in results if r.ok]
+    failed = len(results) - len(done)
+    verb = "Would apply" if dry_run else "Applied"
+    typer.echo(f"{verb} {sum(r.ops for r in done)} ops to {len(done)} files "
+               f"(+{sum(r.added for r in done)} -{sum(r.removed for r in done)} lines); {failed} failed.")
+    if failed:
+        raise typer.Exit(code=2)
 
 
 @app.command("health")
@@ -254,15 +599,18 @@ def health(namespace: str = "default"):
 
 
 @app.command("llm-suggest")
-def llm_suggest(filepath: pathlib.Path, kind: str = "Deployment", index: int = 0):
+def llm_suggest(filepath: pathlib.Path, kind: str = "Deployment", index: int = 0,
+                refresh_llm: bool = typer.Option(False, "--refresh-llm", help="Bypass cached LLM responses (fresh ones are still cached)")):
     """
     Stub: produce SC002 JSON Patch for one container and validate it.
     """
+    _refresh_llm(refresh_llm)
     if not filepath.exists():
         typer.echo(f"[ERR] file not found: {filepath}", err=True)
         raise typer.Exit(code=1)
-    text = filepath.read_text(encoding="utf-8")
-    ops, reason = suggest_sc002_ops(kind, index, text, str(filepath))
+    manifest = parse_manifest(filepath.read_text(
+        encoding="utf-8"), path=str(filepath))
+    ops, reason = suggest_sc002_ops(kind, index, manifest, str(filepath))
     if ops:
         typer.echo("🤖 LLM suggested patch:")
         typer.echo(json.dumps(ops, indent=2))
@@ -276,13 +624,17 @@ def show_config():
     from pprint import pprint
     cfg = get_config()
     typer.echo(_json.dumps(cfg, indent=2, ensure_ascii=False))
+    typer.echo(f"YAML loader: {yaml_backend()}")
 
 
 @app.command("patch")
-def patch_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("patch.json"), dry_run: bool = False, strict: bool = False):
+def patch_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("patch.json"), dry_run: bool = False, strict: bool = False,
+                  fmt: str = typer.Option("json", "--format", help="Output format: json (array) or ndjson (one envelope per line)"),
+                  jobs: int = typer.Option(1, "--jobs", "-j", help="Worker processes for --dry-run, one file per task (0 = one per CPU)")):
     """
     Generate patch.json from a violations JSON file. Optionally run a dry-run validation against manifests.
     """
+    _check_format(fmt)
     if not violations.exists():
         typer.echo(f"[ERR] violations file not found: {violations}", err=True)
         raise typer.Exit(code=1)
@@ -303,14 +655,14 @@ def patch_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("pa
         typer.echo(f"[ERR] failed to build patches: {e}", err=True)
         raise typer.Exit(code=1)
 
-    write_patch_json(patches, str(out))
+    write_patch_json(patches, str(out), fmt)
     typer.echo(f"Wrote patch file: {out}")
 
     if dry_run:
         # allow caller to override manifests root via MANIFESTS_ROOT env var
         manifests_root = os.environ.get("MANIFESTS_ROOT", "")
         results = dry_run_validate(
-            patches, manifests_root=manifests_root, strict=strict)
+            patches, manifests_root=manifests_root, strict=strict, jobs=jobs)
         ok = all(r["success"] for r in results)
         for r in results:
             typer.echo(
@@ -323,8 +675,12 @@ def patch_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("pa
 
 # --- Story 2.2 additions ---
 @app.command("suggest")
-def suggest_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("suggestions.json"), rule: str = "SC003"):
+def suggest_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("suggestions.json"), rule: str = "SC003",
+                    fmt: str = typer.Option("json", "--format", help="Output format: json (wrapped) or ndjson (one suggestion per line)"),
+                    refresh_llm: bool = typer.Option(False, "--refresh-llm", help="Bypass cached LLM responses (fresh ones are still cached)")):
     """Generate patch suggestions (rule-filtered) using LLM + heuristic fallback (SC003) and write schema-wrapped file."""
+    _refresh_llm(refresh_llm)
+    _check_format(fmt)
     if not violations.exists():
         typer.echo(f"[ERR] violations file not found: {violations}", err=True)
         raise typer.Exit(code=1)
@@ -358,7 +714,7 @@ def suggest_command(violations: pathlib.Path, out: pathlib.Path = pathlib.Path("
         })
         log_llm({"event": "suggest.store", "index": idx,
                 "rule": r.get("rule_id"), "valid": ok})
-    write_suggestions(suggestions, str(out), rule=rule)
+    write_suggestions(suggestions, str(out), rule=rule, fmt=fmt)
     typer.echo(
         f"Wrote {out} ({len(suggestions)} suggestions, {sum(1 for s in suggestions if s['valid'])} valid)")
 
@@ -372,18 +728,23 @@ def merge_suggestions_cmd(
     patch: pathlib.Path = typer.Option(pathlib.Path(
         "patch.json"), "--patch", help="Existing patch.json to merge into (created if missing)"),
     verbose: bool = typer.Option(
-        False, "--verbose", help="Print per-conflict detailed information")
+        False, "--verbose", help="Print per-conflict detailed information"),
+    fmt: str = typer.Option(
+        None, "--format", help="Output format for --patch: json or ndjson (default: keep the existing file's format)")
 ):
     """Merge approved suggestions into patch.json (creates or updates)."""
     import json as _json
-    from src.patch.suggestions import load_suggestions, filter_approved, merge_suggestions_into_patch
+    from src.patch.generator import write_patch_json
+    from src.patch.suggestions import iter_suggestions, filter_approved, merge_suggestions_into_patch
+    from src.report.stream import is_ndjson, iter_json_records
     from src.llm.logger import log_llm
 
+    if fmt is not None:
+        _check_format(fmt)
     if not suggestions_file.exists():
         typer.echo(
             f"[ERR] suggestions file not found: {suggestions_file}", err=True)
         raise typer.Exit(code=1)
-    suggestions = load_suggestions(str(suggestions_file))
     # parse approvals
     approved_indices = None
     if approve:
@@ -394,11 +755,21 @@ def merge_suggestions_cmd(
             typer.echo(
                 "[ERR] invalid --approve list (must be integers)", err=True)
             raise typer.Exit(code=1)
-    approved = filter_approved(suggestions, approved_indices)
+    # one lazy pass over the suggestions (NDJSON files are never loaded whole)
+    valid_indices = set()
+
+    def tracked():
+        for s in iter_suggestions(str(suggestions_file)):
+            if s.get("valid"):
+                valid_indices.add(s.get("index"))
+            yield s
+    try:
+        approved = filter_approved(tracked(), approved_indices)
+    except ValueError:
+        approved = []  # unreadable suggestions file: nothing to merge
     invalid_requested = 0
     if approved_indices is not None:
         # indices user asked for that are either missing or invalid
-        valid_indices = {s.get("index") for s in suggestions if s.get("valid")}
         for idx in approved_indices:
             if idx not in valid_indices:
                 invalid_requested += 1
@@ -406,7 +777,11 @@ def merge_suggestions_cmd(
     existing = []
     if patch.exists():
         try:
-            existing = _json.loads(patch.read_text(encoding="utf-8"))
+            if is_ndjson(patch):
+                fmt = fmt or "ndjson"
+                existing = list(iter_json_records(patch))
+            else:
+                existing = _json.loads(patch.read_text(encoding="utf-8"))
             if not isinstance(existing, list):
                 existing = []
         except Exception:
@@ -421,7 +796,7 @@ def merge_suggestions_cmd(
     merged_patch, summary = merge_suggestions_into_patch(
         existing_patch=existing, suggestions=approved, collect_details=verbose)
 
-    patch.write_text(_json.dumps(merged_patch, indent=2), encoding="utf-8")
+    write_patch_json(merged_patch, str(patch), fmt or "json")
     typer.echo(
         f"Merged suggestions: merged={summary['merged']} duplicates={summary['skipped_duplicates']} conflicts={summary['conflicts']} invalid_requested={invalid_requested}")
     if verbose and summary.get("conflicts"):
@@ -0,0 +1,315 @@
+# src/cli/watch.py
+"""Watch mode: keep per-file scan results in memory and re-inspect only changed files.
+
+On Linux, changes come from inotify (via ctypes, no extra dependency). Other
+platforms, or --poll, compare (mtime_ns, size, inode) of every *.yml|*.yaml
+under the root on each poll.
+For each file the session keeps its violations, rendered report text and
+pre-serialized patch ops. Resource signals are aggregated as counters. A
+refresh re-scans only the changed files, then rewrites report.md, patch.json and
+resources.md by joining the cached pieces in fix-tree order. The outputs are
+byte-identical to a fix-tree run over the same tree.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import os
+import pathlib
+import select
+import struct
+import sys
+import time
+
+Stamp = Tuple[int, int, int]  # (mtime_ns, size, inode)
+SUFFIXES = (".yml", ".yaml")
+
+
+def _stamp(path: str) -> Optional[Stamp]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def snapshot(root: pathlib.Path) -> Dict[str, Stamp]:
+    """path -> stamp for every *.yml|*.yaml under root (recursive)."""
+    out: Dict[str, Stamp] = {}
+    stack = [str(pathlib.Path(root))]  # normalized, so paths match rglob's
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):  # like rglob
+                        stack.append(entry.path)
+                    elif entry.name.endswith(SUFFIXES):
+                        st = entry.stat()
+                        out[entry.path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+                except OSError:
+                    continue
+    return out
+
+
+def tree_order(paths: Iterable[str]) -> List[str]:
+    """fix-tree's file order (sorted pathlib paths)."""
+    return [str(p) for p in sorted(pathlib.Path(p) for p in paths)]
+
+
+class Inotify:
+    """Minimal inotify watcher over a directory tree (Linux only)."""
+
+    _IN_MODIFY, _IN_ATTRIB, _IN_CLOSE_WRITE = 0x2, 0x4, 0x8
+    _IN_MOVED_FROM, _IN_MOVED_TO, _IN_CREATE, _IN_DELETE = 0x40, 0x80, 0x100, 0x200
+    _IN_DELETE_SELF, _IN_MOVE_SELF = 0x400, 0x800
+    _IN_Q_OVERFLOW, _IN_IGNORED, _IN_ISDIR = 0x4000, 0x8000, 0x40000000
+    _MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+             | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: pathlib.Path):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = str(pathlib.Path(root))
+        self._dirs: Dict[int, str] = {}
+        self.watch_tree()
+
+    @staticmethod
+    def available() -> bool:
+        return sys.platform.startswith("linux")
+
+    def watch_tree(self) -> None:
+        """(Re)add watches for every directory under root; re-adding is a no-op."""
+        stack = [self.root]
+        while stack:
+            d = stack.pop()
+            wd = self._add_watch(self.fd, os.fsencode(d), self._MASK)
+            if wd >= 0:
+                self._dirs[wd] = d
+            try:
+                with os.scandir(d) as it:
+                    stack.extend(e.path for e in it if e.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def read(self, timeout: float) -> Tuple[Set[str], bool]:
+        """Wait up to `timeout` seconds; returns (touched file paths, needs_full_rescan).
+        Directory-level events and queue overflows ask for a full rescan."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+        touched: Set[str] = set()
+        rescan = False
+        pos = 0
+        while pos + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, pos)
+            name = data[pos + self._EVENT.size:pos + self._EVENT.size + length].rstrip(b"\0")
+            pos += self._EVENT.size + length
+            if mask & self._IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            if mask & (self._IN_Q_OVERFLOW | self._IN_ISDIR | self._IN_DELETE_SELF | self._IN_MOVE_SELF):
+                rescan = True
+                continue
+            d = self._dirs.get(wd)
+            if d is not None and name.endswith((b".yml", b".yaml")):
+                touched.add(os.path.join(d, os.fsdecode(name)))
+        return touched, rescan
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+@dataclass
+class FileState:
+    violations: List[dict] = field(default_factory=list)
+    signals: Dict[str, list] = field(default_factory=dict)
+    report_text: str = ""  # this file's report lines, "\n"-joined
+    sc001_json: List[str] = field(default_factory=list)  # json_array_item() per op
+    sc002_json: List[str] = field(default_factory=list)
+
+
+class WatchSession:
+    def __init__(self, root: pathlib.Path, live: bool = False):
+        self.root = pathlib.Path(root)
+        self.live = live
+        self.live_info = None
+        self._live_probed = False
+        self.stamps: Dict[str, Stamp] = {}
+        self.files: Dict[str, FileState] = {}
+        self.order: List[str] = []
+        self.signals: Dict[str, Counter] = {}
+        self.sc001_files = 0  # files with at least one SC001 (resources.md)
+        self.previews: Dict[tuple, object] = {}  # SC003 preview memo, kept across refreshes
+
+    def _state_for(self, record: dict, manifest, previews=None, lane=None) -> FileState:
+        from src.cli.main import _file_ops, _live_info
+        from src.manifest.document import ManifestStore
+        from src.report.stream import json_array_item
+        from src.report.writer import format_violation
+
+        manifests = ManifestStore()
+        if manifest is not None:
+            manifests.put(record["file"], manifest)
+        vs = record["violations"]
+        if previews is not None:
+            previews.submit(vs)
+        sc001_ops, sc002_ops = _file_ops(vs, manifests, self.live, lane)
+        if vs and self.live and not self._live_probed:
+            self.live_info, self._live_probed = _live_info(), True
+        if previews is not None:
+            previews.attach()
+        lines = [ln for v in vs for ln in format_violation(v, self.live_info)]
+        return FileState(vs, record["signals"], "\n".join(lines),
+                         [json_array_item(op) for op in sc001_ops],
+                         [json_array_item(op) for op in sc002_ops])
+
+    def _drop(self, path: str) -> None:
+        old = self.files.pop(path, None)
+        if old is None:
+            return
+        for k, tokens in old.signals.items():
+            self.signals[k].subtract(tokens)
+        if any(v["id"] == "SC001" for v in old.violations):
+            self.sc001_files -= 1
+
+    def _keep(self, path: str, state: FileState) -> None:
+        self.files[path] = state
+        for k, tokens in state.signals.items():
+            self.signals.setdefault(k, Counter()).update(tokens)
+        if any(v["id"] == "SC001" for v in state.violations):
+            self.sc001_files += 1
+
+    def _rescan(self, paths: List[str], jobs: int = 1) -> None:
+        from src.patch.llm.runner import SC002Lane
+        from src.patch.llm.suggest_sc003 import PreviewStage
+        from src.scan.worker import scan_files
+        # one preview budget and one SC002 lane per refresh
+        with SC002Lane() as lane, PreviewStage(memo=self.previews) as previews:
+            for record, manifest in scan_files([pathlib.Path(p) for p in paths], jobs):
+                self._drop(record["file"])
+                if not record["error"]:
+                    self._keep(record["file"], self._state_for(record, manifest, previews, lane))
+
+    def refresh(self, jobs: int = 1, touched: Optional[Iterable[str]] = None) -> Tuple[List[str], List[str]]:
+        """Re-inspect changed files and rewrite outputs if anything changed.
+        Without `touched`, the whole tree is polled; with it (inotify), only those
+        paths are re-stat'ed. Returns (changed, removed) paths."""
+        if touched is None:
+            current = snapshot(self.root)
+            changed = [p for p, st in current.items() if self.stamps.get(p) != st]
+            removed = [p for p in self.stamps if p not in current]
+            self.stamps = current
+        else:
+            changed, removed = [], []
+            for p in touched:
+                st = _stamp(p)
+                if st is None:
+                    if self.stamps.pop(p, None) is not None:
+                        removed.append(p)
+                elif self.stamps.get(p) != st:
+                    changed.append(p)
+                    self.stamps[p] = st
+        if not changed and not removed:
+            return [], []
+        for p in removed:
+            self._drop(p)
+        known = set(self.order)
+        self._rescan(tree_order(changed), jobs)
+        if removed or any(p not in known for p in changed):
+            self.order = tree_order(self.stamps)
+        self.write_outputs()
+        return changed, removed
+
+    def violation_count(self) -> int:
+        return sum(len(s.violations) for s in self.files.values())
+
+    def write_outputs(self) -> None:
+        from src.cli.main import REPORT_HEADER, _write_resources
+        from src.report.stream import json_array
+
+        states = [self.files[p] for p in self.order if p in self.files]
+        total = sum(len(s.violations) for s in states)
+        parts = ["\n".join(REPORT_HEADER)]
+        if total:
+            parts += [s.report_text for s in states if s.report_text]
+            parts.append(f"\nTotal violations: {total}")
+        else:
+            parts.append("\n- None")
+        ops = [op for s in states for op in s.sc001_json] + \
+            [op for s in states for op in s.sc002_json]
+        _replace("report.md", "\n".join(parts))
+        _replace("patch.json", json_array(ops))
+        # infer_resources only needs to know whether any SC001 was seen
+        signals = {k: [t for t, n in c.items() if n > 0] for k, c in self.signals.items()}
+        _write_resources([{"id": "SC001"}] if self.sc001_files else [], {"*": signals})
+
+
+def _replace(path: str, text: str) -> None:
+    """Write via a temp file + rename so readers never see a half-written output."""
+    tmp = f"{path}.tmp"
+    pathlib.Path(tmp).write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_watch(root: pathlib.Path, live: bool, interval: float, jobs: int, poll: bool, echo) -> None:
+    session = WatchSession(root, live)
+    notifier = None
+    if not poll and Inotify.available():
+        try:
+            notifier = Inotify(root)  # before the initial scan, so no edit is missed
+        except (OSError, AttributeError) as e:
+            echo(f"[WARN] inotify unavailable, polling instead: {e}")
+    t0 = time.perf_counter()
+    changed, _ = session.refresh(jobs)
+    if not changed:
+        session.write_outputs()
+    echo(f"Watching {root} ({'inotify' if notifier else 'polling'}): {len(changed)} files, "
+         f"{session.violation_count()} violations ({(time.perf_counter() - t0) * 1000:.0f} ms). Ctrl+C to stop.")
+    try:
+        while True:
+            if notifier is None:
+                time.sleep(interval)
+                t0 = time.perf_counter()
+                changed, removed = session.refresh(jobs)
+            else:
+                touched, rescan = notifier.read(interval)
+                t0 = time.perf_counter()
+                if rescan:
+                    notifier.watch_tree()
+                    changed, removed = session.refresh(jobs)
+                elif touched:
+                    changed, removed = session.refresh(jobs, touched=touched)
+                else:
+                    continue
+            if changed or removed:
+                echo(f"Updated report.md and patch.json: {len(changed)} changed, {len(removed)} removed, "
+                     f"{session.violation_count()} violations ({(time.perf_counter() - t0) * 1000:.0f} ms)")
+    except KeyboardInterrupt:
+        echo("Stopped watching.")
+    finally:
+        if notifier is not None:
+            notifier.close()
+
+
+__all__ = ["WatchSession", "FileState", "Inotify", "snapshot", "tree_order", "run_watch"]
@@ -8,6 +8,19 @@ _DEFAULT = {
         "cpu_limits": "200m",  "mem_limits": "256Mi"
     },
     "llm": "stub",
+    "scan_cache_dir": ".aks-copilot-cache",
+    "scan_cache_max_mb": 256,
+    "llm_cache": True,
+    "llm_cache_ttl_hours": 168,
+    "llm_cache_max_mb": 64,
+    "ollama_pool_size": 10,
+    "ollama_connect_timeout": 3.0,
+    "llm_concurrency": 4,
+    "llm_breaker_threshold": 3,
+    "llm_breaker_cooldown_seconds": 30,
+    "llm_preview_budget_seconds": 60,
+    "llm_batch_size": 8,
+    "llm_batch_max_chars": 6000,
 }
 
 _cfg = None
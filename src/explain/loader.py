@@ -9,6 +9,7 @@ RULES_DIR = ROOT / "rules"
 INDEX_FILE = RULES_DIR / "index.json"
 
 _retriever = None
+_explanations: Dict[str, Dict[str, str]] = {}  # rule_id -> explanation, per process
 
 
 def _get_retriever():
@@ -32,7 +33,14 @@ def load_explanation(rule_id: str) -> Dict[str, str]:
     """
     Returns { 'why': str, 'source': str } for the given rule_id.
     Tries RAG retrieval first, falls back to static rules.
+    Memoized per rule_id: reports call this once per violation.
     """
+    if rule_id not in _explanations:
+        _explanations[rule_id] = _load_explanation(rule_id)
+    return dict(_explanations[rule_id])
+
+
+def _load_explanation(rule_id: str) -> Dict[str, str]:
     r = _get_retriever()
     if r and rule_id in QUERIES:
         hits = r.search(QUERIES[rule_id], k=1)
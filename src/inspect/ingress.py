@@ -1,21 +1,11 @@
-import yaml
+from src.inspect.registry import Rule
+from src.manifest.document import ManifestSource, ensure_manifest
 
+KINDS = ("Ingress",)  # kinds this inspector reads (kind pre-filter)
 
-def inspect_ingress_class(text: str):
-    """
-    SC003: Ingress must define ingressClassName or AGIC annotation.
-    """
-    try:
-        doc = yaml.safe_load(text)
-    except Exception:
-        return []
-
-    if not isinstance(doc, dict):
-        return []
-
-    if doc.get("kind") != "Ingress":
-        return []
 
+def check_ingress_class(doc):
+    """SC003 for one Ingress document: ingressClassName or AGIC annotation required."""
     metadata = doc.get("metadata", {})
     annos = metadata.get("annotations", {}) or {}
     spec = doc.get("spec", {}) or {}
@@ -34,3 +24,18 @@ def inspect_ingress_class(text: str):
         "expected": "define ingressClassName or AGIC annotations",
         "severity": "error"
     }]
+
+
+RULE = Rule("SC003", KINDS, check_ingress_class)
+
+
+def inspect_ingress_class(text: ManifestSource):
+    """
+    SC003: Ingress must define ingressClassName or AGIC annotation.
+    Accepts raw YAML text or a ParsedManifest; every Ingress in the stream is checked.
+    """
+    out = []
+    for doc in ensure_manifest(text).objects():
+        if doc.get("kind") in KINDS:
+            out += check_ingress_class(doc)
+    return out
@@ -0,0 +1,121 @@
+# src/inspect/registry.py
+"""Kind-indexed rule registry.
+
+Each rule declares the kinds it handles and a per-document check. The engine
+walks every document of a manifest once and only calls the rules registered
+for that document's kind, so per-document cost does not grow with the number
+of rules. Results are grouped per rule and concatenated in registration order
+(all SC001 violations, then SC002, ...), matching the old per-inspector output.
+Every violation is stamped with its document index and, when the manifest has
+a mark index, the source line of its path.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import time
+
+from src.manifest.document import ManifestSource, ensure_manifest
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    kinds: Tuple[str, ...]
+    check: Callable[[dict], List[Dict]]  # one mapping document -> violations
+    version: str = "1"  # bump when the rule's output changes (scan cache key)
+
+
+class RuleTimings:
+    """Accumulated calls / seconds per rule id."""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def add(self, rule_id: str, calls: int, seconds: float) -> None:
+        self.calls[rule_id] = self.calls.get(rule_id, 0) + calls
+        self.seconds[rule_id] = self.seconds.get(rule_id, 0.0) + seconds
+
+    def merge(self, other: Dict[str, List]) -> None:
+        """Merge the {rule_id: [calls, seconds]} form carried by scan records."""
+        for rule_id, (calls, seconds) in other.items():
+            self.add(rule_id, calls, seconds)
+
+    def as_dict(self) -> Dict[str, List]:
+        return {k: [self.calls[k], self.seconds[k]] for k in self.calls}
+
+    def lines(self) -> List[str]:
+        """Slowest rule first."""
+        order = sorted(self.seconds, key=lambda k: (-self.seconds[k], k))
+        return [f"- {k}: {self.seconds[k] * 1000:.2f} ms over {self.calls[k]} docs" for k in order]
+
+
+class RuleRegistry:
+    def __init__(self, rules: Iterable[Rule] = ()):
+        self._rules: List[Rule] = []
+        self._by_kind: Dict[str, List[Tuple[int, Rule]]] = {}
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule: Rule) -> Rule:
+        if any(r.id == rule.id for r in self._rules):
+            raise ValueError(f"rule already registered: {rule.id}")
+        pos = len(self._rules)
+        self._rules.append(rule)
+        for kind in rule.kinds:
+            self._by_kind.setdefault(kind, []).append((pos, rule))
+        return rule
+
+    @property
+    def rules(self) -> List[Rule]:
+        return list(self._rules)
+
+    def kinds(self) -> frozenset:
+        return frozenset(self._by_kind)
+
+    def rules_for(self, kind: str) -> List[Rule]:
+        return [r for _, r in self._by_kind.get(kind, ())]
+
+    def version(self) -> str:
+        """Rule ids and versions, e.g. "SC001@1,SC002@1" (part of the scan cache key)."""
+        return ",".join(f"{r.id}@{r.version}" for r in self._rules)
+
+    def run(self, manifest: ManifestSource, timings: Optional[RuleTimings] = None) -> List[Dict]:
+        """Single pass over the manifest's documents; violations in rule order."""
+        manifest = ensure_manifest(manifest)
+        buckets: List[List[Dict]] = [[] for _ in self._rules]
+        for doc_index, doc in enumerate(manifest.docs):
+            if not isinstance(doc, dict):
+                continue
+            kind = doc.get("kind")
+            if not isinstance(kind, str):
+                continue
+            for pos, rule in self._by_kind.get(kind, ()):
+                t0 = time.perf_counter() if timings is not None else 0.0
+                found = rule.check(doc)
+                if timings is not None:
+                    timings.add(rule.id, 1, time.perf_counter() - t0)
+                for v in found:
+                    v["doc_index"] = doc_index
+                    loc = manifest.locate(doc_index, v.get("path", ""))
+                    if loc is not None:
+                        v["line"] = loc[0]
+                buckets[pos] += found
+        return [v for bucket in buckets for v in bucket]
+
+
+_DEFAULT: Optional[RuleRegistry] = None
+
+
+def default_registry() -> RuleRegistry:
+    """The built-in rules (SC001, SC002, SC003), in report order."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        from src.inspect import ingress, requests_limits, storageclass
+        _DEFAULT = RuleRegistry(
+            [storageclass.RULE, requests_limits.RULE, ingress.RULE])
+    return _DEFAULT
+
+
+__all__ = ["Rule", "RuleRegistry", "RuleTimings", "default_registry"]
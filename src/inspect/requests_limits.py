@@ -1,5 +1,8 @@
 from typing import List, Dict
-import yaml
+from src.inspect.registry import Rule
+from src.manifest.document import ManifestSource, ensure_manifest
+
+KINDS = ("Pod", "Deployment", "StatefulSet")  # kinds this inspector reads (kind pre-filter)
 
 
 def _scan_containers(objs, base_path, kind=None) -> List[Dict]:
@@ -40,29 +43,30 @@ def _scan_containers(objs, base_path, kind=None) -> List[Dict]:
     return out
 
 
-def inspect_requests_limits(manifest_yaml: str) -> List[Dict]:
+def check_requests_limits(doc: Dict) -> List[Dict]:
+    """SC002 for one Pod / Deployment / StatefulSet document."""
+    kind = doc.get("kind")
+    if kind == "Pod":
+        spec = (doc.get("spec") or {})
+        return _scan_containers(spec.get("containers"), "/spec", kind=kind)
+    if kind in ("Deployment", "StatefulSet"):
+        tpl = (((doc.get("spec") or {}).get(
+            "template") or {}).get("spec") or {})
+        base = "/spec/template/spec"
+        return _scan_containers(tpl.get("containers"), base, kind=kind)
+    return []
+
+
+RULE = Rule("SC002", KINDS, check_requests_limits)
+
+
+def inspect_requests_limits(manifest_yaml: ManifestSource) -> List[Dict]:
     """
     Detect containers missing resources.requests or resources.limits.
     Targets: Pod, Deployment, StatefulSet (MVP).
+    Accepts raw YAML text or a ParsedManifest.
     """
     v: List[Dict] = []
-    try:
-        docs = list(yaml.safe_load_all(manifest_yaml))
-    except Exception:
-        return v
-
-    for doc in docs:
-        if not isinstance(doc, dict):
-            continue
-        kind = doc.get("kind")
-        if kind == "Pod":
-            spec = (doc.get("spec") or {})
-            v += _scan_containers(spec.get("containers"), "/spec", kind=kind)
-        elif kind in ("Deployment", "StatefulSet"):
-            tpl = (((doc.get("spec") or {}).get(
-                "template") or {}).get("spec") or {})
-            base = "/spec/template/spec"
-            v += _scan_containers(tpl.get("containers"), base, kind=kind)
-        else:
-            continue
+    for doc in ensure_manifest(manifest_yaml).objects():
+        v += check_requests_limits(doc)
     return v
@@ -1,9 +1,9 @@
 import json
-from typing import Dict, Any, List
-import yaml
+from typing import Dict, Any, List, Optional
 from src.config import get_config
-from src.llm.client import build_client, hash_prompt, LLMTimeout, LLMError
-from src.llm.prompts import EXPLAIN_VIOLATION_TEMPLATE, SUGGEST_IMPROVEMENT_TEMPLATE
+from src.manifest.document import ParsedManifest, load_manifest
+from src.llm.client import build_client, hash_prompt, LLMTimeout, LLMError, DEFAULT_TIMEOUT, DEFAULT_MAX_OUTPUT
+from src.llm.prompts import EXPLAIN_VIOLATION_TEMPLATE, SUGGEST_IMPROVEMENT_TEMPLATE, SUGGEST_BATCH_TEMPLATE
 from src.llm.logger import log_llm
 
 
@@ -16,8 +16,8 @@ def _llm_cfg():
             "enabled": True,
             "provider": raw,
             "model": root.get("llm_model", "mistral:latest"),
-            "timeout_seconds": root.get("llm_timeout_seconds", 8),
-            "max_output_chars": root.get("llm_max_output_chars", 2000),
+            "timeout_seconds": root.get("llm_timeout_seconds", DEFAULT_TIMEOUT),
+            "max_output_chars": root.get("llm_max_output_chars", DEFAULT_MAX_OUTPUT),
         }
     if isinstance(raw, dict):
         # ensure enabled defaults to value or true if provider present
@@ -42,9 +42,9 @@ def augment_explanation(violation: Dict[str, Any]) -> str:
     h = hash_prompt(prompt)
     truncated = False
     try:
-        out = client.generate(prompt)
-        if len(out) > cfg.get("max_output_chars", 2000):
-            out = out[: cfg.get("max_output_chars", 2000)]
+        out = client.generate(prompt, accept=lambda text: bool(text.strip()))
+        if len(out) > cfg.get("max_output_chars", DEFAULT_MAX_OUTPUT):
+            out = out[: cfg.get("max_output_chars", DEFAULT_MAX_OUTPUT)]
             truncated = True
         log_llm({"event": "explain", "rule": violation.get("id"),
                 "hash": h, "success": True, "truncated": truncated})
@@ -59,17 +59,20 @@ def augment_explanation(violation: Dict[str, Any]) -> str:
         return ""
 
 
+_SUGGEST_FIELDS = ("id", "path", "desired", "current", "resource")
+MAX_BATCH_TIMEOUT = 60  # seconds; the per-violation deadline scales with the batch up to this
+
+
 def generate_suggestion(violation: Dict[str, Any]) -> Dict[str, Any]:
     cfg = _llm_cfg()
     client = build_client(cfg)
     if not client:
         return {"type": "patch_suggestion", "ops": []}
-    raw_violation = json.dumps({k: v for k, v in violation.items() if k in (
-        "id", "path", "desired", "current", "resource")})
+    raw_violation = json.dumps({k: v for k, v in violation.items() if k in _SUGGEST_FIELDS})
     prompt = SUGGEST_IMPROVEMENT_TEMPLATE.format(violation_json=raw_violation)
     h = hash_prompt(prompt)
     try:
-        out = client.generate(prompt)
+        out = client.generate(prompt, accept=_is_suggestion)
         data = json.loads(out)
         if not _validate_suggestion(data):
             raise LLMError("invalid suggestion schema")
@@ -82,32 +85,107 @@ def generate_suggestion(violation: Dict[str, Any]) -> Dict[str, Any]:
         return {"type": "patch_suggestion", "ops": []}
 
 
+def _pack_batches(violations: List[Dict[str, Any]], size: int, max_chars: int) -> List[List[int]]:
+    """Greedy packing of violation positions: at most `size` per prompt and
+    roughly `max_chars` of violation JSON (the model's context budget)."""
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    used = 0
+    for i, v in enumerate(violations):
+        n = len(json.dumps({k: x for k, x in v.items() if k in _SUGGEST_FIELDS}))
+        if cur and (len(cur) >= size or used + n > max_chars):
+            batches.append(cur)
+            cur, used = [], 0
+        cur.append(i)
+        used += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def _batch_items(text: str, n: int) -> Optional[Dict[int, Dict[str, Any]]]:
+    """Valid suggestions of a batch answer by violation index (0..n-1); None unless text is a JSON array."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, list):
+        return None
+    items: Dict[int, Dict[str, Any]] = {}
+    for obj in data:
+        idx = obj.get("index") if isinstance(obj, dict) else None
+        if isinstance(idx, int) and 0 <= idx < n and idx not in items:
+            sugg = {k: v for k, v in obj.items() if k != "index"}
+            if _validate_suggestion(sugg):
+                items[idx] = sugg
+    return items
+
+
+def generate_suggestions_batch(violations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One prompt for several violations, asking for a JSON array of suggestion
+    objects keyed by violation index. Each element is checked with
+    _validate_suggestion; missing or invalid items (or all of them, if the
+    answer is not a JSON array) are retried one by one with generate_suggestion.
+    Returns one suggestion per violation, in order.
+    """
+    if len(violations) == 1:
+        return [generate_suggestion(violations[0])]
+    cfg = _llm_cfg()
+    client = build_client(cfg)
+    if not client:
+        return [{"type": "patch_suggestion", "ops": []} for _ in violations]
+    items = [{"index": i, **{k: v for k, v in viol.items() if k in _SUGGEST_FIELDS}}
+             for i, viol in enumerate(violations)]
+    prompt = SUGGEST_BATCH_TEMPLATE.format(violations_json=json.dumps(items))
+    h = hash_prompt(prompt)
+    n = len(violations)
+    by_index: Dict[int, Dict[str, Any]] = {}
+    error = ""
+    try:
+        # the answer grows with the batch: scale the output cap and deadline with it
+        out = client.generate(prompt,
+                              timeout=min(cfg.get("timeout_seconds", DEFAULT_TIMEOUT) * n, MAX_BATCH_TIMEOUT),
+                              max_output=cfg.get("max_output_chars", DEFAULT_MAX_OUTPUT) * n,
+                              accept=lambda text: len(_batch_items(text, n) or ()) == n)
+        answered = _batch_items(out, n)
+        if answered is None:
+            raise LLMError("batch answer is not a JSON array")
+        by_index = answered
+    except Exception as e:  # timeout, parse, shape: every item is retried
+        error = str(e)[:120]
+    retry = [i for i in range(n) if i not in by_index]
+    event = {"event": "suggest.batch", "hash": h, "size": n,
+             "valid": len(by_index), "retried": len(retry)}
+    if error:
+        event["error"] = error
+    log_llm(event)
+    for i in retry:
+        by_index[i] = generate_suggestion(violations[i])
+    return [by_index[i] for i in range(n)]
+
+
 # --- SC003 heuristic (Phase 3) ---
-def heuristic_sc003_ops(violation: Dict[str, Any]) -> List[Dict[str, Any]]:
+def heuristic_sc003_ops(violation: Dict[str, Any], manifest: Optional[ParsedManifest] = None) -> List[Dict[str, Any]]:
     """Produce deterministic fallback ops for an Ingress (SC003) when LLM disabled or empty.
     Heuristics:
       - If /spec/ingressClassName missing -> add with value "web" (placeholder class).
       - If /spec/tls missing AND spec.rules[0].host present -> add minimal tls list with secretName <name>-tls.
+    `manifest` may be passed when the caller already parsed the violation's file.
     Returns list of JSON Patch ops (add only). Safe to call even if file missing; returns empty on failure.
     """
     if (violation.get("rule_id") or violation.get("id")) != "SC003":
         return []
     file_path = violation.get("file")
     name = violation.get("name") or violation.get("resource") or "ingress"
-    if not file_path:
-        return []
-    try:
-        text = open(file_path, "r", encoding="utf-8").read()
-    except Exception:
-        return []
-    try:
-        docs = list(yaml.safe_load_all(text))
-    except Exception:
+    if manifest is None:
+        if not file_path:
+            return []
+        manifest = load_manifest(file_path)
+    if manifest is None or not manifest.ok:
         return []
     target = None
-    for d in docs:
-        if not isinstance(d, dict):
-            continue
+    for d in manifest.objects():
         if d.get("kind") == "Ingress":
             meta = d.get("metadata") or {}
             if not name or meta.get("name") == name:
@@ -135,21 +213,40 @@ def heuristic_sc003_ops(violation: Dict[str, Any]) -> List[Dict[str, Any]]:
     return ops
 
 
-def generate_resource_suggestions(violations: List[Dict[str, Any]], rule_filter: str | None = None) -> List[Dict[str, Any]]:
+def generate_resource_suggestions(violations: List[Dict[str, Any]], rule_filter: str | None = None,
+                                  batch_size: int | None = None) -> List[Dict[str, Any]]:
     """Batch helper: produce raw suggestion dicts (with ops) for violations.
     Applies LLM suggestion first, then heuristic fallback (currently SC003) if no ops.
     rule_filter restricts processing to a single rule id when provided.
+    With the LLM enabled, violations are packed into prompts of up to batch_size
+    (config llm_batch_size, default 8; 1 = one prompt each) and llm_batch_max_chars.
     Returned list items DO NOT include index/validation flags (caller adds those).
     """
+    selected = [v for v in violations
+                if not rule_filter or (v.get("rule_id") or v.get("id")) == rule_filter]
+    suggestions: List[Dict[str, Any]] = []
+    if batch_size is None:
+        batch_size = int(get_config().get("llm_batch_size", 8))
+    try:
+        use_batches = batch_size > 1 and build_client(_llm_cfg()) is not None
+    except ValueError:  # unsupported provider: left to generate_suggestion, as before
+        use_batches = False
+    if use_batches:
+        max_chars = int(get_config().get("llm_batch_max_chars", 6000))
+        for batch in _pack_batches(selected, batch_size, max_chars):
+            suggestions += generate_suggestions_batch([selected[i] for i in batch])
+    else:
+        suggestions = [generate_suggestion(v) for v in selected]
     out: List[Dict[str, Any]] = []
-    for v in violations:
+    manifests: Dict[str, Optional[ParsedManifest]] = {}  # parse each file once
+    for v, sugg in zip(selected, suggestions):
         rid = v.get("rule_id") or v.get("id")
-        if rule_filter and rid != rule_filter:
-            continue
-        sugg = generate_suggestion(v)
         ops = sugg.get("ops", [])
         if not ops and rid == "SC003":  # heuristic fallback
-            ops = heuristic_sc003_ops(v)
+            fp = v.get("file")
+            if fp and fp not in manifests:
+                manifests[fp] = load_manifest(fp)
+            ops = heuristic_sc003_ops(v, manifests.get(fp)) if fp else []
         out.append({
             "rule_id": rid,
             "file": v.get("file"),
@@ -161,6 +258,14 @@ def generate_resource_suggestions(violations: List[Dict[str, Any]], rule_filter:
     return out
 
 
+def _is_suggestion(text: str) -> bool:
+    """True if text is a JSON suggestion object that passes _validate_suggestion."""
+    try:
+        return _validate_suggestion(json.loads(text))
+    except ValueError:
+        return False
+
+
 def _validate_suggestion(obj: Dict[str, Any]) -> bool:
     if not isinstance(obj, dict):
         return False
@@ -0,0 +1,206 @@
+# src/llm/cache.py
+"""Persistent LLM response cache.
+
+Responses are stored in a small SQLite database next to the scan cache, keyed
+by sha256 of the model, hash_prompt(prompt) and the generation options. The
+SC002/SC003 prompts barely change between runs, so a repeat run over the same
+repo makes no LLM calls. Entries expire after a TTL; the database is capped in
+size and least recently used entries are evicted on close, when hit/miss stats
+are logged to logs/llm.jsonl. With refresh (--refresh-llm) lookups are skipped
+but fresh responses are still stored.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional
+import atexit
+import hashlib
+import json
+import pathlib
+import sqlite3
+import threading
+import time
+
+from src.llm.client import hash_prompt
+from src.llm.logger import log_llm
+
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_MB = 64
+
+
+class LLMCache:
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float, refresh: bool = False,
+                 clock: Callable[[], float] = time.time):
+        p = pathlib.Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(p)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.refresh = refresh
+        self._now = clock
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.stored = 0
+        self.evicted = 0
+        self._lock = threading.Lock()  # callers may generate from several threads
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+            "response TEXT NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses(last_used)")
+        # logical LRU clock, continued across runs (wall time can tie)
+        self._clock = self._db.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM responses").fetchone()[0]
+
+    def _tick(self) -> float:
+        self._clock += 1
+        return self._clock
+
+    @staticmethod
+    def key_for(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        h = hashlib.sha256(model.encode("utf-8") + b"\0")
+        h.update(hash_prompt(prompt).encode("ascii") + b"\0")
+        h.update(json.dumps(options or {}, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response, or None on a miss, an expired entry or in refresh mode."""
+        with self._lock:
+            if self.refresh:
+                self.misses += 1
+                return None
+            row = self._db.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._now() - row[1] > self.ttl_seconds:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.expired += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (self._tick(), key))
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), self._now(), self._tick()))
+            self._db.commit()  # survive a crash mid-run; each entry cost an LLM call
+            self.stored += 1
+
+    def total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until the cache fits max_bytes."""
+        with self._lock:
+            cur = self._db.execute(
+                "DELETE FROM responses WHERE created < ?", (self._now() - self.ttl_seconds,))
+            self.expired += cur.rowcount
+            excess = self.total_bytes() - self.max_bytes
+            if excess <= 0:
+                return 0
+            drop = []
+            for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                if excess <= 0:
+                    break
+                drop.append((key,))
+                excess -= size
+            self._db.executemany("DELETE FROM responses WHERE key = ?", drop)
+            self.evicted += len(drop)
+            return len(drop)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "stored": self.stored,
+                "expired": self.expired, "evicted": self.evicted, "refresh": self.refresh}
+
+    def close(self) -> None:
+        self.evict()
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+        if self.hits or self.misses:
+            log_llm({"event": "llm.cache", **self.stats()})
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+def open_llm_cache(cfg: Dict, refresh: bool = False) -> Optional[LLMCache]:
+    """Open the cache configured by llm_cache / llm_cache_ttl_hours / llm_cache_max_mb
+    (in scan_cache_dir); None when disabled."""
+    if not cfg.get("llm_cache", True):
+        return None
+    cache_dir = cfg.get("scan_cache_dir", ".aks-copilot-cache")
+    max_mb = cfg.get("llm_cache_max_mb", DEFAULT_MAX_MB)
+    ttl = cfg.get("llm_cache_ttl_hours", DEFAULT_TTL_HOURS)
+    return LLMCache(str(pathlib.Path(cache_dir) / "llm.sqlite"), int(max_mb * 1024 * 1024),
+                    float(ttl) * 3600, refresh=refresh)
+
+
+# process-wide cache, opened on first use and closed at exit
+_cache: Optional[LLMCache] = None
+_opened = False
+_refresh = False
+_open_lock = threading.Lock()
+
+
+def set_refresh(refresh: bool) -> None:
+    """--refresh-llm: bypass cached responses for the rest of this process (still store new ones)."""
+    global _refresh
+    _refresh = refresh
+    if _cache is not None:
+        _cache.refresh = refresh
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    global _cache, _opened
+    with _open_lock:
+        if not _opened:
+            _opened = True
+            from src.config import get_config
+            try:
+                _cache = open_llm_cache(get_config(), refresh=_refresh)
+            except (OSError, sqlite3.Error) as e:
+                print(f"[WARN] LLM cache disabled: {e}")
+                _cache = None
+            if _cache is not None:
+                atexit.register(close_llm_cache)
+        return _cache
+
+
+def close_llm_cache() -> None:
+    global _cache, _opened
+    with _open_lock:
+        cache, _cache, _opened = _cache, None, False
+    if cache is not None:
+        cache.close()
+
+
+def cached_generate(model: str, prompt: str, generate: Callable[[str, str], str],
+                    options: Optional[Dict[str, Any]] = None, cache: Optional[LLMCache] = None,
+                    accept: Optional[Callable[[str], bool]] = None) -> str:
+    """generate(model, prompt) through the response cache (the process-wide one by default).
+    Empty responses, which providers return on failure, are not stored. With `accept`,
+    only responses it approves are stored or served, so an answer the caller rejects
+    is asked again next time instead of being replayed until it expires."""
+    cache = cache if cache is not None else get_llm_cache()
+    if cache is None:
+        return generate(model, prompt)
+    key = cache.key_for(model, prompt, options)
+    hit = cache.get(key)
+    if hit is not None and (accept is None or accept(hit)):
+        return hit
+    out = generate(model, prompt)
+    if out and (accept is None or accept(out)):
+        cache.put(key, model, out)
+    return out
+
+
+__all__ = ["LLMCache", "open_llm_cache", "get_llm_cache", "set_refresh", "close_llm_cache",
+           "cached_generate"]
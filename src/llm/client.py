@@ -1,8 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Protocol, Optional, Dict, Any
+from typing import Any, Callable, Dict, Optional, Protocol
 import hashlib
-import time
+
+
+# one default per setting for every call path: llm_timeout_seconds / llm.timeout_seconds
+# (an interactive bound, enforced while streaming) and llm_max_output_chars / llm.max_output_chars
+DEFAULT_TIMEOUT = 8
+DEFAULT_MAX_OUTPUT = 2000
 
 
 class LLMError(Exception):
@@ -13,31 +18,37 @@ class LLMTimeout(LLMError):
     pass
 
 
+class LLMUnavailable(LLMError):
+    """Raised without a request while the circuit breaker is open (see src/llm/http.py)."""
+    pass
+
+
 class LLMClient(Protocol):
-    def generate(self, prompt: str, *, timeout: float | None = None, max_output: int | None = None) -> str:
+    def generate(self, prompt: str, *, timeout: float | None = None, max_output: int | None = None,
+                 accept: Optional[Callable[[str], bool]] = None) -> str:
         ...
 
 
 @dataclass
 class OllamaClient:
     model: str
-    timeout_seconds: int = 8
-    max_output_chars: int = 2000
+    timeout_seconds: float = DEFAULT_TIMEOUT
+    max_output_chars: int = DEFAULT_MAX_OUTPUT
 
-    def generate(self, prompt: str, *, timeout: float | None = None, max_output: int | None = None) -> str:
+    def generate(self, prompt: str, *, timeout: float | None = None, max_output: int | None = None,
+                 accept: Optional[Callable[[str], bool]] = None) -> str:
+        """`accept` decides which answers the response cache may store (see cached_generate)."""
         # Lazy import to keep dependency surface minimal
-        from src.llm.providers import ollama_generate
+        from src.llm.cache import cached_generate
+        from src.llm.providers import generate_options, ollama_complete
         to = timeout or self.timeout_seconds
-        start = time.time()
-        raw = ollama_generate(self.model, prompt)
-        elapsed = time.time() - start
-        if elapsed > to:
-            raise LLMTimeout(
-                f"generation exceeded timeout: {elapsed:.2f}s > {to}s")
         cap = max_output or self.max_output_chars
-        if len(raw) > cap:
-            return raw[:cap]
-        return raw
+        stream = generate_options()["stream"]  # config llm_stream
+        # the deadline is enforced while streaming; LLMTimeout propagates
+        return cached_generate(self.model, prompt,
+                               lambda model, p: ollama_complete(model, p, timeout=to, max_output=cap, stream=stream),
+                               options={"timeout": float(to), "max_output": int(cap), "stream": stream},
+                               accept=accept)
 
 
 def hash_prompt(prompt: str) -> str:
@@ -50,6 +61,6 @@ def build_client(cfg: Dict[str, Any]):
     provider = cfg.get("provider", "ollama")
     if provider == "ollama":
         return OllamaClient(model=cfg.get("model", "mistral:latest"),
-                            timeout_seconds=cfg.get("timeout_seconds", 8),
-                            max_output_chars=cfg.get("max_output_chars", 2000))
+                            timeout_seconds=cfg.get("timeout_seconds", DEFAULT_TIMEOUT),
+                            max_output_chars=cfg.get("max_output_chars", DEFAULT_MAX_OUTPUT))
     raise ValueError(f"unsupported LLM provider: {provider}")
@@ -0,0 +1,309 @@
+# src/llm/http.py
+"""Shared HTTP client for the Ollama API.
+
+Generation and embedding calls go through one lazily created requests.Session
+with keep-alive connection pooling (`ollama_pool_size` connections per host),
+so thousands of calls reuse a handful of TCP connections instead of opening
+one each. Connect and read timeouts are separate (`ollama_connect_timeout`,
+`ollama_read_timeout`). Time spent opening connections (TCP plus TLS) is
+measured per call and reported with the call's total latency.
+post_lines() streams an NDJSON response (Ollama's stream=true) under a
+wall-clock deadline: every socket read is limited to the time left.
+Both go through a circuit breaker: after `llm_breaker_threshold` consecutive
+failed calls it opens and calls fail at once with LLMUnavailable, so callers
+take their deterministic fallbacks. After `llm_breaker_cooldown_seconds` a
+cheap health check (GET /api/version) decides whether to close it again.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.0
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN = 30.0
+PROBE_TIMEOUT = 2.0
+
+_local = threading.local()  # connect time of the current thread's request
+
+
+def _add_connect_time(seconds: float) -> None:
+    _local.connect_s = getattr(_local, "connect_s", 0.0) + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - t0)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - t0)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record how long they took to open."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _cfg() -> Dict[str, Any]:
+    from src.config import get_config
+    return get_config()
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session, created on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            size = int(_cfg().get("ollama_pool_size", DEFAULT_POOL_SIZE))
+            s = requests.Session()
+            adapter = _TimedAdapter(pool_connections=size, pool_maxsize=size)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _session = s
+        return _session
+
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        s, _session = _session, None
+    if s is not None:
+        s.close()
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed -> open -> half_open (probe) -> closed|open.
+    State transitions are logged to logs/llm.jsonl as llm.breaker events."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, cooldown: float, probe: Callable[[], bool],
+                 clock: Callable[[], float] = time.monotonic):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._probe = probe
+        self._now = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _to(self, state: str, reason: str) -> None:
+        from src.llm.logger import log_llm
+        log_llm({"event": "llm.breaker", "from": self.state, "to": state, "reason": reason[:200],
+                 "failures": self.failures, "rejected": self.rejected})
+        self.state = state
+
+    def _reject(self):
+        from src.llm.client import LLMUnavailable
+        self.rejected += 1
+        return LLMUnavailable(f"LLM backend unavailable (circuit {self.state})")
+
+    def allow(self) -> None:
+        """Return if a call may go out; raise LLMUnavailable while open. Once the
+        cooldown has passed, one caller runs the health probe; the others keep failing fast."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self._probing or self._now() - self._opened_at < self.cooldown:
+                raise self._reject()
+            self._probing = True
+            self._to(self.HALF_OPEN, "cooldown elapsed, probing")
+        try:
+            ok = self._probe()
+        except Exception:
+            ok = False
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.failures = 0
+                self._to(self.CLOSED, "probe ok")
+                return
+            self._opened_at = self._now()
+            self._to(self.OPEN, "probe failed")
+            raise self._reject()
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+
+    def failure(self, reason: str) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.CLOSED and self.failures >= self.threshold:
+                self._opened_at = self._now()
+                self._to(self.OPEN, reason)
+
+
+def _health_probe() -> bool:
+    connect, _ = timeouts(0)
+    resp = get_session().get(base_url() + "/api/version", timeout=(connect, PROBE_TIMEOUT))
+    return resp.ok
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_breaker() -> CircuitBreaker:
+    """The process-wide breaker shared by generation and embedding calls."""
+    global _breaker
+    with _session_lock:
+        if _breaker is None:
+            cfg = _cfg()
+            _breaker = CircuitBreaker(int(cfg.get("llm_breaker_threshold", DEFAULT_BREAKER_THRESHOLD)),
+                                      float(cfg.get("llm_breaker_cooldown_seconds", DEFAULT_BREAKER_COOLDOWN)),
+                                      _health_probe)
+        return _breaker
+
+
+def reset_breaker() -> None:
+    global _breaker
+    with _session_lock:
+        _breaker = None
+
+
+def timeouts(read_default: float) -> Tuple[float, float]:
+    """(connect, read) timeouts; read falls back to the caller's default."""
+    cfg = _cfg()
+    read = cfg.get("ollama_read_timeout")
+    return (float(cfg.get("ollama_connect_timeout", DEFAULT_CONNECT_TIMEOUT)),
+            float(read) if read is not None else read_default)
+
+
+def base_url() -> str:
+    return os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+
+
+def post_json(path: str, payload: Dict[str, Any], read_timeout: float,
+              timing: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """POST payload to the Ollama API over the pooled session and return the JSON body.
+    Raises requests.RequestException like requests.post. If `timing` is given,
+    connect_ms (0 when a kept-alive connection was reused) and total_ms are
+    added to it, also when the call fails."""
+    breaker = get_breaker()
+    breaker.allow()
+    _local.connect_s = 0.0
+    t0 = time.perf_counter()
+    try:
+        resp = get_session().post(base_url() + path, json=payload, timeout=timeouts(read_timeout))
+        resp.raise_for_status()
+        breaker.success()
+        return resp.json()
+    except requests.exceptions.RequestException as e:
+        breaker.failure(f"{path}: {e}")
+        raise
+    finally:
+        if timing is not None:
+            timing["connect_ms"] = timing.get("connect_ms", 0.0) + _local.connect_s * 1000
+            timing["total_ms"] = timing.get("total_ms", 0.0) + (time.perf_counter() - t0) * 1000
+            timing["connections"] = timing.get("connections", 0) + (1 if _local.connect_s else 0)
+
+
+def _limit_next_read(resp: requests.Response, seconds: float) -> None:
+    sock = getattr(getattr(resp.raw, "connection", None), "sock", None)
+    if sock is not None:
+        sock.settimeout(max(seconds, 0.001))
+
+
+def post_lines(path: str, payload: Dict[str, Any], deadline: float,
+               timing: Optional[Dict[str, float]] = None) -> Iterator[Dict[str, Any]]:
+    """POST payload and yield each JSON line of the streamed response as it arrives.
+    `deadline` is a time.perf_counter() value: connect, the wait for the first
+    byte and every later read are cut off when it passes, raising LLMTimeout.
+    Closing the generator early drops the connection instead of draining it.
+    connect_ms and connections are added to `timing` as in post_json."""
+    from src.llm.client import LLMTimeout
+
+    breaker = get_breaker()
+    breaker.allow()
+    ok = False
+    try:
+        yield from _stream_lines(path, payload, deadline, timing)
+        ok = True
+    except GeneratorExit:  # the caller stopped early (e.g. complete JSON): not a failure
+        ok = True
+        raise
+    except (LLMTimeout, requests.exceptions.RequestException) as e:
+        breaker.failure(f"{path}: {e}")
+        raise
+    finally:
+        if ok:
+            breaker.success()
+
+
+def _stream_lines(path, payload, deadline, timing):
+    from src.llm.client import LLMTimeout
+
+    _local.connect_s = 0.0
+    connect, _ = timeouts(0)
+    try:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise LLMTimeout("deadline passed before the request was sent")
+        try:
+            resp = get_session().post(base_url() + path, json=payload, stream=True,
+                                      timeout=(min(connect, remaining), remaining))
+        except requests.exceptions.Timeout as e:
+            raise LLMTimeout(f"no response before the deadline: {e}") from e
+    finally:
+        if timing is not None:
+            timing["connect_ms"] = timing.get("connect_ms", 0.0) + _local.connect_s * 1000
+            timing["connections"] = timing.get("connections", 0) + (1 if _local.connect_s else 0)
+    with resp:
+        resp.raise_for_status()
+        lines = resp.iter_lines(chunk_size=None)  # yield HTTP chunks as they arrive
+        while True:
+            _limit_next_read(resp, deadline - time.perf_counter())
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except requests.exceptions.RequestException as e:
+                if time.perf_counter() >= deadline:
+                    raise LLMTimeout(f"stream exceeded the deadline: {e}") from e
+                raise
+            if line:
+                yield json.loads(line)
+            if time.perf_counter() >= deadline:
+                raise LLMTimeout("stream exceeded the deadline")
+
+
+__all__ = ["get_session", "close_session", "timeouts", "base_url", "post_json", "post_lines",
+           "CircuitBreaker", "get_breaker", "reset_breaker"]
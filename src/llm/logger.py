@@ -1,8 +1,38 @@
 import json
 import os
+from typing import Iterable
 
 
 def log_llm(event: dict):
+    log_llm_many([event])
+
+
+def log_llm_many(events: Iterable[dict]):
+    """Append several events with a single open of logs/llm.jsonl."""
+    lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+    if not lines:
+        return
     os.makedirs("logs", exist_ok=True)
     with open("logs/llm.jsonl", "a", encoding="utf-8") as f:
-        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        f.write(lines)
+
+
+class LogBuffer:
+    """Collects events in memory; flush() (or leaving a `with` block) writes them at once."""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event: dict):
+        self.events.append(event)
+
+    def flush(self):
+        events, self.events = self.events, []
+        log_llm_many(events)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
@@ -1,3 +1,5 @@
 EXPLAIN_VIOLATION_TEMPLATE = """You are a Kubernetes migration assistant.\nExplain why the following rule matters and how to fix it succinctly.\nRule ID: {id}\nResource: {resource}\nFound: {found}\nExpected: {expected}\nReturn a concise paragraph (<= 8 sentences)."""
 
 SUGGEST_IMPROVEMENT_TEMPLATE = """You are a Kubernetes migration assistant.\nGiven the violation details, emit ONLY a JSON object with keys: type, ops.\nEach op: {{"op":"add|replace", "path":"/json/pointer", "value": <object>}}.\nViolation: {violation_json}\nRespond with JSON only, no commentary."""
+
+SUGGEST_BATCH_TEMPLATE = """You are a Kubernetes migration assistant.\nFor EACH violation below, emit one JSON object with keys: index, type, ops.\nindex: the violation's index; type: "patch_suggestion".\nEach op: {{"op":"add|replace", "path":"/json/pointer", "value": <object>}}.\nViolations: {violations_json}\nRespond with ONLY a JSON array of these objects, one per violation, no commentary."""
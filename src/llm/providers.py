@@ -1,23 +1,154 @@
-# src/llm/providers.py
-import json
-import os
+import time
+from contextlib import closing
+
 import requests
 
+from src.llm.client import DEFAULT_MAX_OUTPUT, DEFAULT_TIMEOUT, LLMTimeout, LLMUnavailable
+from src.llm.http import post_json, post_lines
+from src.llm.logger import log_llm
 
-def ollama_generate(model: str, prompt: str) -> str:
+
+class _JsonEnd:
+    """Incremental scan of streamed text for the end of a leading JSON array/object.
+    feed() returns the length of the text up to the closing bracket once the
+    value is complete, else -1. Text that does not start with '[' or '{' never ends."""
+
+    def __init__(self):
+        self.seen = 0
+        self.depth = 0
+        self.started = False
+        self.off = False
+        self.in_str = False
+        self.esc = False
+
+    def feed(self, chunk: str) -> int:
+        for i, ch in enumerate(chunk):
+            if self.off:
+                break
+            if not self.started:
+                if ch.isspace():
+                    continue
+                if ch not in "[{":
+                    self.off = True
+                    break
+                self.started = True
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+            elif ch == '"':
+                self.in_str = True
+            elif ch in "[{":
+                self.depth += 1
+            elif ch in "]}":
+                self.depth -= 1
+                if self.depth == 0:
+                    return self.seen + i + 1
+        self.seen += len(chunk)
+        return -1
+
+
+def ollama_stream(model: str, prompt: str, timeout: float, max_output: int) -> str:
     """
-    Calls local Ollama /api/generate with stream=false.
-    Returns the raw 'response' text.
+    Streams /api/generate and returns the text read so far when the model is
+    done, a leading JSON array/object is complete, or max_output chars arrived.
+    The wall-clock `timeout` covers the whole call (raises LLMTimeout).
+    Time to first token and total latency are logged.
     """
-    base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
-    url = f"{base_url}/api/generate"
-    payload = {"model": model, "prompt": prompt, "stream": False}
+    payload = {"model": model, "prompt": prompt, "stream": True}
+    timing = {}
+    parts = []
+    size = 0
+    scan = _JsonEnd()
+    end = -1
+    stop = "error"
+    t0 = time.perf_counter()
+    ttft = None
+    try:
+        with closing(post_lines("/api/generate", payload, deadline=t0 + timeout, timing=timing)) as chunks:
+            for chunk in chunks:
+                token = chunk.get("response", "")
+                if token:
+                    if ttft is None:
+                        ttft = time.perf_counter() - t0
+                    parts.append(token)
+                    size += len(token)
+                    end = scan.feed(token)
+                    if end >= 0:
+                        stop = "json"
+                        break
+                    if size >= max_output:
+                        stop = "max_output"
+                        break
+                # after the "done" chunk the stream ends; reading to the end keeps the connection reusable
+        if stop == "error":
+            stop = "done"
+        text = "".join(parts)
+        return (text[:end] if end >= 0 else text)[:max_output].strip()
+    except LLMTimeout:
+        stop = "timeout"
+        raise
+    except LLMUnavailable:
+        stop = "circuit_open"
+        raise
+    finally:
+        log_llm({"event": "http.timing", "endpoint": "generate", "model": model, "stream": True,
+                 "ok": stop not in ("error", "timeout", "circuit_open"), "stop": stop, "chars": size,
+                 "connect_ms": round(timing.get("connect_ms", 0.0), 2),
+                 "ttft_ms": round(ttft * 1000, 2) if ttft is not None else None,
+                 "total_ms": round((time.perf_counter() - t0) * 1000, 2)})
 
+
+def _generate_once(model: str, prompt: str, timeout: float) -> str:
+    """Non-streaming /api/generate; the read timeout is the whole deadline."""
+    payload = {"model": model, "prompt": prompt, "stream": False}
+    timing = {}
+    ok = False
     try:
-        response = requests.post(url, json=payload, timeout=60)
-        response.raise_for_status()  # Raise an exception for 4xx/5xx errors
-        data = response.json()
+        data = post_json("/api/generate", payload, read_timeout=timeout, timing=timing)
+        ok = True
         return data.get("response", "").strip()
-    except requests.exceptions.RequestException as e:
+    finally:
+        log_llm({"event": "http.timing", "endpoint": "generate", "model": model, "ok": ok,
+                 "connect_ms": round(timing.get("connect_ms", 0.0), 2),
+                 "total_ms": round(timing.get("total_ms", 0.0), 2)})
+
+
+def ollama_complete(model: str, prompt: str, timeout: float, max_output: int, stream: bool = True) -> str:
+    """One generation under a wall-clock deadline. Raises LLMTimeout or requests.RequestException."""
+    if stream:
+        return ollama_stream(model, prompt, timeout, max_output)
+    return _generate_once(model, prompt, timeout)[:max_output]
+
+
+def generate_options() -> dict:
+    """Settings ollama_generate uses that shape its output (config llm_timeout_seconds,
+    llm_max_output_chars, llm_stream); callers pass them as the response cache options."""
+    from src.config import get_config
+    cfg = get_config()
+    return {"timeout": float(cfg.get("llm_timeout_seconds", DEFAULT_TIMEOUT)),
+            "max_output": int(cfg.get("llm_max_output_chars", DEFAULT_MAX_OUTPUT)),
+            "stream": bool(cfg.get("llm_stream", True))}
+
+
+def ollama_generate(model: str, prompt: str) -> str:
+    """
+    Calls local Ollama /api/generate over the pooled session; streams unless
+    config llm_stream is false. llm_timeout_seconds (default 8) is enforced
+    as a wall-clock deadline and llm_max_output_chars caps the output.
+    Returns the raw 'response' text, or "" on failure, timeout or while the
+    circuit breaker is open (no request is made then).
+    """
+    try:
+        return ollama_complete(model, prompt, **generate_options())
+    except LLMUnavailable:
+        return ""  # breaker open; the transition was logged
+    except LLMTimeout as e:
+        print(f"[ERROR] Ollama request timed out: {e}")
+        return ""
+    except (requests.exceptions.RequestException, ValueError) as e:
         print(f"[ERROR] Ollama request failed: {e}")
         return ""
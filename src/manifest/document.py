@@ -0,0 +1,111 @@
+# src/manifest/document.py
+"""Parsed manifest shared by inspection, patch validation, dry-run and resource inference.
+
+A file is parsed once into a ParsedManifest and that object is handed to every
+consumer. Functions that historically took raw YAML text accept either form;
+ensure_manifest() parses text on the fly so those call sites keep working.
+Each parsed document also gets a pointer -> (line, column) index (see
+loader.load_all_indexed), used for file:line output and to route patch ops.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+import pathlib
+from src.manifest import loader, prefilter
+
+
+@dataclass
+class ParsedManifest:
+    text: str
+    docs: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+    path: Optional[str] = None
+    skipped_bytes: int = 0  # documents left unparsed by the kind pre-filter
+    marks: List[Optional[loader.Marks]] = field(default_factory=list)  # per doc
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def objects(self) -> List[dict]:
+        """Mapping documents only (empty docs and scalars are skipped)."""
+        return [d for d in self.docs if isinstance(d, dict)]
+
+    def locate(self, doc_index: int, pointer: str) -> Optional[Tuple[int, int]]:
+        """(line, column) of `pointer` in document `doc_index`, 1-based. Pointers that
+        do not exist yet (e.g. an 'add' target) or lie inside an alias (indexed once,
+        at its anchor) resolve to their nearest indexed parent."""
+        if not 0 <= doc_index < len(self.marks) or self.marks[doc_index] is None:
+            return None
+        index = self.marks[doc_index]
+        ptr = pointer.rstrip("/")
+        while ptr not in index:
+            if "/" not in ptr:
+                return None
+            ptr = ptr.rsplit("/", 1)[0]
+        return index[ptr]
+
+
+ManifestSource = Union[str, ParsedManifest]
+
+
+def parse_manifest(text: str, path: Optional[str] = None, kinds: Optional[Iterable[str]] = None) -> ParsedManifest:
+    """Parse a (multi-document) YAML stream. Parse errors are kept on the result, never raised.
+
+    With `kinds`, documents whose top-level kind is clearly outside that set are
+    not parsed (see src/manifest/prefilter.py); they stay in docs as
+    SkippedDocument placeholders so indices match a full parse.
+    """
+    if kinds is not None:
+        try:
+            docs, marks, skipped = prefilter.load_relevant(text, kinds)
+            return ParsedManifest(text=text, docs=docs, path=path, skipped_bytes=skipped, marks=marks)
+        except prefilter.Fallback:
+            pass
+    try:
+        docs, marks = loader.load_all_indexed(text)
+    except Exception as e:
+        return ParsedManifest(text=text, docs=[], error=str(e), path=path)
+    return ParsedManifest(text=text, docs=docs, path=path, marks=marks)
+
+
+def ensure_manifest(src: ManifestSource) -> ParsedManifest:
+    if isinstance(src, ParsedManifest):
+        return src
+    return parse_manifest(src)
+
+
+def load_manifest(path: Union[str, pathlib.Path]) -> Optional[ParsedManifest]:
+    """Read and parse a manifest file; returns None if the file cannot be read."""
+    try:
+        text = pathlib.Path(path).read_text(encoding="utf-8")
+    except Exception:
+        return None
+    return parse_manifest(text, path=str(path))
+
+
+class ManifestStore:
+    """path -> ParsedManifest, parsing lazily on first access.
+
+    The scan stage can hand over manifests it already parsed (serial runs); with
+    parallel workers only files that later stages actually touch get re-parsed.
+    """
+
+    def __init__(self):
+        self._by_path: Dict[str, Optional[ParsedManifest]] = {}
+
+    def put(self, path: str, manifest: ParsedManifest) -> None:
+        self._by_path[path] = manifest
+
+    def get(self, path: str) -> Optional[ParsedManifest]:
+        if path not in self._by_path:
+            self._by_path[path] = load_manifest(path)
+        return self._by_path[path]
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+
+__all__ = ["ParsedManifest", "ManifestSource", "ManifestStore",
+           "parse_manifest", "ensure_manifest", "load_manifest"]
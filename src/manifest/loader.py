@@ -0,0 +1,130 @@
+# src/manifest/loader.py
+"""Single YAML loading entry point for the project.
+
+Prefers libyaml's CSafeLoader when PyYAML was built with it (several times faster
+on large rendered manifests) and falls back to the pure-Python SafeLoader
+otherwise. Both build the same safe types, so results do not depend on the backend.
+Set YAML_LOADER=pure (or libyaml) to force a backend.
+
+load_all_indexed() additionally returns, per document, a JSON pointer ->
+(line, column) map taken from the composed nodes' start marks. It drives the
+same compose + construct steps load_all does, so the index costs one walk over
+the node tree, not a second parse.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Tuple
+import yaml
+
+Marks = Dict[str, Tuple[int, int]]  # JSON pointer -> (line, column), both 1-based
+
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+
+PURE = "pure"
+LIBYAML = "libyaml"
+
+_LOADERS = {PURE: yaml.SafeLoader}
+if getattr(yaml, "CSafeLoader", None) is not None:
+    _LOADERS[LIBYAML] = yaml.CSafeLoader
+
+
+def available_backends() -> List[str]:
+    return sorted(_LOADERS)
+
+
+def _default_backend() -> str:
+    wanted = os.environ.get("YAML_LOADER", "").strip().lower()
+    if wanted in _LOADERS:
+        return wanted
+    return LIBYAML if LIBYAML in _LOADERS else PURE
+
+
+_backend = _default_backend()
+
+
+def backend() -> str:
+    """Name of the active loader backend: 'libyaml' or 'pure'."""
+    return _backend
+
+
+def set_backend(name: str) -> str:
+    """Switch backend ('libyaml' | 'pure' | 'auto'); returns the previous one.
+    Raises ValueError if libyaml is requested but PyYAML was built without it."""
+    global _backend
+    prev = _backend
+    if name == "auto":
+        _backend = LIBYAML if LIBYAML in _LOADERS else PURE
+    elif name in _LOADERS:
+        _backend = name
+    else:
+        raise ValueError(f"yaml loader backend not available: {name}")
+    return prev
+
+
+def loader_class():
+    return _LOADERS[_backend]
+
+
+def load_all(text: str) -> List[Any]:
+    """Load every document of a YAML stream with the active backend."""
+    return list(yaml.load_all(text, Loader=loader_class()))
+
+
+def escape_token(token: str) -> str:
+    """RFC 6901 escaping of a single reference token."""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def node_marks(root: yaml.Node) -> Marks:
+    """Pointer -> (line, column) for every mapping key and sequence item under `root`.
+    Mapping entries point at their key, so a block value maps to the line naming it.
+    Nodes are walked once, in document order: an anchored node is indexed at its
+    anchor, and pointers through an alias resolve (see ParsedManifest.locate) to
+    the key naming the alias."""
+    m = root.start_mark
+    out: Marks = {"": (m.line + 1, m.column + 1)}
+    seen = set()
+    stack = [(root, "")]
+    while stack:
+        node, ptr = stack.pop()
+        if id(node) in seen:  # alias of a node indexed already (or recursive)
+            continue
+        seen.add(id(node))
+        children = []
+        if isinstance(node, yaml.MappingNode):
+            for key, value in node.value:
+                if not isinstance(key, yaml.ScalarNode) or key.tag == _MERGE_TAG:
+                    continue
+                children.append((f"{ptr}/{escape_token(key.value)}", key, value))
+        elif isinstance(node, yaml.SequenceNode):
+            children = [(f"{ptr}/{i}", item, item) for i, item in enumerate(node.value)]
+        for child, at, value in children:
+            m = at.start_mark
+            out.setdefault(child, (m.line + 1, m.column + 1))
+        stack.extend((value, child) for child, _, value in reversed(children) if id(value) not in seen)
+    return out
+
+
+def load_all_indexed(text: str) -> Tuple[List[Any], List[Marks]]:
+    """Like load_all, plus node_marks() for each document."""
+    ld = loader_class()(text)
+    docs: List[Any] = []
+    marks: List[Marks] = []
+    try:
+        while ld.check_node():
+            node = ld.get_node()
+            docs.append(ld.construct_document(node))
+            marks.append(node_marks(node))
+    finally:
+        ld.dispose()
+    return docs, marks
+
+
+def load(text: str) -> Any:
+    return yaml.load(text, Loader=loader_class())
+
+
+__all__ = ["PURE", "LIBYAML", "available_backends", "backend",
+           "set_backend", "loader_class", "load_all", "load_all_indexed",
+           "node_marks", "escape_token", "load"]
@@ -0,0 +1,108 @@
+# src/manifest/prefilter.py
+"""Cheap kind pre-filter: split a YAML stream on '---' and read each document's kind.
+
+Only documents whose kind some rule cares about are handed to the YAML loader;
+the others (ConfigMaps with huge data blocks, CRDs with OpenAPI schemas, ...)
+are kept as SkippedDocument placeholders so document indices stay aligned with
+a full parse. Anything the splitter is not sure about falls back to parsing.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Tuple
+import re
+
+from src.manifest import loader
+
+_DOC_START = re.compile(r"^---(?=[ \t\r]|$)")
+_DOC_END = re.compile(r"^\.\.\.(?=[ \t\r]|$)")
+# a top-level `kind:` key: root mappings start at column 0, nested keys and
+# block scalar content are always indented
+_KIND = re.compile(
+    r"^kind:[ \t]*(['\"]?)([A-Za-z0-9][A-Za-z0-9._-]*)\1[ \t]*(?:#.*)?\r?$", re.M)
+_EXOTIC_BREAKS = ("\x85", "\u2028", "\u2029")
+
+
+@dataclass
+class SkippedDocument:
+    """Placeholder for a document that was not parsed because no rule handles its kind."""
+    kind: str
+    size: int  # utf-8 bytes
+
+
+class Fallback(Exception):
+    """The stream uses constructs the splitter does not handle; parse it in full."""
+
+
+def _has_content(lines: Iterable[str]) -> bool:
+    for ln in lines:
+        s = ln.strip()
+        if s and not s.startswith("#"):
+            return True
+    return False
+
+
+def split_documents(text: str) -> List[Tuple[int, str]]:
+    """Return [(first_line_index, chunk_text)] per document, matching load_all's document count.
+    Raises Fallback for directives, '...' markers or inline content after '---'."""
+    if any(b in text for b in _EXOTIC_BREAKS) or text.count("\r") != text.count("\r\n"):
+        raise Fallback("line breaks other than \\n / \\r\\n")
+    out: List[Tuple[int, str]] = []
+    lines = text.split("\n")
+    start, cur, explicit = 0, [], False
+    for i, ln in enumerate(lines):
+        if ln.startswith("%") or _DOC_END.match(ln):
+            raise Fallback("directive or document end marker")
+        if _DOC_START.match(ln):
+            rest = ln[3:].strip()
+            if rest and not rest.startswith("#"):
+                raise Fallback("content after document start marker")
+            if explicit or _has_content(cur):
+                out.append((start, "\n".join(cur)))
+            start, cur, explicit = i, [ln], True
+            continue
+        cur.append(ln)
+    if explicit or _has_content(cur):
+        out.append((start, "\n".join(cur)))
+    return out
+
+
+def scan_kind(chunk: str) -> Optional[str]:
+    """The document's top-level kind, or None when missing or ambiguous."""
+    found = _KIND.findall(chunk)
+    if len(found) != 1:
+        return None
+    return found[0][1]
+
+
+def load_relevant(text: str, kinds: Iterable[str]) -> Tuple[List[Any], List[Optional[loader.Marks]], int]:
+    """Parse only documents whose kind is in `kinds`; returns (docs, marks, skipped_bytes).
+    Marks are line-adjusted to the whole stream (None for skipped documents).
+    Documents without a clear kind header are parsed. Raises Fallback if the
+    stream cannot be split safely (callers then parse the whole stream)."""
+    wanted = set(kinds)
+    docs: List[Any] = []
+    marks: List[Optional[loader.Marks]] = []
+    skipped = 0
+    for start, chunk in split_documents(text):
+        kind = scan_kind(chunk)
+        if kind is not None and kind not in wanted:
+            size = len(chunk.encode("utf-8"))
+            docs.append(SkippedDocument(kind, size))
+            marks.append(None)
+            skipped += size
+            continue
+        try:
+            parsed, chunk_marks = loader.load_all_indexed(chunk)
+        except Exception as e:
+            raise Fallback(f"chunk parse error: {e}")
+        if len(parsed) != 1:
+            raise Fallback("chunk did not hold exactly one document")
+        docs.append(parsed[0])
+        marks.append({p: (line + start, col)
+                     for p, (line, col) in chunk_marks[0].items()})
+    return docs, marks, skipped
+
+
+__all__ = ["SkippedDocument", "Fallback",
+           "split_documents", "scan_kind", "load_relevant"]
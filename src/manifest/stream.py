@@ -0,0 +1,82 @@
+# src/manifest/stream.py
+"""Document-by-document reading of a (huge) YAML stream, e.g. `helm template` output on stdin.
+
+iter_documents() consumes lines lazily and yields one StreamDocument per
+'---'-separated chunk, so memory is bounded by the largest single document,
+not by the stream. Helm's `# Source: chart/templates/x.yaml` comment is
+picked up as the document's originating template.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+import re
+
+from src.manifest.prefilter import _DOC_END, _DOC_START, _has_content
+
+_SOURCE = re.compile(r"^#\s*Source:\s*(\S.*?)\s*$")
+
+
+@dataclass
+class StreamDocument:
+    start_line: int  # 0-based line of the chunk's first line in the stream
+    text: str
+    source: Optional[str] = None  # template named by a leading '# Source:' comment
+
+
+def _source_of(lines: List[str]) -> Optional[str]:
+    for ln in lines:
+        s = ln.strip()
+        if not s or _DOC_START.match(s):
+            continue
+        if not s.startswith("#"):
+            return None  # only leading comments count
+        m = _SOURCE.match(s)
+        if m:
+            return m.group(1)
+    return None
+
+
+def iter_documents(lines: Iterable[str]) -> Iterator[StreamDocument]:
+    """Split a stream of lines (with or without trailing newlines) into documents.
+
+    '---' starts a document, '...' ends one, and '%' directives are kept with
+    the document that follows them. Chunks holding nothing but comments before
+    the first '---' are dropped, like an empty stream in load_all.
+    """
+    cur: List[str] = []
+    start = 0
+    explicit = False  # cur began with '---'
+    directives = False  # cur holds only directives/comments so far
+    i = -1
+    for i, raw in enumerate(lines):
+        ln = raw.rstrip("\n").rstrip("\r")
+        if ln.startswith("%"):
+            if not directives and (explicit or _has_content(cur)):
+                yield StreamDocument(start, "\n".join(cur), _source_of(cur))
+                cur, start, explicit = [], i, False
+            directives = True
+            cur.append(ln)
+            continue
+        if _DOC_START.match(ln):
+            if directives:
+                directives = False  # '---' closes the directive prologue
+            elif explicit or _has_content(cur):
+                yield StreamDocument(start, "\n".join(cur), _source_of(cur))
+                cur, start = [], i
+            else:
+                cur, start = [], i  # drop a leading comment-only chunk
+            cur.append(ln)
+            explicit = True
+            continue
+        if _DOC_END.match(ln):
+            if explicit or _has_content(cur):
+                yield StreamDocument(start, "\n".join(cur), _source_of(cur))
+            cur, start, explicit = [], i + 1, False
+            continue
+        cur.append(ln)
+    if explicit or _has_content(cur):
+        yield StreamDocument(start, "\n".join(cur), _source_of(cur))
+
+
+__all__ = ["StreamDocument", "iter_documents"]
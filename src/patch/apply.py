@@ -0,0 +1,343 @@
+# src/patch/apply.py
+"""Apply patch ops to manifest files, keeping comments and formatting.
+
+Ops are first applied to the parsed documents with the dry-run engine, which
+validates them and gives the expected result. The file text is then edited in
+place at the spans given by the YAML node marks: a replace rewrites only the
+target value, an add inserts one entry after the last entry of its mapping or
+sequence. Everything else in the file (comments, quoting, key order, blank
+lines) is left byte for byte. The edited text must load back to the expected
+documents, otherwise the file is not written.
+
+Files are processed in parallel (one task per file) and written atomically
+via a temp file in the same directory plus os.replace.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import difflib
+import json
+import os
+import pathlib
+import tempfile
+
+import yaml
+
+from src.manifest import loader
+from src.manifest.document import parse_manifest
+from src.patch.dryrun import route_batch
+from src.patch.pointer import PointerError, compile_pointer
+
+
+class ApplyError(Exception):
+    pass
+
+
+@dataclass
+class FileResult:
+    file: str
+    ops: int
+    ok: bool
+    changed: bool = False
+    added: int = 0  # diff lines
+    removed: int = 0
+    error: str = ""
+
+
+# --- rendering -------------------------------------------------------------
+
+def _dump(value: Any, flow: bool) -> str:
+    out = yaml.safe_dump(value, default_flow_style=flow, sort_keys=False,
+                         allow_unicode=True, width=float("inf"))
+    if out.endswith("\n...\n"):  # document end marker after a bare scalar
+        out = out[:-4]
+    return out.rstrip("\n")
+
+
+def _flow(value: Any) -> str:
+    """Single-line YAML for value (JSON when YAML would need several lines)."""
+    out = _dump(value, flow=True)
+    return out if "\n" not in out else json.dumps(value, ensure_ascii=False)
+
+
+def _block(value: Any, indent: int) -> str:
+    """Block YAML for a collection; lines after the first are indented by `indent`."""
+    lines = _dump(value, flow=False).split("\n")
+    return "\n".join([lines[0]] + [" " * indent + ln if ln else ln for ln in lines[1:]])
+
+
+def _is_block_value(value: Any) -> bool:
+    return isinstance(value, (dict, list)) and bool(value)
+
+
+# --- node lookup -----------------------------------------------------------
+
+class _Text:
+    """Text plus (line, column) -> offset mapping that works for both loader backends."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = [0]
+        for i, ch in enumerate(text):
+            if ch == "\n":
+                self.starts.append(i + 1)
+
+    def offset(self, mark) -> int:
+        if mark.line >= len(self.starts):
+            return len(self.text)
+        # columns do not count the '\r' of a CRLF break
+        return min(self.starts[mark.line] + mark.column, len(self.text))
+
+    def line_end(self, pos: int) -> int:
+        """Offset just past the line break at or after pos (end of text if none)."""
+        nl = self.text.find("\n", pos)
+        return len(self.text) if nl < 0 else nl + 1
+
+
+def _compose_all(text: str) -> List[yaml.Node]:
+    ld = loader.loader_class()(text)
+    try:
+        nodes = []
+        while ld.check_node():
+            nodes.append(ld.get_node())
+        return nodes
+    finally:
+        ld.dispose()
+
+
+def _content_end(node: yaml.Node, t: _Text) -> int:
+    """Offset just past the node's last character of content (block collections
+    end where their last value ends, not at the next token)."""
+    if isinstance(node, yaml.ScalarNode):
+        end = t.offset(node.end_mark)
+        if node.style in ("|", ">"):  # block scalars own their trailing line breaks
+            while end > 0 and t.text[end - 1] in "\r\n":
+                end -= 1
+        return end
+    if node.flow_style or not node.value:
+        return t.offset(node.end_mark)
+    last = node.value[-1]
+    if isinstance(node, yaml.MappingNode):
+        key, last = last
+        if isinstance(last, yaml.ScalarNode) and last.value == "" and not last.style:
+            return _content_end(key, t)  # 'key:' with no value; the null has no span
+    return _content_end(last, t)
+
+
+def _find(root: yaml.Node, parts: Sequence[str], t: _Text) -> Tuple[yaml.Node, Optional[yaml.Node]]:
+    """(node, key node or None) at parts; raises KeyError if it is not spelled out in the text."""
+    node, key_node = root, None
+    for p in parts:
+        start = t.offset(node.start_mark)
+        if isinstance(node, yaml.MappingNode):
+            match = [(k, v) for k, v in node.value if isinstance(k, yaml.ScalarNode) and k.value == p]
+            if not match:
+                raise KeyError(p)
+            key_node, child = match[-1]  # the last duplicate wins, like the constructor
+            if t.offset(child.start_mark) < t.offset(key_node.end_mark):
+                raise ApplyError(f"path goes through a YAML alias at {p}")
+        elif isinstance(node, yaml.SequenceNode):
+            if not p.isdigit() or int(p) >= len(node.value):
+                raise KeyError(p)
+            key_node, child = None, node.value[int(p)]
+            if t.offset(child.start_mark) < start:
+                raise ApplyError(f"path goes through a YAML alias at {p}")
+        else:
+            raise KeyError(p)
+        node = child
+    return node, key_node
+
+
+def _edit(root: yaml.Node, op: dict, t: _Text) -> Tuple[int, int, str, bool]:
+    """(start, end, replacement, in_flow) for one op against the composed document;
+    in_flow marks an add inside a flow collection's brackets."""
+    parts = compile_pointer(op["path"]).parts
+    value = op.get("value")
+    if op["op"] == "replace":
+        node, key_node = _find(root, parts, t)
+        start, end = t.offset(node.start_mark), _content_end(node, t)
+        if not _is_block_value(value):
+            return start, end, _flow(value), False
+        if isinstance(node, (yaml.MappingNode, yaml.SequenceNode)) and not node.flow_style:
+            return start, end, _block(value, node.start_mark.column), False
+        if key_node is not None:  # 'key: scalar' -> 'key:' + indented block
+            indent = key_node.start_mark.column + 2
+            return start - 1 if t.text[start - 1:start] == " " else start, end, \
+                "\n" + " " * indent + _block(value, indent), False
+        return start, end, _block(value, node.start_mark.column), False  # sequence item
+    # add: a new last entry of the parent mapping / sequence
+    parent, _ = _find(root, parts[:-1], t)
+    if isinstance(parent, yaml.MappingNode):
+        entry_key = _flow(parts[-1])
+        if parent.flow_style or not parent.value:
+            pos = t.offset(parent.end_mark) - 1
+            if t.text[pos:pos + 1] != "}":
+                raise ApplyError(f"cannot locate the end of the mapping at {op['path']}")
+            sep = ", " if parent.value else ""
+            return pos, pos, f"{sep}{entry_key}: {_flow(value)}", True
+        col = parent.value[0][0].start_mark.column
+        if _is_block_value(value):
+            indent = col + 2
+            body = f"{entry_key}:\n{' ' * indent}{_block(value, indent)}"
+        else:
+            body = f"{entry_key}: {_flow(value)}"
+    elif isinstance(parent, yaml.SequenceNode):
+        if parent.flow_style or not parent.value:
+            pos = t.offset(parent.end_mark) - 1
+            if t.text[pos:pos + 1] != "]":
+                raise ApplyError(f"cannot locate the end of the sequence at {op['path']}")
+            sep = ", " if parent.value else ""
+            return pos, pos, sep + _flow(value), True
+        col = parent.start_mark.column
+        body = "- " + (_block(value, col + 2) if _is_block_value(value) else _flow(value))
+    else:
+        raise ApplyError(f"add parent is not a mapping or sequence: {op['path']}")
+    pos = t.line_end(_content_end(parent, t))
+    lead = "" if pos == 0 or t.text[pos - 1] == "\n" else "\n"
+    return pos, pos, f"{lead}{' ' * col}{body}\n", False
+
+
+def _overlaps(parts: Tuple[str, ...], done: List[Tuple[str, ...]]) -> bool:
+    return any(parts[:len(d)] == d or d[:len(parts)] == parts for d in done)
+
+
+def splice(text: str, ops: List[dict], targets: List[int]) -> str:
+    """Apply already validated ops (with their document indices) to the text.
+
+    Independent ops are spliced from one composition of the text; an op on a
+    path overlapping an earlier op's, a second insert into the same flow
+    collection, or an op that needs an earlier op's result starts a new round
+    on the edited text.
+    """
+    nl = "\r\n" if "\r\n" in text else "\n"
+    pending = list(zip(ops, targets))
+    while pending:
+        t = _Text(text)
+        roots = _compose_all(text)
+        edits: List[Tuple[int, int, int, str]] = []
+        done: Dict[int, List[Tuple[str, ...]]] = {}
+        flow_parents = set()  # (doc, parent parts) that got an in-bracket insert
+        n = 0
+        for n, (op, doc) in enumerate(pending):
+            parts = compile_pointer(op["path"]).parts
+            if _overlaps(parts, done.get(doc, [])) or (doc, parts[:-1]) in flow_parents:
+                break
+            try:
+                start, end, new, in_flow = _edit(roots[doc], op, t)
+            except KeyError:
+                if not edits:
+                    raise ApplyError(f"path not found in text: {op['path']}")
+                break
+            edits.append((start, end, n, new.replace("\n", nl)))
+            done.setdefault(doc, []).append(parts)
+            if in_flow:
+                flow_parents.add((doc, parts[:-1]))
+        else:
+            n = len(pending)
+        # right to left; equal offsets: later op first, so inserts keep op order
+        for start, end, _, new in sorted(edits, key=lambda e: (e[0], e[2]), reverse=True):
+            text = text[:start] + new + text[end:]
+        pending = pending[n:]
+    return text
+
+
+# --- files -----------------------------------------------------------------
+
+def _diff_counts(old: str, new: str) -> Tuple[int, int]:
+    added = removed = 0
+    for ln in difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=0):
+        if ln.startswith("+") and not ln.startswith("+++"):
+            added += 1
+        elif ln.startswith("-") and not ln.startswith("---"):
+            removed += 1
+    return added, removed
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Write via a temp file in the same directory + rename, keeping the file mode."""
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        try:
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def apply_file(path: str, ops: List[dict], write: bool = True) -> FileResult:
+    """Apply ops to one file (all or nothing)."""
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            text = f.read()
+    except OSError as e:
+        return FileResult(path, len(ops), False, error=f"cannot read: {e}")
+    manifest = parse_manifest(text, path)
+    if not manifest.ok:
+        return FileResult(path, len(ops), False, error=f"yaml parse error: {manifest.error}")
+    for op in ops:
+        try:
+            compile_pointer(op.get("path"))
+        except PointerError as e:
+            return FileResult(path, len(ops), False, error=f"invalid path {op.get('path')!r}: {e}")
+    expected, routed = route_batch(manifest.docs, ops)
+    for i, (ok, reason, _) in enumerate(routed, 1):
+        if not ok:
+            return FileResult(path, len(ops), False, error=f"op {i}: {reason}")
+    try:
+        new_text = splice(text, ops, [doc for _, _, doc in routed])
+        if loader.load_all(new_text) != expected:
+            raise ApplyError("edited text does not load back to the patched documents")
+    except (ApplyError, yaml.YAMLError) as e:
+        return FileResult(path, len(ops), False, error=str(e))
+    added, removed = _diff_counts(text, new_text)
+    changed = new_text != text
+    if write and changed:
+        try:
+            write_atomic(path, new_text)
+        except OSError as e:
+            return FileResult(path, len(ops), False, error=f"cannot write: {e}")
+    return FileResult(path, len(ops), True, changed, added, removed)
+
+
+def group_envelopes(envelopes: List[dict], root: Optional[str] = None) -> List[Tuple[str, List[dict]]]:
+    """(path, ops) per file, in first-seen order; ops keep their envelope order."""
+    by_file: Dict[str, List[dict]] = {}
+    for env in envelopes:
+        file = env.get("file")
+        if not file:
+            continue
+        path = str(pathlib.Path(root) / file) if root else str(file)
+        by_file.setdefault(path, []).extend(env.get("ops", []))
+    return list(by_file.items())
+
+
+def _apply_job(job: Tuple[str, List[dict], bool]) -> FileResult:
+    return apply_file(*job)
+
+
+def apply_files(groups: List[Tuple[str, List[dict]]], jobs: int = 1, write: bool = True) -> List[FileResult]:
+    """Apply each (path, ops) group; results in input order."""
+    from src.scan.worker import _init_worker, resolve_jobs
+    jobs = resolve_jobs(jobs)
+    work = [(path, ops, write) for path, ops in groups]
+    if jobs <= 1 or len(work) <= 1:
+        return [_apply_job(w) for w in work]
+    chunksize = max(1, min(64, len(work) // (jobs * 8)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(loader.backend(),)) as pool:
+        return list(pool.map(_apply_job, work, chunksize=chunksize))
+
+
+__all__ = ["ApplyError", "FileResult", "apply_file", "apply_files", "group_envelopes",
+           "splice", "write_atomic"]
@@ -1,7 +1,17 @@
 # src/patch/dryrun.py
-from typing import Any, List, Tuple
-import copy
-import yaml
+"""Dry-run of JSON Patch ops against parsed manifests.
+
+Ops are applied with copy-on-write path copying: each op copies only the
+containers on its pointer path and shares everything else with the parsed
+manifest, which is never mutated. Within one batch, containers already copied
+are updated in place, so a batch of N ops on a document costs about N pointer
+walks rather than N deep copies.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from src.manifest.document import ManifestSource, ensure_manifest
+from src.patch.pointer import Pointer, PointerError, compile_pointer, format_pointer
+
+Owned = Dict[int, Any]  # id -> container copied during the current batch
 
 
 def _json_pointer_exists(doc: Any, pointer: str) -> Tuple[bool, Any, Any, str]:
@@ -9,58 +19,68 @@ def _json_pointer_exists(doc: Any, pointer: str) -> Tuple[bool, Any, Any, str]:
     Returns (exists, parent, key_or_index, reason) for a single YAML doc.
     If pointer exists, parent is the container holding the target, and key_or_index is the final step.
     """
-    if not pointer.startswith("/"):
-        return False, None, None, "pointer must start with /"
-    cur = doc
-    parent = None
-    key = None
-    parts = [p for p in pointer.split("/")[1:] if p != ""]
-    for i, p in enumerate(parts):
-        parent = cur
-        key = p
-        if isinstance(cur, list):
-            try:
-                idx = int(p)
-            except ValueError:
-                return False, None, None, f"non-int index {p}"
-            if idx < 0 or idx >= len(cur):
-                return False, None, None, f"list index out of range: {p}"
-            cur = cur[idx]
-        elif isinstance(cur, dict):
-            if p not in cur:
-                if i == len(parts) - 1:
-                    # last step can be created for 'add'
-                    return False, parent, key, "final step missing"
-                return False, None, None, f"missing key: {p}"
-            cur = cur[p]
+    try:
+        ptr = compile_pointer(pointer)
+    except PointerError as e:
+        return False, None, None, str(e)
+    return ptr.parent(doc)
+
+
+def _own(node: Any, owned: Owned) -> Any:
+    """Shallow copy of a container unless this batch already owns it."""
+    if id(node) in owned:
+        return node
+    node = dict(node) if isinstance(node, dict) else list(node)
+    owned[id(node)] = node  # keeps the copy alive, so its id stays unique
+    return node
+
+
+def _assoc(doc: Any, ptr: Pointer, val: Any, owned: Owned) -> Any:
+    """New root with val stored at ptr; only containers along the path are copied
+    (path copying), untouched subtrees are shared with `doc`."""
+    root = _own(doc, owned)
+    cur = root
+    for p, idx in zip(ptr.parts[:-1], ptr.indices):
+        k = idx if isinstance(cur, list) else p
+        child = _own(cur[k], owned)
+        cur[k] = child
+        cur = child
+    if isinstance(cur, list):
+        idx = ptr.indices[-1]
+        if idx == len(cur):
+            cur.append(val)
         else:
-            return False, None, None, "mid-node is neither list nor dict"
-    return True, parent, key, ""
+            cur[idx] = val
+    else:
+        cur[ptr.parts[-1]] = val
+    return root
 
 
-def _apply_single_op(doc: Any, op: dict) -> Tuple[bool, Any, str]:
+def _apply_op(doc: Any, op: dict, owned: Owned) -> Tuple[bool, Any, str]:
     """
-    Apply a single JSON Patch op to a YAML doc (supports add/replace).
-    Returns (ok, new_doc, reason).
+    Apply a single JSON Patch op (add/replace) with copy-on-write.
+    `doc` is never mutated unless its containers are in `owned` (copies made
+    earlier in the same batch). Returns (ok, new_doc, reason).
     """
-    new_doc = copy.deepcopy(doc)
     o, path, val = op.get("op"), op.get("path"), op.get("value")
     if o not in ("add", "replace"):
         return False, doc, f"unsupported op: {o}"
-    exists, parent, key, reason = _json_pointer_exists(new_doc, path)
+    try:
+        ptr = compile_pointer(path)
+    except PointerError as e:
+        if o == "replace":
+            return False, doc, f"replace path not found: {e}"
+        return False, doc, str(e) if isinstance(path, str) and path.startswith("/") else "cannot add at root via pointer"
+    # validate against the current doc (read only), then copy the path on success
+    exists, parent, key, reason = ptr.parent(doc)
     # replace requires existing
     if o == "replace":
         if not exists:
             return False, doc, f"replace path not found: {reason or path}"
         if isinstance(parent, list):
-            try:
-                idx = int(key)
-            except ValueError:
+            if ptr.indices[-1] is None:
                 return False, doc, f"invalid list index: {key}"
-            parent[idx] = val
-        elif isinstance(parent, dict):
-            parent[key] = val
-        else:
+        elif not isinstance(parent, dict):
             return False, doc, "replace parent is not list/dict"
     # add: allow creating the final step if missing
     elif o == "add":
@@ -71,82 +91,242 @@ def _apply_single_op(doc: Any, op: dict) -> Tuple[bool, Any, str]:
         if parent is None:
             return False, doc, "cannot add at root via pointer"
         if isinstance(parent, list):
-            try:
-                idx = int(key)
-            except ValueError:
+            idx = ptr.indices[-1]
+            if idx is None:
                 return False, doc, f"invalid list index for add: {key}"
-            if idx == len(parent):
-                parent.append(val)
-            elif 0 <= idx < len(parent):
+            if 0 <= idx < len(parent):
                 # adding into existing index is ambiguous -> forbid
                 return False, doc, "add at existing list index forbidden"
-            else:
+            if idx != len(parent):
                 return False, doc, "add index out of range"
         elif isinstance(parent, dict):
             if key in parent:
                 return False, doc, "add key already exists"
-            parent[key] = val
         else:
             return False, doc, "add parent is not list/dict"
-    return True, new_doc, ""
+    return True, _assoc(doc, ptr, val, owned), ""
+
+
+def _apply_single_op(doc: Any, op: dict) -> Tuple[bool, Any, str]:
+    """
+    Apply a single JSON Patch op to a YAML doc (supports add/replace).
+    Returns (ok, new_doc, reason); `doc` itself is left untouched.
+    """
+    return _apply_op(doc, op, {})
+
+
+# Source location carried by ops built from violations; not part of RFC 6902.
+OP_LOCATION_KEYS = ("doc_index", "line")
+
+
+def strip_location(op: dict) -> dict:
+    """Copy of op without OP_LOCATION_KEYS (what gets written to patch files)."""
+    return {k: v for k, v in op.items() if k not in OP_LOCATION_KEYS}
+
+
+class _Touched:
+    """Paths written by accepted ops on one document (for conflict detection)."""
+
+    def __init__(self):
+        self.paths = set()  # parts tuples of accepted ops
+        self.prefixes = set()  # every prefix of those, including the full path
+
+    def conflict(self, parts: Tuple[str, ...]) -> str:
+        """Pointer of an earlier op on, above or below `parts`, or ""."""
+        if parts in self.prefixes:
+            below = next((p for p in self.paths if p[:len(parts)] == parts), parts)
+            return format_pointer(below)
+        for k in range(len(parts)):
+            if parts[:k] in self.paths:
+                return format_pointer(parts[:k])
+        return ""
+
+    def add(self, parts: Tuple[str, ...]) -> None:
+        self.paths.add(parts)
+        for k in range(len(parts) + 1):
+            self.prefixes.add(parts[:k])
+
 
+def _route(docs: List[Any], op: dict, owned: List[Owned], touched: Optional[List[_Touched]] = None) -> Tuple[bool, str, int]:
+    """Apply one op to the batch's docs in place (roots are replaced, never mutated).
+    Ops with a doc_index go to that document only; others go to the first document
+    that accepts them. Returns (ok, reason, index of the document that took the op,
+    or -1); the reason on failure comes from the last document tried.
+    With `touched`, an op on the same path as an earlier accepted op on that
+    document, or above or below it, is rejected as a conflict."""
+    parts = None
+    if touched is not None:
+        try:
+            parts = compile_pointer(op.get("path")).parts
+        except PointerError:
+            pass  # _apply_op reports it
 
-def dry_run_apply(yaml_text: str, ops: List[dict]) -> Tuple[bool, str]:
+    def attempt(i: int) -> Tuple[bool, str]:
+        if parts is not None:
+            other = touched[i].conflict(parts)
+            if other:
+                return False, f"conflicts with earlier op on {other}"
+        ok, new_doc, reason = _apply_op(docs[i], op, owned[i])
+        if ok:
+            docs[i] = new_doc
+            if parts is not None:
+                touched[i].add(parts)
+        return ok, reason
+
+    target = op.get("doc_index")
+    if isinstance(target, int) and not isinstance(target, bool):
+        if not 0 <= target < len(docs):
+            return False, f"doc_index out of range: {target}", -1
+        ok, reason = attempt(target)
+        return ok, reason, target if ok else -1
+    last_reason = "no doc matched"
+    for i in range(len(docs)):
+        ok, reason = attempt(i)
+        if ok:
+            return True, "", i
+        last_reason = reason
+    return False, last_reason, -1
+
+
+def dry_run_batch(yaml_text: ManifestSource, ops: List[dict], conflicts: bool = False) -> List[Tuple[bool, str]]:
+    """
+    Validate a whole op batch in one pass over one parsed manifest; returns
+    (ok, reason) per op, in order. Each op sees the effect of the earlier ops that
+    succeeded; a failed op leaves the documents unchanged. With conflicts=True,
+    ops overlapping an earlier accepted op's path on the same document fail too.
+    """
+    manifest = ensure_manifest(yaml_text)
+    if not manifest.ok:
+        return [(False, f"yaml parse error: {manifest.error}")] * len(ops)
+    return apply_batch(manifest.docs, ops, conflicts)[1]
+
+
+def apply_batch(docs: List[Any], ops: List[dict], conflicts: bool = False) -> Tuple[List[Any], List[Tuple[bool, str]]]:
+    """Copy-on-write application of ops to docs (not mutated); returns (new_docs, per-op results)."""
+    docs, routed = route_batch(docs, ops, conflicts)
+    return docs, [(ok, reason) for ok, reason, _ in routed]
+
+
+def route_batch(docs: List[Any], ops: List[dict], conflicts: bool = False) -> Tuple[List[Any], List[Tuple[bool, str, int]]]:
+    """Like apply_batch, with the index of the document each op was applied to (-1 on failure)."""
+    docs = list(docs)
+    owned: List[Owned] = [{} for _ in docs]
+    touched = [_Touched() for _ in docs] if conflicts else None
+    results = []
+    for op in ops:
+        ok, reason, target = _route(docs, op, owned, touched)
+        results.append((ok, "" if ok else f"dry-run failed: {reason}", target))
+    return docs, results
+
+
+def dry_run_apply(yaml_text: ManifestSource, ops: List[dict]) -> Tuple[bool, str]:
     """
     Try to apply ops to one of the YAML docs in the stream. All ops must succeed
     (each applies to whichever doc contains its path). Returns (ok, reason).
+    Ops carrying a doc_index are applied to that document only.
+    Accepts raw YAML text or a ParsedManifest (which is never mutated).
     """
-    try:
-        docs = list(yaml.safe_load_all(yaml_text))
-    except Exception as e:
-        return False, f"yaml parse error: {e}"
-
-    # For simplicity, attempt each op against all docs until one succeeds.
+    manifest = ensure_manifest(yaml_text)
+    if not manifest.ok:
+        return False, f"yaml parse error: {manifest.error}"
+    docs = list(manifest.docs)
+    owned: List[Owned] = [{} for _ in docs]
     for op in ops:
-        applied = False
-        last_reason = "no doc matched"
-        for i in range(len(docs)):
-            ok, new_doc, reason = _apply_single_op(docs[i], op)
-            if ok:
-                docs[i] = new_doc
-                applied = True
-                break
-            last_reason = reason
-        if not applied:
-            return False, f"dry-run failed: {last_reason}"
+        ok, reason, _ = _route(docs, op, owned)
+        if not ok:
+            return False, f"dry-run failed: {reason}"
     return True, ""
 
 
-def dry_run_validate(patches: List[dict], manifests_root: str = None, strict: bool = False) -> List[dict]:
+def _validate_file(path: str, op_lists: List[List[dict]]) -> Optional[List[Tuple[bool, str]]]:
+    """Parse one file once and dry-run each envelope's ops against it (independently).
+    None if the file does not exist."""
+    from pathlib import Path
+    from src.manifest.document import parse_manifest
+
+    fpath = Path(path)
+    if not fpath.exists():
+        return None
+    manifest = parse_manifest(fpath.read_text(encoding="utf-8"), path)
+    return [dry_run_apply(manifest, ops) for ops in op_lists]
+
+
+def _validate_chunk(groups: List[Tuple[str, List[List[dict]]]]) -> List[Optional[List[Tuple[bool, str]]]]:
+    return [_validate_file(path, op_lists) for path, op_lists in groups]
+
+
+def dry_run_validate(patches: List[dict], manifests_root: str = None, strict: bool = False, jobs: int = 1) -> List[dict]:
     """
     Validate a list of patch envelopes (as produced by build_patch_ops).
-    For each envelope attempt to load the referenced file and run dry_run_apply.
-    Returns list of results: {file, resource, success, details}
+    Envelopes are grouped by resolved file; each file is read and parsed once and
+    every envelope's ops are dry-run against it on their own (dry_run_apply).
+    With jobs > 1 (0 = one per CPU) files are validated in a process pool.
+    Returns list of results in envelope order: {file, resource, success, details}.
+    With strict, raises at the first failing envelope (in envelope order) and
+    cancels validation of the remaining files.
     """
-    results = []
+    import os
+    from concurrent.futures import ProcessPoolExecutor
     from pathlib import Path
+    from src.manifest import loader
+    from src.scan.worker import _init_worker, resolve_jobs
 
-    for p in patches:
+    fpaths = []
+    groups: Dict[str, List[int]] = {}  # resolved path -> envelope positions
+    for i, p in enumerate(patches):
         file = p.get("file")
-        resource = p.get("resource")
-        ops = p.get("ops", [])
         # locate file
-        if manifests_root:
-            fpath = Path(manifests_root) / file
-        else:
-            fpath = Path(file)
-        if not fpath.exists():
+        fpath = Path(manifests_root) / file if manifests_root else Path(file)
+        fpaths.append(fpath)
+        groups.setdefault(os.path.realpath(fpath), []).append(i)
+    work = {key: (str(fpaths[pos[0]]), [patches[i].get("ops", []) for i in pos])
+            for key, pos in groups.items()}
+    slot = {i: (key, n) for key, pos in groups.items() for n, i in enumerate(pos)}
+
+    jobs = resolve_jobs(jobs)
+    pool = None
+    if jobs > 1 and len(work) > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                   initargs=(loader.backend(),))
+        keys = list(work)
+        size = max(1, min(64, len(keys) // (jobs * 8)))
+        futures = {}
+        for c in range(0, len(keys), size):
+            fut = pool.submit(_validate_chunk, [work[k] for k in keys[c:c + size]])
+            for n, k in enumerate(keys[c:c + size]):
+                futures[k] = (fut, n)
+    done: Dict[str, Optional[List[Tuple[bool, str]]]] = {}
+
+    def group_result(key):
+        if key not in done:
+            if pool is None:
+                done[key] = _validate_file(*work[key])
+            else:
+                fut, n = futures[key]
+                done[key] = fut.result()[n]
+        return done[key]
+
+    results = []
+    try:
+        for i, p in enumerate(patches):
+            key, n = slot[i]
+            resource = p.get("resource")
+            fpath = fpaths[i]
+            outcome = group_result(key)
+            if outcome is None:
+                res = {"file": str(fpath), "resource": resource,
+                       "success": False, "details": "file not found"}
+                results.append(res)
+                if strict:
+                    raise FileNotFoundError(str(fpath))
+                continue
+            ok, reason = outcome[n]
             res = {"file": str(fpath), "resource": resource,
-                   "success": False, "details": "file not found"}
+                   "success": ok, "details": reason}
             results.append(res)
-            if strict:
-                raise FileNotFoundError(str(fpath))
-            continue
-        text = fpath.read_text(encoding="utf-8")
-        ok, reason = dry_run_apply(text, ops)
-        res = {"file": str(fpath), "resource": resource,
-               "success": ok, "details": reason}
-        results.append(res)
-        if strict and not ok:
-            raise RuntimeError(f"dry-run failed for {fpath}: {reason}")
+            if strict and not ok:
+                raise RuntimeError(f"dry-run failed for {fpath}: {reason}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
     return results
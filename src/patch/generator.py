@@ -1,5 +1,5 @@
 # src/patch/generator.py
-from typing import List, Dict, Set, Optional, Tuple
+from typing import Iterable, List, Dict, Set, Optional, Tuple
 from src.config import get_config
 
 
@@ -38,6 +38,14 @@ def sc001_patch_ops(yaml_text: str, use_live: bool = False) -> Tuple[List[Dict],
     return ops, chosen, (live or set())
 
 
+def _copy_location(violation: Dict, op: Dict) -> None:
+    """Carry the violation's doc_index/line over to its op (used by dry-run routing;
+    write_patch_json leaves them out of patch files)."""
+    for k in ("doc_index", "line"):
+        if k in violation:
+            op[k] = violation[k]
+
+
 def build_patches(violations: List[Dict], use_live: bool = False) -> List[Dict]:
     """
     Return JSON Patch ops for auto-fixable rules.
@@ -49,6 +57,7 @@ def build_patches(violations: List[Dict], use_live: bool = False) -> List[Dict]:
     for v in violations:
         if v.get("id") == "SC001":
             op = {"op": "replace", "path": v["path"], "value": sc, "file": v["file"]}
+            _copy_location(v, op)
             if use_live:
                 sc_ops, chosen_sc, live_set = sc001_patch_ops(
                     "", use_live=True)
@@ -88,6 +97,7 @@ def build_patch_ops(violations: List[Dict], use_live: bool = False) -> List[Dict
                 # fallback to config default
                 desired = get_config().get("defaultSC", "managed-csi")
             op = {"op": "replace", "path": path, "value": desired}
+            _copy_location(v, op)
             env = {"file": file, "resource": {"kind": v.get(
                 "kind"), "name": v.get("name")}, "ops": [op]}
             envelopes.append(env)
@@ -105,6 +115,7 @@ def build_patch_ops(violations: List[Dict], use_live: bool = False) -> List[Dict
             else:
                 # replace entire resources block
                 op = {"op": "replace", "path": v["path"], "value": desired}
+            _copy_location(v, op)
             env = {"file": v.get("file"), "resource": {"kind": v.get(
                 "kind"), "name": v.get("name")}, "ops": [op]}
             envelopes.append(env)
@@ -114,9 +125,24 @@ def build_patch_ops(violations: List[Dict], use_live: bool = False) -> List[Dict
     return envelopes
 
 
-def write_patch_json(patches: List[Dict], out_path: str):
+def write_patch_json(patches: Iterable[Dict], out_path: str, fmt: str = "json"):
+    """Write patch envelopes as a JSON array, or with fmt="ndjson" one envelope per
+    line, written as the iterable is consumed. Ops are written as plain RFC 6902:
+    location keys (doc_index, line) used for dry-run routing are stripped."""
     import json
     from pathlib import Path
-
+    from src.patch.dryrun import strip_location
+
+    patches = ({**env, "ops": [strip_location(op) for op in env.get("ops", [])]} for env in patches)
+
+    if fmt == "ndjson":
+        from src.report.stream import NdjsonStream
+        out = NdjsonStream(open(out_path, "w", encoding="utf-8"))
+        try:
+            for env in patches:
+                out.write(env)
+        finally:
+            out.close()
+        return
     p = Path(out_path)
-    p.write_text(json.dumps(patches, indent=2), encoding="utf-8")
+    p.write_text(json.dumps(list(patches), indent=2), encoding="utf-8")
@@ -1,10 +1,15 @@
 # src/patch/llm/runner.py
+import copy
 import json
-from typing import List, Tuple
-import yaml
-from src.patch.llm.validator import validate_sc002_ops
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.manifest.document import ManifestSource, ensure_manifest
+from src.patch.llm.validator import validate_sc002_ops, validate_sc002_shape
 from src.config import get_config
-from src.llm.providers import ollama_generate
+from src.llm.providers import generate_options, ollama_generate
+from src.llm.cache import cached_generate
+from src.llm.logger import log_llm
 
 
 def DEFAULT_OP(path: str):
@@ -25,57 +30,179 @@ def _extract_container_path(kind: str, index: int) -> str:
     return f"/spec/containers/{index}"  # Pod
 
 
-def suggest_sc002_ops(kind: str, container_index: int, yaml_text: str, file_path: str) -> Tuple[List[dict], str]:
+PATH_PLACEHOLDER = "<CONTAINER_PATH>"
+
+
+def sc002_prompt(kind: str) -> str:
+    """SC002 prompt for `kind` with the container path left as PATH_PLACEHOLDER,
+    so every container of the same kind shares one prompt (and one LLM answer)."""
+    return f"""You are a Kubernetes migration assistant.
+TASK: Output ONLY a valid JSON Patch (RFC 6902) as a JSON array, nothing else.
+Context: A {kind} manifest is missing requests/limits at {PATH_PLACEHOLDER}.
+Constraints:
+- Use 'add' op targeting "{PATH_PLACEHOLDER}/resources".
+- Keep {PATH_PLACEHOLDER} literally in the path; it is filled in later.
+- Include: requests.cpu, requests.memory, limits.cpu, limits.memory.
+- Values: cpu requests 100m, memory 128Mi, cpu limits 200m, memory 256Mi.
+Output: JSON array only, no code fences, no explanations.
+"""
+
+
+def rebind_ops(ops, container_path: str):
+    """Copy of template ops with PATH_PLACEHOLDER replaced by container_path in each op path.
+    Anything that is not a list of ops is returned as is (validation rejects it)."""
+    if not isinstance(ops, list):
+        return ops
+    out = []
+    for op in ops:
+        op = copy.deepcopy(op)
+        if isinstance(op, dict) and isinstance(op.get("path"), str):
+            op["path"] = op["path"].replace(PATH_PLACEHOLDER, container_path)
+        out.append(op)
+    return out
+
+
+def _parse_template(raw: str) -> Tuple[Optional[list], str]:
+    """(ops, "") if raw is a JSON Patch of the right shape at PATH_PLACEHOLDER, else (None, reason)."""
+    try:
+        ops = json.loads(raw)
+    except Exception as e:
+        return None, f"invalid json: {e}"
+    ok, reason = validate_sc002_shape(ops, PATH_PLACEHOLDER)
+    return (ops, "") if ok else (None, reason)
+
+
+def _template_answer(kind: str, file_path: str) -> Tuple[Optional[list], str]:
+    """
+    Ask the model with the path-free SC002 prompt (max 2 tries). An answer is
+    accepted once it has the right shape at PATH_PLACEHOLDER (validate_sc002_shape);
+    checks against a manifest are left to each container (_rebound_or_default),
+    so one container that already has resources does not reject the answer for all.
+    Returns (template_ops, "") or (None, reason).
+    """
+    model = get_config().get("llm_model", "llama3.2:latest")
+    base_prompt = sc002_prompt(kind)
+    reason = "no valid patch"
+    for attempt in range(2):  # max 2 tries
+        prompt = base_prompt if attempt == 0 else base_prompt + \
+            "\n\nREMINDER: Output must be JSON array only."
+        raw = cached_generate(model, prompt, ollama_generate, options=generate_options(),
+                              accept=lambda out: _parse_template(out)[0] is not None)
+        log_llm({"file": file_path, "rule": "SC002",
+                 "stage": f"llm_raw_try{attempt+1}", "ok": True, "raw": raw[:400]})
+        ops, reason = _parse_template(raw)
+        if ops is not None:
+            return ops, ""
+    return None, reason
+
+
+def _rebound_or_default(template: Optional[list], reason: str, container_path: str,
+                        manifest, file_path: str) -> Tuple[List[dict], str]:
+    if template is not None:
+        ops = rebind_ops(template, container_path)
+        ok, reason = validate_sc002_ops(ops, container_path, manifest)
+        if ok:
+            return ops, ""
+    log_llm({"file": file_path, "rule": "SC002", "stage": "llm_fallback",
+             "ok": False, "reason": reason})
+    # fallback to deterministic defaults so demo still shows "auto"
+    return DEFAULT_OP(container_path), "llm failed, used defaults"
+
+
+def suggest_sc002_ops(kind: str, container_index: int, yaml_text: ManifestSource, file_path: str) -> Tuple[List[dict], str]:
     """
     Generate SC002 JSON Patch ops using LLM or fallback to default.
+    yaml_text may be raw text or a ParsedManifest (reused across both tries).
     Returns (ops, reason_if_empty)
     """
     container_path = _extract_container_path(kind, container_index)
     cfg = get_config()
     if cfg.get("llm") == "ollama":
-        model = cfg.get("llm_model", "llama3.2:latest")
-        base_prompt = f"""You are a Kubernetes migration assistant.
-TASK: Output ONLY a valid JSON Patch (RFC 6902) as a JSON array, nothing else.
-Context: A {kind} manifest is missing requests/limits at {container_path}.
-Constraints:
-- Use 'add' op targeting "{container_path}/resources".
-- Include: requests.cpu, requests.memory, limits.cpu, limits.memory.
-- Values: cpu requests 100m, memory 128Mi, cpu limits 200m, memory 256Mi.
-Output: JSON array only, no code fences, no explanations.
-"""
-        reason = "no valid patch"
-        for attempt in range(2):  # max 2 tries
-            prompt = base_prompt if attempt == 0 else base_prompt + \
-                "\n\nREMINDER: Output must be JSON array only."
-            raw = ollama_generate(model, prompt)
-            try:
-                from src.cli.main import _log_llm
-                _log_llm({"file": file_path, "rule": "SC002",
-                         "stage": f"llm_raw_try{attempt+1}", "ok": True, "raw": raw[:400]})
-            except ImportError:
-                pass  # fallback if _log_llm not accessible
-            try:
-                ops = json.loads(raw)
-                ok, reason = validate_sc002_ops(ops, container_path, yaml_text)
-                if ok:
-                    return ops, ""
-            except Exception as e:
-                reason = f"invalid json: {e}"
-        # after both attempts failed
-        try:
-            from src.cli.main import _log_llm
-            _log_llm({
-                "file": file_path,
-                "rule": "SC002",
-                "stage": "llm_fallback",
-                "ok": False,
-                "reason": reason
-            })
-        except ImportError:
-            pass  # fallback if _log_llm not accessible
-        # fallback to deterministic defaults so demo still shows "auto"
-        ops = DEFAULT_OP(container_path)
-        return ops, "llm failed, used defaults"
+        manifest = ensure_manifest(yaml_text)
+        template, reason = _template_answer(kind, file_path)
+        return _rebound_or_default(template, reason, container_path, manifest, file_path)
     else:
         ops = DEFAULT_OP(container_path)
         return ops, ""
+
+
+class _Rebound:
+    """One container's share of a template answer; result() rebinds and validates it."""
+
+    def __init__(self, group: Future, container_path: str, manifest, file_path: str):
+        self._group = group
+        self._args = (container_path, manifest, file_path)
+
+    def result(self) -> Tuple[List[dict], str]:
+        template, reason = self._group.result()
+        return _rebound_or_default(template, reason, *self._args)
+
+
+class SC002Lane:
+    """
+    SC002 suggestions with one LLM call per distinct prompt. The prompt only
+    depends on the kind (see sc002_prompt), so containers are grouped by it:
+    the first container of a group asks the model, and every member rebinds
+    the answer to its own path and validates it with validate_sc002_ops.
+    Calls run on up to `concurrency` threads (config llm_concurrency) while the
+    LLM is enabled; otherwise each request resolves inline on submit.
+    Results resolve to (ops, reason) and never raise: a failed request falls
+    back to DEFAULT_OP. Each LLM call logs its queue wait and latency.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None):
+        cfg = get_config()
+        self._llm = cfg.get("llm") == "ollama"
+        n = int(concurrency if concurrency is not None else cfg.get("llm_concurrency", 4))
+        self._executor = ThreadPoolExecutor(max_workers=n, thread_name_prefix="sc002") \
+            if self._llm and n > 1 else None
+        self._groups: Dict[str, Future] = {}
+        self.requests = 0
+
+    def submit(self, kind: str, container_index: int, yaml_text: ManifestSource, file_path: str):
+        container_path = _extract_container_path(kind, container_index)
+        if not self._llm:
+            fut: Future = Future()
+            fut.set_result((DEFAULT_OP(container_path), ""))
+            return fut
+        self.requests += 1
+        manifest = ensure_manifest(yaml_text)
+        key = sc002_prompt(kind)
+        group = self._groups.get(key)
+        if group is None:
+            args = (kind, file_path, time.perf_counter())
+            if self._executor is not None:
+                group = self._executor.submit(self._ask, *args)
+            else:
+                group = Future()
+                group.set_result(self._ask(*args))
+            self._groups[key] = group
+        return _Rebound(group, container_path, manifest, file_path)
+
+    def _ask(self, kind, file_path, queued):
+        start = time.perf_counter()
+        ok = True
+        try:
+            return _template_answer(kind, file_path)
+        except Exception as e:  # never lose a container: members use the defaults
+            ok = False
+            return None, f"llm error: {e}"
+        finally:
+            end = time.perf_counter()
+            log_llm({"file": file_path, "rule": "SC002", "stage": "llm_timing", "ok": ok,
+                     "queue_ms": round((start - queued) * 1000, 2),
+                     "latency_ms": round((end - start) * 1000, 2)})
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self.requests:
+            log_llm({"rule": "SC002", "stage": "llm_dedup", "requests": self.requests,
+                     "llm_calls": len(self._groups)})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -1,5 +1,8 @@
 import json
-from src.llm.providers import ollama_generate
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from src.llm.providers import generate_options, ollama_generate
+from src.llm.cache import cached_generate
 from src.config import get_config
 from src.llm.logger import log_llm
 
@@ -22,10 +25,16 @@ suggest ONE safe example YAML snippet (only the fields to add) for AKS:
 IMPORTANT:
 - Output YAML only, no prose, no code fences.
 - Keep it minimal and generic; do not include unrelated fields."""
-    raw = ollama_generate(model, prompt).strip()
+    raw = cached_generate(model, prompt, ollama_generate, options=generate_options(),
+                          accept=lambda out: bool(_clean_preview(out))).strip()
     log_llm({"file": file_path, "rule": "SC003",
              "stage": "llm_suggest", "ok": True, "raw": raw[:400]})
+    return _clean_preview(raw)
 
+
+def _clean_preview(raw: str) -> str:
+    """Strip code fences from a preview answer; "" unless it looks like YAML."""
+    raw = raw.strip()
     # Clean up the response: remove code fences and extract YAML
     if raw.startswith("```"):
         # Extract content between code fences
@@ -44,3 +53,85 @@ IMPORTANT:
     if ":" not in raw:
         return ""
     return raw
+
+
+def preview_key(v: dict) -> tuple:
+    """Violation shape that determines the SC003 preview prompt."""
+    return ("Ingress", v.get("path"))
+
+
+class PreviewStage:
+    """
+    SC003 previews computed ahead of report rendering. submit() starts one
+    suggest_sc003_preview call per distinct violation shape (memoized, on up to
+    llm_concurrency threads); attach() waits for them and stores the text as
+    v["llm_preview"], which format_violation only prints. The whole run shares
+    a time budget (llm_preview_budget_seconds, counted from the first request);
+    previews not ready by then are left out of the report.
+    Pass `memo` to keep finished previews across runs (watch mode).
+    """
+
+    def __init__(self, budget_seconds=None, concurrency=None, memo=None):
+        cfg = get_config()
+        self._llm = cfg.get("llm") == "ollama"
+        self.budget = float(budget_seconds if budget_seconds is not None
+                            else cfg.get("llm_preview_budget_seconds", 60))
+        self._workers = int(concurrency if concurrency is not None else cfg.get("llm_concurrency", 4))
+        self.memo = memo if memo is not None else {}
+        self._executor = None
+        self._deadline = None
+        self._pending = []
+        self.requests = 0
+        self.calls = 0
+        self.late = 0
+
+    def submit(self, violations) -> None:
+        if not self._llm:
+            return
+        for v in violations:
+            if v.get("id") != "SC003":
+                continue
+            key = preview_key(v)
+            if key not in self.memo:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=max(1, self._workers),
+                                                        thread_name_prefix="sc003")
+                    self._deadline = time.monotonic() + self.budget
+                self.memo[key] = self._executor.submit(
+                    suggest_sc003_preview, v.get("file", "<input>"), "Ingress", v.get("path", "/spec"))
+                self.calls += 1
+            self.requests += 1
+            self._pending.append((v, key))
+
+    def attach(self) -> None:
+        """Set v["llm_preview"] on submitted violations whose preview is ready within the budget."""
+        for v, key in self._pending:
+            fut = self.memo[key]
+            try:
+                remaining = self._deadline - time.monotonic() if self._deadline is not None else 0
+                text = fut.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                self.late += 1
+                continue
+            except Exception:
+                continue  # the preview is optional
+            if text:
+                v["llm_preview"] = text
+        self._pending = []
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            # forget unfinished or failed previews so a later run may retry them
+            for key in [k for k, f in self.memo.items() if not f.done() or f.cancelled() or f.exception()]:
+                del self.memo[key]
+        if self.requests:
+            log_llm({"rule": "SC003", "stage": "llm_preview", "requests": self.requests,
+                     "llm_calls": self.calls, "late": self.late, "budget_s": self.budget})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
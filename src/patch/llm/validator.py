@@ -1,46 +1,25 @@
 # src/patch/llm/validator.py
-from typing import List, Tuple, Any
-import yaml
+from typing import List, Tuple
+from src.manifest.document import ManifestSource, ensure_manifest
+from src.patch.pointer import PointerError, compile_pointer
 
 
-def _json_pointer_exists(yaml_text: str, pointer: str) -> bool:
+def _json_pointer_exists(yaml_text: ManifestSource, pointer: str) -> bool:
     try:
-        for doc in yaml.safe_load_all(yaml_text):
-            cur: Any = doc
-            parts = [p for p in pointer.split("/")[1:]]
-            ok = True
-            for p in parts:
-                if isinstance(cur, list):
-                    try:
-                        i = int(p)
-                    except ValueError:
-                        ok = False
-                        break
-                    if i < 0 or i >= len(cur):
-                        ok = False
-                        break
-                    cur = cur[i]
-                elif isinstance(cur, dict):
-                    if p not in cur:
-                        ok = False
-                        break
-                    cur = cur[p]
-                else:
-                    ok = False
-                    break
-            if ok:
-                return True
-    except Exception:
+        ptr = compile_pointer(pointer)
+    except PointerError:
         return False
-    return False
+    return any(ptr.exists(doc) for doc in ensure_manifest(yaml_text).docs)
 
 
-def validate_sc002_ops(ops: List[dict], container_path: str, yaml_text: str) -> Tuple[bool, str]:
+def validate_sc002_shape(ops: List[dict], container_path: str) -> Tuple[bool, str]:
+    """Checks that need no manifest: one add op at <container_path>/resources with
+    requests/limits values in bounds. container_path may be a placeholder."""
     # 1) basic shape
     if not isinstance(ops, list) or len(ops) == 0:
         return False, "ops must be non-empty list"
     op = ops[0]
-    if not all(k in op for k in ("op", "path", "value")):
+    if not isinstance(op, dict) or not all(k in op for k in ("op", "path", "value")):
         return False, "missing op/path/value"
     # 2) op/path
     if op["op"] != "add":
@@ -57,14 +36,9 @@ def validate_sc002_ops(ops: List[dict], container_path: str, yaml_text: str) ->
         lm = val["limits"]["memory"]
     except Exception:
         return False, "value must include requests.cpu/memory and limits.cpu/memory"
-    # 4) container path exists
-    if not _json_pointer_exists(yaml_text, container_path):
-        return False, "container path not found"
-    # 5) will not overwrite existing
-    # if resources already exists, it's risky in MVP
-    if _json_pointer_exists(yaml_text, expected_path):
-        return False, "resources already present; no overwrite allowed"
-    # 6) bounds (very simple checks)
+    if not all(isinstance(x, str) for x in (rc, rm, lc, lm)):
+        return False, "requests/limits values must be strings"
+    # 4) bounds (very simple checks)
     if rc.endswith("m"):
         try:
             if int(rc[:-1]) > 1000:  # >1 core in millicores
@@ -80,3 +54,18 @@ def validate_sc002_ops(ops: List[dict], container_path: str, yaml_text: str) ->
     if not rm.endswith(("Mi", "Gi")) or not lm.endswith(("Mi", "Gi")):
         return False, "memory units must be Mi/Gi"
     return True, ""
+
+
+def validate_sc002_ops(ops: List[dict], container_path: str, yaml_text: ManifestSource) -> Tuple[bool, str]:
+    ok, reason = validate_sc002_shape(ops, container_path)
+    if not ok:
+        return ok, reason
+    # 5) container path exists
+    manifest = ensure_manifest(yaml_text)  # parse once for both lookups
+    if not _json_pointer_exists(manifest, container_path):
+        return False, "container path not found"
+    # 6) will not overwrite existing
+    # if resources already exists, it's risky in MVP
+    if _json_pointer_exists(manifest, f"{container_path}/resources"):
+        return False, "resources already present; no overwrite allowed"
+    return True, ""
@@ -0,0 +1,129 @@
+# src/patch/pointer.py
+"""Compiled JSON Pointers (RFC 6901).
+
+A pointer string is parsed once into unescaped reference tokens ('~1' -> '/',
+'~0' -> '~'), with list indices precomputed, and memoized by string in an LRU
+cache. Violations, patch ops and suggestions reuse a few hundred distinct
+paths, so dry-run, validation and merge never re-split a pointer.
+
+Empty tokens ('/spec//x', a trailing '/') are skipped, as the walkers this
+replaces did.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+import re
+
+from src.manifest.loader import escape_token
+
+_BAD_ESCAPE = re.compile(r"~(?![01])")
+_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+
+class PointerError(ValueError):
+    pass
+
+
+def unescape_token(token: str) -> str:
+    """RFC 6901 unescaping of a single reference token ('~1' first, then '~0')."""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def format_pointer(parts: Iterable[str]) -> str:
+    """Pointer string for unescaped tokens."""
+    return "".join("/" + escape_token(p) for p in parts)
+
+
+class Pointer:
+    __slots__ = ("text", "parts", "indices")
+
+    def __init__(self, text: str, parts: Tuple[str, ...]):
+        self.text = text
+        self.parts = parts
+        # list index per token (None when the token cannot index a list)
+        self.indices: Tuple[Optional[int], ...] = tuple(
+            int(p) if p.isdigit() and _INDEX.fullmatch(p) else None for p in parts)
+
+    def __repr__(self) -> str:
+        return f"Pointer({self.text!r})"
+
+    def __str__(self) -> str:
+        return self.text
+
+    # equal when they address the same location, e.g. '/a/b' and '/a/b/'
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Pointer) and self.parts == other.parts
+
+    def __hash__(self) -> int:
+        return hash(self.parts)
+
+    def startswith(self, other: "Pointer") -> bool:
+        """True if `other` is this pointer or one of its ancestors."""
+        return self.parts[:len(other.parts)] == other.parts
+
+    def resolve(self, doc: Any) -> Tuple[bool, Any]:
+        """(found, value) of the target in doc."""
+        cur = doc
+        for p, idx in zip(self.parts, self.indices):
+            if isinstance(cur, dict):
+                if p not in cur:
+                    return False, None
+                cur = cur[p]
+            elif isinstance(cur, list):
+                if idx is None or idx >= len(cur):
+                    return False, None
+                cur = cur[idx]
+            else:
+                return False, None
+        return True, cur
+
+    def exists(self, doc: Any) -> bool:
+        return self.resolve(doc)[0]
+
+    def parent(self, doc: Any) -> Tuple[bool, Any, Any, str]:
+        """
+        Returns (exists, parent, key, reason). If the target exists, parent is the
+        container holding it and key its (unescaped) last token. If only the last
+        step is missing from a mapping, parent/key are still returned with reason
+        "final step missing", so the target can be created by 'add'.
+        """
+        cur, parent, key = doc, None, None
+        last = len(self.parts) - 1
+        for i, (p, idx) in enumerate(zip(self.parts, self.indices)):
+            parent, key = cur, p
+            if isinstance(cur, list):
+                if idx is None:
+                    return False, None, None, f"non-int index {p}"
+                if idx >= len(cur):
+                    return False, None, None, f"list index out of range: {p}"
+                cur = cur[idx]
+            elif isinstance(cur, dict):
+                if p not in cur:
+                    if i == last:
+                        return False, parent, key, "final step missing"
+                    return False, None, None, f"missing key: {p}"
+                cur = cur[p]
+            else:
+                return False, None, None, "mid-node is neither list nor dict"
+        return True, parent, key, ""
+
+
+def compile_pointer(text: str) -> Pointer:
+    """Parsed, memoized Pointer for `text`; raises PointerError if it is not a pointer."""
+    if not isinstance(text, str) or not text.startswith("/"):
+        raise PointerError("pointer must start with /")
+    return _compile(text)
+
+
+@lru_cache(maxsize=4096)
+def _compile(text: str) -> Pointer:
+    if _BAD_ESCAPE.search(text):
+        raise PointerError(f"invalid escape in pointer: {text}")
+    parts = [p for p in text.split("/")[1:] if p != ""]
+    if "~" in text:
+        parts = [unescape_token(p) for p in parts]
+    return Pointer(text, tuple(parts))
+
+
+__all__ = ["Pointer", "PointerError", "compile_pointer", "format_pointer", "unescape_token"]
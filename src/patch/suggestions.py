@@ -1,10 +1,11 @@
 from __future__ import annotations
-from typing import List, Dict, Sequence, Any
+from typing import List, Dict, Iterable, Iterator, Sequence, Any
 import json
 from pathlib import Path
 from datetime import datetime
 from src.patch.validator import validate_patch_ops
-from src.llm.logger import log_llm
+from src.llm.logger import LogBuffer
+from src.report.stream import NdjsonStream, is_ndjson, iter_json_records
 
 SCHEMA_VERSION = 1
 
@@ -20,28 +21,73 @@ def _wrap_suggestions(suggestions: List[Dict], rule: str | None) -> Dict:
     }
 
 
-def write_suggestions(suggestions: List[Dict], path: str = "suggestions.json", rule: str | None = None):
-    """Write suggestions file using wrapper schema. Backward compatible reader handles legacy arrays."""
-    wrapped = _wrap_suggestions(suggestions, rule)
+def write_suggestions(suggestions: Iterable[Dict], path: str = "suggestions.json", rule: str | None = None,
+                      fmt: str = "json"):
+    """Write suggestions file using wrapper schema. Backward compatible reader handles legacy arrays.
+    fmt="ndjson" writes a header line and then one suggestion per line (see SuggestionStream)."""
+    if fmt == "ndjson":
+        with SuggestionStream(path, rule) as out:
+            for s in suggestions:
+                out.write(s)
+        return
+    wrapped = _wrap_suggestions(list(suggestions), rule)
     Path(path).write_text(json.dumps(wrapped, indent=2), encoding="utf-8")
 
 
-def load_suggestions(path: str = "suggestions.json") -> List[Dict]:
+class SuggestionStream:
+    """Incremental NDJSON suggestions writer. The first line is the header
+    {schema_version, generated_at, rule, format: "ndjson"}; meta counts are left
+    to readers, since they are only known at the end."""
+
+    def __init__(self, path: str, rule: str | None = None):
+        self._out = NdjsonStream(open(path, "w", encoding="utf-8"))
+        header = _wrap_suggestions([], rule)
+        del header["meta"], header["suggestions"]
+        self._out.write({**header, "format": "ndjson"})
+
+    def write(self, suggestion: Dict) -> None:
+        self._out.write(suggestion)
+
+    def close(self) -> None:
+        self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def iter_suggestions(path: str = "suggestions.json") -> Iterator[Dict]:
+    """Suggestions from a wrapped JSON, legacy array or NDJSON file, read lazily
+    for NDJSON. A missing file yields nothing; malformed content raises ValueError."""
     p = Path(path)
     if not p.exists():
-        return []
-    try:
+        return
+    if not is_ndjson(p):
         data = json.loads(p.read_text(encoding="utf-8"))
+        if isinstance(data, list):  # legacy format
+            yield from data
+        elif isinstance(data, dict) and isinstance(data.get("suggestions"), list):
+            yield from data["suggestions"]
+        return
+    for rec in iter_json_records(p):
+        if isinstance(rec, dict) and "schema_version" in rec:
+            # header line, or a wrapped JSON file written on a single line
+            yield from rec.get("suggestions") or ()
+            continue
+        yield rec
+
+
+def load_suggestions(path: str = "suggestions.json") -> List[Dict]:
+    try:
+        return list(iter_suggestions(path))
     except Exception:
         return []
-    if isinstance(data, list):  # legacy format
-        return data
-    if isinstance(data, dict) and isinstance(data.get("suggestions"), list):
-        return data["suggestions"]
-    return []
 
 
-def filter_approved(all_suggestions: List[Dict], approved: Sequence[int] | None) -> List[Dict]:
+def filter_approved(all_suggestions: Iterable[Dict], approved: Sequence[int] | None) -> List[Dict]:
     if not approved:
         # default: take all valid suggestions
         return [s for s in all_suggestions if s.get("valid")]
@@ -53,6 +99,48 @@ def filter_approved(all_suggestions: List[Dict], approved: Sequence[int] | None)
     return out
 
 
+class _OpIndex:
+    """Per-envelope path index: the first op at each path and the (op, value) pairs seen
+    there, so duplicate and conflict lookups are O(1)."""
+
+    def __init__(self, ops: List[Dict]):
+        self.first: Dict[Any, Dict] = {}
+        self.seen: set = set()
+        for op in ops:
+            self.add(op)
+
+    def add(self, op: Dict) -> None:
+        path = _path_key(op)
+        self.first.setdefault(path, op)
+        self.seen.add((path, op.get("op"), _freeze(op.get("value"))))
+
+    def match(self, op: Dict) -> tuple[bool, Dict | None]:
+        """(is_duplicate, conflict): whether an equal op is already present, else the
+        first op at the same path (which then differs in op or value)."""
+        path = _path_key(op)
+        if (path, op.get("op"), _freeze(op.get("value"))) in self.seen:
+            return True, None
+        return False, self.first.get(path)
+
+
+def _path_key(op: Dict) -> Any:
+    path = op.get("path")
+    return path if isinstance(path, str) else repr(path)  # existing ops are not validated
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable stand-in for a JSON value that compares like the value does."""
+    if isinstance(value, dict):
+        return ("d", frozenset((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("l", tuple(_freeze(v) for v in value))
+    try:
+        hash(value)
+    except TypeError:
+        return ("r", repr(value))
+    return value
+
+
 def merge_suggestions_into_patch(existing_patch: List[Dict], suggestions: List[Dict], collect_details: bool = False) -> tuple[List[Dict], Dict]:
     """
     Merge suggestion envelopes (each with file/resource/ops) into existing patch envelopes.
@@ -61,12 +149,16 @@ def merge_suggestions_into_patch(existing_patch: List[Dict], suggestions: List[D
       - Duplicate path (same op+path+value) skipped silently (counted in stats).
       - Same path different value -> keep last (replace previous by appending; consumer applies sequentially) and count as conflict.
     Returns (new_patch, stats) where stats = {merged, skipped_duplicates, conflicts}.
+    Each touched envelope gets a path index, so a merge is linear in the number of ops.
+    Log events are buffered and written once; adds and duplicates are logged as
+    per-file counts, conflicts individually.
     """
     by_key = {}
     for env in existing_patch:
         key = (env.get("file"), (env.get("resource") or {}).get(
             "kind"), (env.get("resource") or {}).get("name"))
         by_key.setdefault(key, env)
+    indexes: Dict[tuple, _OpIndex] = {}  # built on first use of an envelope
 
     # stats dict: dynamic value types (ints and optional list for details)
     stats: Dict[str, Any] = {"merged": 0,
@@ -74,43 +166,50 @@ def merge_suggestions_into_patch(existing_patch: List[Dict], suggestions: List[D
     if collect_details:
         # list of {file, path, previous, new, previous_op, new_op}
         stats["conflict_details"] = []
+    added: Dict[Any, int] = {}  # file -> ops merged
+    duplicates: Dict[Any, int] = {}  # file -> ops skipped
 
-    for sug in suggestions:
-        file = sug.get("file")
-        res = sug.get("resource") or {}
-        key = (file, res.get("kind"), res.get("name"))
-        ops = sug.get("ops", [])
-        ok, reason = validate_patch_ops(ops)
-        if not ok:
-            log_llm({"event": "merge", "stage": "validate_ops",
-                    "success": False, "reason": reason})
-            continue
-        env = by_key.get(key)
-        if not env:
-            # new envelope
-            env = {"file": file, "resource": res, "ops": []}
-            existing_patch.append(env)
-            by_key[key] = env
-        for op in ops:
-            dup = next((o for o in env["ops"] if o.get("op") == op.get("op") and o.get(
-                "path") == op.get("path") and o.get("value") == op.get("value")), None)
-            if dup:
-                stats["skipped_duplicates"] += 1
-                log_llm({"event": "merge.duplicate",
-                        "file": file, "path": op.get("path")})
+    with LogBuffer() as log:
+        for sug in suggestions:
+            file = sug.get("file")
+            res = sug.get("resource") or {}
+            key = (file, res.get("kind"), res.get("name"))
+            ops = sug.get("ops", [])
+            ok, reason = validate_patch_ops(ops)
+            if not ok:
+                log({"event": "merge", "stage": "validate_ops",
+                     "success": False, "reason": reason})
                 continue
-            conflict = next((o for o in env["ops"] if o.get("path") == op.get("path") and (
-                o.get("value") != op.get("value") or o.get("op") != op.get("op"))), None)
-            if conflict:
-                stats["conflicts"] += 1
-                detail = {"file": file, "path": op.get("path"), "previous": conflict.get(
-                    "value"), "new": op.get("value"), "previous_op": conflict.get("op"), "new_op": op.get("op")}
-                log_llm({"event": "merge.conflict",
-                        "file": file, "path": op.get("path"), "previous": conflict.get("value"), "new": op.get("value")})
-                if collect_details:
-                    stats["conflict_details"].append(detail)
-            env["ops"].append(op)
-            stats["merged"] += 1
-            log_llm({"event": "merge.add", "file": file, "path": op.get("path")})
-    log_llm({"event": "merge.summary", **stats})
+            env = by_key.get(key)
+            if not env:
+                # new envelope
+                env = {"file": file, "resource": res, "ops": []}
+                existing_patch.append(env)
+                by_key[key] = env
+            index = indexes.get(key)
+            if index is None:
+                index = indexes[key] = _OpIndex(env["ops"])
+            for op in ops:
+                dup, conflict = index.match(op)
+                if dup:
+                    stats["skipped_duplicates"] += 1
+                    duplicates[file] = duplicates.get(file, 0) + 1
+                    continue
+                if conflict:
+                    stats["conflicts"] += 1
+                    detail = {"file": file, "path": op.get("path"), "previous": conflict.get(
+                        "value"), "new": op.get("value"), "previous_op": conflict.get("op"), "new_op": op.get("op")}
+                    log({"event": "merge.conflict",
+                         "file": file, "path": op.get("path"), "previous": conflict.get("value"), "new": op.get("value")})
+                    if collect_details:
+                        stats["conflict_details"].append(detail)
+                env["ops"].append(op)
+                index.add(op)
+                stats["merged"] += 1
+                added[file] = added.get(file, 0) + 1
+        for file, n in duplicates.items():
+            log({"event": "merge.duplicate", "file": file, "count": n})
+        for file, n in added.items():
+            log({"event": "merge.add", "file": file, "count": n})
+        log({"event": "merge.summary", **stats})
     return existing_patch, stats
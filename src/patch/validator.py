@@ -1,44 +1,29 @@
 # src/patch/validator.py
-from typing import Any, List, Dict
-import yaml
+from typing import Any, List, Dict, Optional
+from src.manifest.document import ManifestSource, ensure_manifest
+from src.patch.pointer import Pointer, PointerError, compile_pointer
 
 
 def _get_by_pointer(doc: Any, pointer: str) -> tuple[bool, Any]:
-    if not pointer.startswith("/"):
+    try:
+        return compile_pointer(pointer).resolve(doc)
+    except PointerError:
         return False, None
-    cur = doc
-    parts = [p for p in pointer.split("/")[1:] if p != ""]
-    for p in parts:
-        # list index?
-        if isinstance(cur, list):
-            try:
-                idx = int(p)
-            except ValueError:
-                return False, None
-            if idx < 0 or idx >= len(cur):
-                return False, None
-            cur = cur[idx]
-        elif isinstance(cur, dict):
-            if p not in cur:
-                return False, None
-            cur = cur[p]
-        else:
-            return False, None
-    return True, cur
 
 
-def path_exists_in_yaml(yaml_text: str, pointer: str) -> bool:
+def path_exists_in_yaml(yaml_text: ManifestSource, pointer: str, doc_index: Optional[int] = None) -> bool:
     """
-    Returns True if any doc in the YAML stream contains JSON-Pointer `pointer`.
+    Returns True if any doc in the YAML stream (text or ParsedManifest) contains JSON-Pointer `pointer`.
+    With doc_index, only that document is checked.
     """
     try:
-        for doc in yaml.safe_load_all(yaml_text):
-            ok, _ = _get_by_pointer(doc, pointer)
-            if ok:
-                return True
-    except Exception:
+        ptr = compile_pointer(pointer)
+    except PointerError:
         return False
-    return False
+    docs = ensure_manifest(yaml_text).docs
+    if doc_index is not None:
+        docs = docs[doc_index:doc_index + 1]
+    return any(ptr.exists(doc) for doc in docs)
 
 
 # --- Story 2.2 additions: op validation for AI suggestions / merge safety ---
@@ -49,13 +34,23 @@ _FORBIDDEN_PREFIXES = (
     "/status",
 )
 
+_FORBIDDEN_PARTS = tuple(compile_pointer(p).parts for p in _FORBIDDEN_PREFIXES)
+
 PER_SUGGESTION_MAX_OPS = 10  # Story 2.2 Phase 2 cap
 
 
 def is_forbidden_path(path: str) -> bool:
-    if not isinstance(path, str):
+    """True for paths at or under a forbidden prefix (compared token-wise, after
+    unescaping, so '/statusX' is allowed and '/status/' is not) and for non-pointers."""
+    try:
+        ptr = compile_pointer(path)
+    except PointerError:
         return True
-    return any(path.startswith(p) for p in _FORBIDDEN_PREFIXES)
+    return _is_forbidden(ptr)
+
+
+def _is_forbidden(ptr: Pointer) -> bool:
+    return any(ptr.parts[:len(f)] == f for f in _FORBIDDEN_PARTS)
 
 
 def validate_patch_ops(ops: List[Dict]) -> tuple[bool, str]:
@@ -71,9 +66,11 @@ def validate_patch_ops(ops: List[Dict]) -> tuple[bool, str]:
         if op.get("op") not in ("add", "replace"):
             return False, f"unsupported op {op.get('op')}"
         p = op.get("path")
-        if not isinstance(p, str) or not p.startswith("/"):
+        try:
+            ptr = compile_pointer(p)
+        except PointerError:
             return False, "invalid path"
-        if is_forbidden_path(p):
+        if _is_forbidden(ptr):
             return False, f"forbidden path {p}"
         # size guard
         if "value" in op:
@@ -1,35 +1,40 @@
 import json
-import os
 from typing import List
 import numpy as np
 import requests
 from src.config import get_config
+from src.llm.client import LLMUnavailable
+from src.llm.http import post_json
+from src.llm.logger import log_llm
 
 
 def _ollama_embed(texts: List[str], model: str) -> List[List[float]]:
     """
     Embeds a list of texts using a running Ollama instance.
+    Calls share the pooled session, so the texts reuse kept-alive connections.
     """
-    base_url = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
-    url = f"{base_url}/api/embeddings"
-
     results = []
-    # Ollama's /api/embeddings endpoint processes one prompt at a time.
-    for text in texts:
-        payload = {"model": model, "prompt": text}
-        try:
-            response = requests.post(url, json=payload, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            if "embedding" in data:
-                results.append(data["embedding"])
-        except requests.exceptions.RequestException as e:
-            print(
-                f"[ERROR] Ollama embed request failed for text '{text[:50]}...': {e}")
-            # On failure, we can't generate a meaningful embedding.
-            # Returning an empty list will cause the search to find no results.
-            return []
-    return results
+    timing = {}
+    try:
+        # Ollama's /api/embeddings endpoint processes one prompt at a time.
+        for text in texts:
+            payload = {"model": model, "prompt": text}
+            try:
+                data = post_json("/api/embeddings", payload, read_timeout=30, timing=timing)
+                if "embedding" in data:
+                    results.append(data["embedding"])
+            except (requests.exceptions.RequestException, LLMUnavailable) as e:
+                print(
+                    f"[ERROR] Ollama embed request failed for text '{text[:50]}...': {e}")
+                # On failure, we can't generate a meaningful embedding.
+                # Returning an empty list will cause the search to find no results.
+                return []
+        return results
+    finally:
+        log_llm({"event": "http.timing", "endpoint": "embeddings", "model": model,
+                 "texts": len(texts), "connections": timing.get("connections", 0),
+                 "connect_ms": round(timing.get("connect_ms", 0.0), 2),
+                 "total_ms": round(timing.get("total_ms", 0.0), 2)})
 
 
 def _stub_embed(texts: List[str]) -> List[List[float]]:
@@ -0,0 +1,112 @@
+# src/report/stream.py
+"""Incremental writers for the streaming pipeline.
+
+LineStream and JsonArrayStream produce exactly the bytes the batch writers
+produce ("\\n".join(lines) for report.md, json.dumps(list, indent=2) for
+patch.json) without holding the whole document in memory. NdjsonStream writes
+the opt-in NDJSON format (one JSON value per line) for patch and suggestion
+files, and iter_json_records() reads either format lazily.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, TextIO
+import json
+import pathlib
+
+FORMATS = ("json", "ndjson")  # --format values for patch / suggestion files
+
+
+class LineStream:
+    """Writes lines separated by newlines, like "\\n".join(all_lines)."""
+
+    def __init__(self, fh: TextIO):
+        self._fh = fh
+        self._first = True
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        for line in lines:
+            if self._first:
+                self._first = False
+            else:
+                self._fh.write("\n")
+            self._fh.write(line)
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def json_array_item(item: Any) -> str:
+    """One element as json.dumps(list, indent=2) renders it (without the leading indent)."""
+    return json.dumps(item, indent=2).replace("\n", "\n  ")
+
+
+def json_array(items: Iterable[str]) -> str:
+    """Join json_array_item() strings into the text of json.dumps(list, indent=2)."""
+    body = ",\n  ".join(items)
+    return f"[\n  {body}\n]" if body else "[]"
+
+
+class JsonArrayStream:
+    """Writes a JSON array item by item, byte-identical to json.dumps(items, indent=2)."""
+
+    def __init__(self, fh: TextIO):
+        self._fh = fh
+        self.count = 0
+
+    def write(self, item: Any) -> None:
+        self._fh.write(("[\n  " if self.count == 0 else ",\n  ") + json_array_item(item))
+        self.count += 1
+
+    def close(self) -> None:
+        self._fh.write("\n]" if self.count else "[]")
+        self._fh.close()
+
+
+class NdjsonStream:
+    """Writes one compact JSON value per line."""
+
+    def __init__(self, fh: TextIO):
+        self._fh = fh
+        self.count = 0
+
+    def write(self, item: Any) -> None:
+        self._fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+def is_ndjson(path) -> bool:
+    """True if the first non-blank line of the file is a complete JSON object."""
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                try:
+                    return isinstance(json.loads(line), dict)
+                except ValueError:
+                    return False
+    return False
+
+
+def iter_json_records(path) -> Iterator[Any]:
+    """Records of a JSON or NDJSON file (auto-detected), read lazily for NDJSON.
+
+    NDJSON yields one value per non-blank line; a JSON array yields its
+    elements; any other JSON document is yielded as a single record.
+    """
+    if not is_ndjson(path):
+        data = json.loads(pathlib.Path(path).read_text(encoding="utf-8"))
+        if isinstance(data, list):
+            yield from data
+        else:
+            yield data
+        return
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+__all__ = ["FORMATS", "LineStream", "JsonArrayStream", "NdjsonStream", "json_array_item",
+           "json_array", "is_ndjson", "iter_json_records"]
@@ -5,11 +5,11 @@ Design (FR3): Pure functions; no network calls. Ordering stable.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Dict, Iterable, Tuple, Set
-import yaml
+from typing import List, Dict, Iterable, Tuple, Set, Mapping
 import pathlib
 import os
 import json
+from src.manifest.document import ManifestSource, ensure_manifest
 
 ORDER = [
     "resourceGroup",
@@ -26,6 +26,10 @@ ORDER = [
 
 SECRET_THRESHOLD = 5
 
+# kinds _collect_signals extracts anything from (kind pre-filter)
+SIGNAL_KINDS = ("Ingress", "PersistentVolumeClaim",
+                "Pod", "Deployment", "StatefulSet")
+
 
 @dataclass
 class ResourceInfo:
@@ -48,30 +52,15 @@ class ResourceInfo:
         return ", ".join(self.signals[:5]) + f" +{extra} more"
 
 
-def _safe_load_all(text: str) -> List[dict]:
-    try:
-        return [d for d in yaml.safe_load_all(text) if isinstance(d, dict)]
-    except Exception:
-        return []
-
-
-_PARSE_CACHE: Dict[str, List[dict]] = {}
-
-
-def _collect_signals(file_path: str, text: str) -> Dict[str, Set[str]]:
-    """Return grouped signals extracted from a YAML file.
+def _collect_signals(file_path: str, text: ManifestSource) -> Dict[str, Set[str]]:
+    """Return grouped signals extracted from a YAML file (raw text or ParsedManifest).
 
     Signals stored under keys: ingress, pvc, images, secrets.
     Each value is a set of canonical token strings.
     Canonical token: file.yaml:Kind/Name (omit /Name if name missing).
     """
     out = {"ingress": set(), "pvc": set(), "images": set(), "secrets": set()}
-    if file_path in _PARSE_CACHE:
-        docs = _PARSE_CACHE[file_path]
-    else:
-        docs = _safe_load_all(text)
-        _PARSE_CACHE[file_path] = docs
-    for doc in docs:
+    for doc in ensure_manifest(text).objects():
         kind = doc.get("kind")
         meta = doc.get("metadata") or {}
         name = meta.get("name")
@@ -117,16 +106,30 @@ def _collect_signals(file_path: str, text: str) -> Dict[str, Set[str]]:
     return out
 
 
-def infer_resources(violations: List[Dict], file_texts: Dict[str, str]) -> Tuple[List[ResourceInfo], List[str]]:
-    """Infer resources and return (resources, all_signal_tokens)."""
+def collect_file_signals(file_path: str, text: ManifestSource) -> Dict[str, List[str]]:
+    """Compact (sorted lists, picklable/JSON-able) form of _collect_signals for scan records."""
+    return {k: sorted(v) for k, v in _collect_signals(file_path, text).items()}
+
+
+def infer_resources(violations: List[Dict], file_texts: Mapping[str, ManifestSource],
+                    file_signals: Mapping[str, Mapping[str, Iterable[str]]] | None = None) -> Tuple[List[ResourceInfo], List[str]]:
+    """Infer resources and return (resources, all_signal_tokens).
+
+    file_texts maps file path -> raw text or ParsedManifest (parsed manifests are reused as-is).
+    file_signals maps file path -> signals already collected at scan time; those files are not parsed again.
+    """
     # aggregate signals
     agg = {"ingress": set(), "pvc": set(), "images": set(), "secrets": set()}
-    raw_docs: Dict[str, List[dict]] = {}
+    per_file: Dict[str, Dict[str, List[str]]] = {}  # what each file contributed (debug artifact)
     for fp, text in file_texts.items():
-        local = _collect_signals(fp, text)
+        local = _collect_signals(fp, ensure_manifest(text))
+        for k, v in local.items():
+            agg[k].update(v)
+        per_file[fp] = {k: sorted(v) for k, v in local.items()}
+    for fp, local in (file_signals or {}).items():
         for k, v in local.items():
             agg[k].update(v)
-        raw_docs[fp] = _PARSE_CACHE.get(fp, [])
+        per_file[fp] = {k: sorted(v) for k, v in local.items()}
 
     # violation based triggers
     has_sc001 = any(v.get("id") == "SC001" for v in violations)
@@ -182,7 +185,7 @@ def infer_resources(violations: List[Dict], file_texts: Dict[str, str]) -> Tuple
         debug = {
             "resources": [r.__dict__ for r in resources],
             "signals": all_signal_tokens,
-            "raw": raw_docs
+            "file_signals": per_file
         }
         pathlib.Path("resources.debug.json").write_text(
             json.dumps(debug, indent=2), encoding="utf-8")
@@ -208,4 +211,5 @@ def write_resources_md(resources: List[ResourceInfo], signals: List[str], path:
     pathlib.Path(path).write_text("\n".join(lines), encoding="utf-8")
 
 
-__all__ = ["infer_resources", "write_resources_md", "ResourceInfo"]
+__all__ = ["infer_resources", "collect_file_signals",
+           "write_resources_md", "ResourceInfo"]
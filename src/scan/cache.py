@@ -0,0 +1,114 @@
+# src/scan/cache.py
+"""Persistent per-file scan cache for fix-tree.
+
+Scan records (see src/scan/worker.py) are stored in a small SQLite database,
+keyed by sha256 of the file content plus its path, the active config and the
+rule-set version. Unchanged files skip parsing entirely on the next run.
+The database is capped in size; least recently used entries are evicted on close.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+import hashlib
+import json
+import pathlib
+import sqlite3
+
+DEFAULT_DIR = ".aks-copilot-cache"
+DEFAULT_MAX_MB = 256
+
+
+def config_fingerprint(cfg: Dict) -> str:
+    return hashlib.sha256(json.dumps(cfg, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ScanCache:
+    def __init__(self, path: str, max_bytes: int, config_hash: str, ruleset: str):
+        p = pathlib.Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(p)
+        self.max_bytes = max_bytes
+        self._salt = f"{ruleset}\0{config_hash}\0"
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._db = sqlite3.connect(self.path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used)")
+        # logical LRU clock, continued across runs (wall time can tie)
+        self._clock = self._db.execute(
+            "SELECT COALESCE(MAX(last_used), 0) FROM entries").fetchone()[0]
+
+    def _tick(self) -> float:
+        self._clock += 1
+        return self._clock
+
+    def key_for(self, file_path: str, data: bytes) -> str:
+        h = hashlib.sha256(self._salt.encode("utf-8"))
+        h.update(file_path.encode("utf-8") + b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self._db.execute(
+            "SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute(
+            "UPDATE entries SET last_used = ? WHERE key = ?", (self._tick(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, record: Dict) -> bool:
+        """Store a record; returns False if it does not survive a JSON round trip
+        (e.g. YAML timestamps or non-string keys) and therefore is not cached."""
+        try:
+            blob = json.dumps(record)  # key order matters: the report renders dicts
+        except (TypeError, ValueError):
+            return False
+        if json.loads(blob) != record:
+            return False
+        self._db.execute("INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                         (key, blob, len(blob), self._tick()))
+        return True
+
+    def total_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits max_bytes."""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        drop = []
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if excess <= 0:
+                break
+            drop.append((key,))
+            excess -= size
+        self._db.executemany("DELETE FROM entries WHERE key = ?", drop)
+        self.evicted += len(drop)
+        return len(drop)
+
+    def close(self) -> None:
+        self.evict()
+        self._db.commit()
+        self._db.close()
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+def open_scan_cache(cfg: Dict, ruleset: str) -> ScanCache:
+    """Open the cache configured by scan_cache_dir / scan_cache_max_mb."""
+    cache_dir = cfg.get("scan_cache_dir", DEFAULT_DIR)
+    max_mb = cfg.get("scan_cache_max_mb", DEFAULT_MAX_MB)
+    return ScanCache(str(pathlib.Path(cache_dir) / "scan.sqlite"), int(max_mb * 1024 * 1024),
+                     config_fingerprint(cfg), ruleset)
+
+
+__all__ = ["ScanCache", "open_scan_cache", "config_fingerprint"]
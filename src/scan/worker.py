@@ -0,0 +1,181 @@
+# src/scan/worker.py
+"""Per-file scan unit (read + parse + inspect) shared by serial and parallel runs.
+
+scan_file() returns a compact, picklable record:
+  {"file": str, "error": str|None, "violations": [...], "signals": {group: [tokens]},
+   "skipped_bytes": int, "rule_timings": {rule_id: [calls, seconds]}}
+Violations already carry file + patch mode, and signals are what resources.md
+needs, so the parent never has to re-parse files that no later stage touches.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import os
+import pathlib
+
+from src.inspect.registry import RuleTimings, default_registry
+from src.manifest import loader
+from src.manifest.document import ParsedManifest, parse_manifest
+from src.manifest.prefilter import scan_kind
+from src.manifest.stream import iter_documents
+from src.patch.validator import path_exists_in_yaml
+from src.resources.generator import SIGNAL_KINDS, collect_file_signals
+
+# Bump the prefix whenever the record shape changes; rule versions come from
+# the registry. Either change invalidates scan caches.
+RULESET_VERSION = "4:" + default_registry().version()
+
+# Documents of any other kind are skipped by the kind pre-filter.
+RELEVANT_KINDS = default_registry().kinds() | frozenset(SIGNAL_KINDS)
+
+STDIN = "<stdin>"  # file name used for documents read from a stream
+
+
+def run_inspections(manifest: ParsedManifest, timings: Optional[RuleTimings] = None) -> List[Dict]:
+    """Run all registered rules on a single parsed file in one pass over its documents."""
+    return default_registry().run(manifest, timings)
+
+
+def _finish(record: Dict, manifest: ParsedManifest, timings: RuleTimings) -> None:
+    path = record["file"]
+    for v in run_inspections(manifest, timings):
+        v = dict(v)
+        v["file"] = path
+        v["patch"] = "manual"
+        if v.get("id") == "SC001" and path_exists_in_yaml(manifest, v["path"], v.get("doc_index")):
+            v["patch"] = "auto"
+        record["violations"].append(v)
+    record["signals"] = collect_file_signals(path, manifest)
+    record["rule_timings"] = timings.as_dict()
+
+
+def _scan(path: str) -> Tuple[Dict, Optional[ParsedManifest]]:
+    record = {"file": path, "error": None, "violations": [],
+              "signals": {}, "skipped_bytes": 0, "rule_timings": {}}
+    try:
+        text = pathlib.Path(path).read_text(encoding="utf-8")
+    except Exception as e:
+        record["error"] = str(e)
+        return record, None
+    manifest = parse_manifest(text, path=path, kinds=RELEVANT_KINDS)
+    record["skipped_bytes"] = manifest.skipped_bytes
+    _finish(record, manifest, RuleTimings())
+    return record, manifest
+
+
+def scan_stream(lines: Iterable[str]) -> Iterator[Tuple[Dict, Optional[ParsedManifest]]]:
+    """Yield (record, manifest) per document of a YAML stream (e.g. stdin), in order.
+
+    Lines are consumed lazily, one document at a time. Each record covers one
+    document: it adds "doc_index" (position in the stream) and "source" (the
+    helm '# Source:' template, or None). The manifest holds only that document,
+    so violation doc_index values are 0, while their line numbers are stream
+    lines. Documents of irrelevant kinds are not parsed (manifest None).
+    """
+    doc_index = 0
+    for sd in iter_documents(lines):
+        base = {"file": STDIN, "doc_index": doc_index, "source": sd.source, "error": None,
+                "violations": [], "signals": {}, "skipped_bytes": 0, "rule_timings": {}}
+        kind = scan_kind(sd.text)
+        if kind is not None and kind not in RELEVANT_KINDS:
+            base["skipped_bytes"] = len(sd.text.encode("utf-8"))
+            doc_index += 1
+            yield base, None
+            continue
+        try:
+            docs, marks = loader.load_all_indexed(sd.text)
+        except Exception as e:
+            base["error"] = f"line {sd.start_line + 1}: {e}"
+            doc_index += 1
+            yield base, None
+            continue
+        for doc, doc_marks in zip(docs, marks):
+            record = dict(base, doc_index=doc_index, violations=[])
+            shifted = {p: (line + sd.start_line, col) for p, (line, col) in doc_marks.items()}
+            manifest = ParsedManifest(text=sd.text, docs=[doc], path=STDIN, marks=[shifted])
+            _finish(record, manifest, RuleTimings())
+            doc_index += 1
+            yield record, manifest
+
+
+def scan_file(path: str) -> Dict:
+    """Process-pool entry point: the parsed manifest stays in the worker."""
+    return _scan(path)[0]
+
+
+def scan_chunk(paths: List[str]) -> List[Dict]:
+    return [scan_file(p) for p in paths]
+
+
+def _init_worker(backend: str) -> None:
+    # keep the parent's loader choice under spawn/forkserver start methods
+    loader.set_backend(backend)
+
+
+def resolve_jobs(jobs: int) -> int:
+    """--jobs semantics: 0 means one worker per CPU, anything below 1 is serial."""
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def scan_files(files: Sequence[pathlib.Path], jobs: int = 1, cache=None) -> Iterator[Tuple[Dict, Optional[ParsedManifest]]]:
+    """Yield (record, manifest) per file, in input order.
+
+    Serial runs hand back the parsed manifest for reuse; pooled runs and cache
+    hits yield manifest=None. Records are yielded as soon as the next one in
+    order is done, so the caller can work on early files while workers parse
+    later ones. With a ScanCache, only files whose key misses are scanned.
+    """
+    paths = [str(f) for f in files]
+    if cache is None:
+        yield from _scan_paths(paths, jobs)
+        return
+    plan = []
+    for p in paths:
+        try:
+            key = cache.key_for(p, pathlib.Path(p).read_bytes())
+        except Exception:
+            plan.append((p, None, None))  # unreadable: the scan reports it
+            continue
+        plan.append((p, key, cache.get(key)))
+    scanned = _scan_paths([p for p, _, hit in plan if hit is None], jobs)
+    for p, key, hit in plan:
+        if hit is not None:
+            yield hit, None
+            continue
+        record, manifest = next(scanned)
+        if key is not None and record["error"] is None:
+            # timings describe this run only; cache hits report none
+            cache.put(key, {k: v for k, v in record.items() if k != "rule_timings"})
+        yield record, manifest
+
+
+def _scan_paths(paths: List[str], jobs: int) -> Iterator[Tuple[Dict, Optional[ParsedManifest]]]:
+    jobs = resolve_jobs(jobs)
+    if jobs <= 1 or len(paths) <= 1:
+        for p in paths:
+            yield _scan(p)
+        return
+    chunksize = max(1, min(64, len(paths) // (jobs * 8)))
+    chunks = (paths[i:i + chunksize] for i in range(0, len(paths), chunksize))
+    # bounded in-flight window (unlike Executor.map, which submits everything
+    # up front) so finished records never pile up ahead of the consumer
+    window = jobs * 4
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(loader.backend(),)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(scan_chunk, chunk))
+            if len(pending) >= window:
+                for record in pending.popleft().result():
+                    yield record, None
+        while pending:
+            for record in pending.popleft().result():
+                yield record, None
+
+
+__all__ = ["RULESET_VERSION", "RELEVANT_KINDS", "STDIN", "run_inspections",
+           "scan_file", "scan_files", "scan_stream", "resolve_jobs"]
@@ -0,0 +1,98 @@
+"""Suggestion merge scaling benchmark: path-indexed merge vs the old linear scan.
+
+Run from the repo root:  python -m tests.bench_merge
+Suggestions (one op each) are spread over 100 envelopes; 10% repeat an earlier
+op (duplicate) and 10% change an earlier op's value (conflict). Log events go to
+a temporary directory. Typical result: about 20 us per op, linear up to 1M ops.
+"""
+import os
+import random
+import tempfile
+import time
+
+from src.patch.suggestions import merge_suggestions_into_patch
+from src.patch.validator import validate_patch_ops
+
+LEGACY_BUDGET = 20_000  # ops; the linear scan is quadratic per envelope
+
+
+def _legacy_merge(existing_patch, suggestions):
+    """The pre-index merge: next() scans over env['ops'], one log write per op."""
+    from src.llm.logger import log_llm
+    by_key = {}
+    for env in existing_patch:
+        by_key.setdefault((env.get("file"), env["resource"]["kind"], env["resource"]["name"]), env)
+    stats = {"merged": 0, "skipped_duplicates": 0, "conflicts": 0}
+    for sug in suggestions:
+        res = sug["resource"]
+        key = (sug["file"], res["kind"], res["name"])
+        ok, _ = validate_patch_ops(sug["ops"])
+        if not ok:
+            continue
+        env = by_key.get(key)
+        if not env:
+            env = by_key[key] = {"file": sug["file"], "resource": res, "ops": []}
+            existing_patch.append(env)
+        for op in sug["ops"]:
+            if next((o for o in env["ops"] if o["op"] == op["op"] and o["path"] == op["path"]
+                     and o["value"] == op["value"]), None):
+                stats["skipped_duplicates"] += 1
+                log_llm({"event": "merge.duplicate", "file": sug["file"], "path": op["path"]})
+                continue
+            if next((o for o in env["ops"] if o["path"] == op["path"] and (
+                    o["value"] != op["value"] or o["op"] != op["op"])), None):
+                stats["conflicts"] += 1
+                log_llm({"event": "merge.conflict", "file": sug["file"], "path": op["path"]})
+            env["ops"].append(op)
+            stats["merged"] += 1
+            log_llm({"event": "merge.add", "file": sug["file"], "path": op["path"]})
+    return existing_patch, stats
+
+
+def _suggestions(n, rng):
+    out = []
+    for i in range(n):
+        r = rng.random()
+        if out and r < 0.1:
+            out.append(out[rng.randrange(len(out))])  # duplicate
+            continue
+        if out and r < 0.2:
+            prev = out[rng.randrange(len(out))]
+            op = dict(prev["ops"][0], value=f"v{i}")  # conflict
+        else:
+            op = {"op": "add", "path": f"/spec/template/spec/containers/{i}/resources", "value": {"cpu": f"{i}m"}}
+        env = i % 100 if not out or r >= 0.2 else None
+        out.append({"file": f"f{env}.yml" if env is not None else prev["file"],
+                    "resource": {"kind": "Deployment", "name": "web"}, "ops": [op]})
+    return out
+
+
+def _time(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def main():
+    rng = random.Random(1)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(f"{'ops':>8} {'indexed ms':>11} {'us/op':>6} {'legacy ms':>10}")
+            for n in (1_000, 10_000, 20_000, 100_000, 1_000_000):
+                sugs = _suggestions(n, rng)
+                ms, (_, stats) = _time(lambda: merge_suggestions_into_patch([], sugs))
+                if n <= LEGACY_BUDGET:
+                    legacy_ms, (_, legacy_stats) = _time(lambda: _legacy_merge([], sugs))
+                    assert legacy_stats == stats, (legacy_stats, stats)
+                    legacy = f"{legacy_ms:10.0f}"
+                else:
+                    legacy = f"{'skipped':>10}"
+                print(f"{n:>8} {ms:11.0f} {ms * 1000 / n:6.1f} {legacy}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
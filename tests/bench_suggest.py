@@ -0,0 +1,86 @@
+"""Suggestion throughput benchmark: one prompt per violation vs batched prompts.
+
+Run from the repo root:  python -m tests.bench_suggest
+A local fake Ollama server answers /api/generate after a fixed per-request
+overhead (prompt processing, queueing) plus a per-violation generation cost,
+so batching K violations pays the overhead once instead of K times. Config,
+logs and the response cache (disabled) live in a temporary directory.
+Typical result: about 9 suggestions/s with K=1, 45 with K=8 and 62 with K=16.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REQUEST_OVERHEAD = 0.05  # seconds per request
+ITEM_COST = 0.01  # seconds per violation answered
+VIOLATIONS = 64
+
+
+def _ops(path):
+    return [{"op": "add", "path": "/spec/ingressClassName", "value": path}]
+
+
+class _FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = 0
+
+    def do_POST(self):
+        prompt = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["prompt"]
+        type(self).requests += 1
+        if "Violations: " in prompt:
+            items = json.loads(prompt.split("Violations: ", 1)[1].split("\n", 1)[0])
+            answer = [{"index": it["index"], "type": "patch_suggestion", "ops": _ops(it["path"])} for it in items]
+        else:
+            item = json.loads(prompt.split("Violation: ", 1)[1].split("\n", 1)[0])
+            items = [item]
+            answer = {"type": "patch_suggestion", "ops": _ops(item["path"])}
+        time.sleep(REQUEST_OVERHEAD + ITEM_COST * len(items))
+        lines = [{"response": json.dumps(answer), "done": False}, {"response": "", "done": True}]
+        data = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _violations(n):
+    return [{"id": "SC003", "rule_id": "SC003", "path": f"/ing-{i}", "resource": f"ing-{i}"} for i in range(n)]
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open("config.json", "w", encoding="utf-8") as f:
+                json.dump({"llm": {"enabled": True, "provider": "ollama", "model": "fake",
+                                   "timeout_seconds": 30, "max_output_chars": 4000},
+                           "llm_cache": False, "llm_batch_max_chars": 100_000}, f)
+            from src.llm.augment import generate_resource_suggestions
+            vs = _violations(VIOLATIONS)
+            print(f"{'K':>3} {'requests':>9} {'seconds':>8} {'sugg/s':>7}")
+            for k in (1, 8, 16):
+                _FakeOllama.requests = 0
+                t0 = time.perf_counter()
+                out = generate_resource_suggestions(vs, batch_size=k)
+                elapsed = time.perf_counter() - t0
+                assert [o["ops"][0]["value"] for o in out] == [v["path"] for v in vs]
+                print(f"{k:>3} {_FakeOllama.requests:>9} {elapsed:8.2f} {len(vs) / elapsed:7.1f}")
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import json
+
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.manifest.loader import load_all
+from src.patch.apply import apply_file, splice
+from src.patch.dryrun import route_batch
+
+DEPLOY = """# deployment for web
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: web   # keep me
+  labels: {app: web}
+spec:
+  replicas: 2
+  template:
+    spec:
+      containers:
+      - name: app
+        image: "nginx:1.25"
+      - name: sidecar
+        image: busybox
+        args:
+          - sleep
+---
+kind: Service
+metadata:
+  name: web
+spec:
+  note: |
+    multi
+    line
+"""
+
+RESOURCES = {"requests": {"cpu": "100m", "memory": "64Mi"}}
+
+
+def _splice(text, ops):
+    expected, routed = route_batch(load_all(text), ops)
+    assert all(ok for ok, _, _ in routed)
+    out = splice(text, ops, [doc for _, _, doc in routed])
+    assert load_all(out) == expected
+    return out
+
+
+def test_splice_keeps_comments_and_layout():
+    ops = [{"op": "add", "path": "/spec/template/spec/containers/0/resources", "value": RESOURCES},
+           {"op": "replace", "path": "/spec/replicas", "value": 3},
+           {"op": "add", "path": "/metadata/labels/tier", "value": "fe"},
+           {"op": "add", "path": "/metadata/annotations", "value": {"appgw.ingress.kubernetes.io/ssl-redirect": "true"}},
+           {"op": "add", "path": "/metadata/annotations/a~1b", "value": "x"},  # needs the previous op
+           {"op": "replace", "path": "/spec/template/spec/containers/1/args", "value": ["run", "--fast"]},
+           {"op": "add", "path": "/spec/ports", "value": [{"port": 80}], "doc_index": 1}]
+    out = _splice(DEPLOY, ops)
+    assert out.startswith("# deployment for web\n")
+    assert "  name: web   # keep me\n  labels: {app: web, tier: fe}\n" in out
+    assert 'image: "nginx:1.25"\n        resources:\n          requests:\n            cpu: 100m\n' in out
+    assert "      annotations:" not in out and "  annotations:\n    appgw.ingress.kubernetes.io/ssl-redirect: 'true'\n    a/b: x\n" in out
+    assert "        args:\n          - run\n          - --fast\n" in out
+    assert out.endswith("    multi\n    line\n  ports:\n    - port: 80\n")
+
+
+def test_splice_crlf_and_flow():
+    text = "a: 1\r\nb: {}\r\nc: [1, 2]\r\n"
+    out = _splice(text, [{"op": "add", "path": "/b/k", "value": "v"},
+                         {"op": "add", "path": "/d", "value": {"e": 1}},
+                         {"op": "replace", "path": "/a", "value": "two\nlines"}])
+    assert out == 'a: "two\\nlines"\r\nb: {k: v}\r\nc: [1, 2]\r\nd:\r\n  e: 1\r\n'
+
+
+def test_apply_file_is_all_or_nothing(tmp_path):
+    f = tmp_path / "d.yml"
+    f.write_text(DEPLOY, encoding="utf-8")
+    res = apply_file(str(f), [{"op": "replace", "path": "/spec/replicas", "value": 3},
+                              {"op": "replace", "path": "/spec/nope", "value": 1}])
+    assert not res.ok and res.error.startswith("op 2: dry-run failed: replace path not found")
+    assert f.read_text(encoding="utf-8") == DEPLOY
+
+
+def test_apply_cli_envelopes_in_parallel(tmp_path):
+    (tmp_path / "m").mkdir()
+    for name in ("a.yml", "b.yml", "c.yml"):
+        (tmp_path / "m" / name).write_text(DEPLOY, encoding="utf-8")
+    op = {"op": "add", "path": "/spec/template/spec/containers/1/resources", "value": RESOURCES}
+    patch = [{"file": "a.yml", "ops": [op]},
+             {"file": "b.yml", "ops": [{"op": "replace", "path": "/spec/replicas", "value": 5}]},
+             {"file": "c.yml", "ops": [{"op": "replace", "path": "/spec/missing", "value": 1}]},
+             {"file": "a.yml", "ops": [{"op": "replace", "path": "/spec/replicas", "value": 4}]}]
+    pfile = tmp_path / "patch.json"
+    pfile.write_text(json.dumps(patch), encoding="utf-8")
+    runner = CliRunner()
+
+    res = runner.invoke(app, ["apply", str(pfile), "--root", str(tmp_path / "m"), "--dry-run"])
+    assert res.exit_code == 2, res.output
+    assert (tmp_path / "m" / "a.yml").read_text(encoding="utf-8") == DEPLOY
+
+    res = runner.invoke(app, ["apply", str(pfile), "--root", str(tmp_path / "m"), "--jobs", "2"])
+    assert res.exit_code == 2, res.output
+    lines = res.output.splitlines()
+    assert lines[1] == f"- {tmp_path / 'm' / 'a.yml'}: 2 ops, +5 -1 lines"
+    assert lines[2] == f"- {tmp_path / 'm' / 'b.yml'}: 1 ops, +1 -1 lines"
+    assert lines[3].startswith(f"- {tmp_path / 'm' / 'c.yml'}: FAILED op 1:")
+    assert lines[4] == "Applied 3 ops to 2 files (+6 -2 lines); 1 failed."
+    a = (tmp_path / "m" / "a.yml").read_text(encoding="utf-8")
+    assert "  replicas: 4\n" in a and "# keep me" in a and "memory: 64Mi" in a
+    assert (tmp_path / "m" / "c.yml").read_text(encoding="utf-8") == DEPLOY
+    assert sorted(p.name for p in (tmp_path / "m").iterdir()) == ["a.yml", "b.yml", "c.yml"]
+
+
+def test_apply_cli_flat_ops_need_target(tmp_path):
+    f = tmp_path / "d.yml"
+    f.write_text(DEPLOY, encoding="utf-8")
+    pfile = tmp_path / "patch.json"
+    pfile.write_text(json.dumps([{"op": "replace", "path": "/spec/replicas", "value": 1}]), encoding="utf-8")
+    runner = CliRunner()
+    res = runner.invoke(app, ["apply", str(pfile)])
+    assert res.exit_code == 1
+    res = runner.invoke(app, ["apply", str(pfile), "--target", str(f)])
+    assert res.exit_code == 0, res.output
+    assert "  replicas: 1\n" in f.read_text(encoding="utf-8")
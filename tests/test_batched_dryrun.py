@@ -0,0 +1,78 @@
+from src.cli import main as cli_main
+from src.manifest.document import ManifestStore, parse_manifest
+from src.patch import dryrun
+from src.patch.dryrun import dry_run_batch
+
+DEPLOY = """apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: web
+spec:
+  template:
+    spec:
+      containers:
+{containers}"""
+
+
+def _deploy(n):
+    return DEPLOY.format(containers="".join(f"        - name: c{i}\n          image: nginx\n" for i in range(n)))
+
+
+def _sc002_op(i):
+    return {"op": "add", "path": f"/spec/template/spec/containers/{i}/resources",
+            "value": {"requests": {"cpu": "100m"}}, "doc_index": 0}
+
+
+def test_conflicting_ops_on_same_path():
+    ops = [
+        {"op": "add", "path": "/metadata/labels", "value": {"a": "1"}},
+        {"op": "replace", "path": "/metadata/labels", "value": {"b": "2"}},
+        {"op": "add", "path": "/metadata/labels/c", "value": "3"},
+        {"op": "replace", "path": "/metadata/name", "value": "web2"},
+    ]
+    # without conflict detection each op just sees the earlier ones
+    assert [ok for ok, _ in dry_run_batch(_deploy(1), ops)] == [True, True, True, True]
+    res = dry_run_batch(_deploy(1), ops, conflicts=True)
+    assert [ok for ok, _ in res] == [True, False, False, True]
+    assert res[1][1] == "dry-run failed: conflicts with earlier op on /metadata/labels"
+    assert res[2][1] == "dry-run failed: conflicts with earlier op on /metadata/labels"
+
+
+def test_conflict_with_descendant_of_earlier_op():
+    ops = [
+        {"op": "add", "path": "/metadata/labels", "value": {"a": "1"}},
+        {"op": "replace", "path": "/metadata", "value": {}},
+    ]
+    res = dry_run_batch(_deploy(1), ops, conflicts=True)
+    assert res[1] == (False, "dry-run failed: conflicts with earlier op on /metadata/labels")
+
+
+def test_unrouted_conflict_falls_through_to_next_doc():
+    text = "kind: A\nmetadata: {name: a}\n---\nkind: B\nmetadata: {name: b}\n"
+    ops = [{"op": "add", "path": "/metadata/labels", "value": {}},
+           {"op": "add", "path": "/metadata/labels", "value": {}}]
+    docs, res = dryrun.apply_batch(parse_manifest(text).docs, ops, conflicts=True)
+    assert res == [(True, ""), (True, "")]
+    assert "labels" in docs[0]["metadata"] and "labels" in docs[1]["metadata"]
+
+
+def test_generate_patch_parses_each_file_once(monkeypatch):
+    manifests = ManifestStore()
+    manifests.put("a.yml", parse_manifest(_deploy(30)))
+    manifests.put("b.yml", parse_manifest(_deploy(2)))
+    calls = []
+    real = dryrun.ensure_manifest
+    monkeypatch.setattr(dryrun, "ensure_manifest", lambda m: calls.append(m) or real(m))
+    monkeypatch.setattr(cli_main, "log_llm", lambda *_: None)
+
+    ops = [dict(_sc002_op(i), file="a.yml") for i in range(30)]
+    ops.insert(5, dict(_sc002_op(1), file="b.yml"))
+    ops.append(dict(_sc002_op(3), file="a.yml"))  # same path as an earlier op
+    ops.append(dict(_sc002_op(7), file="b.yml"))  # no such container
+    kept = cli_main._dry_run_keep(ops, manifests)
+
+    assert len(calls) == 2
+    assert [op is not None for op in kept] == [True] * 31 + [False, False]
+    assert kept[5] == {"op": "add", "path": "/spec/template/spec/containers/1/resources",
+                       "value": {"requests": {"cpu": "100m"}}}
+    assert cli_main._dry_run_ops(ops, manifests) == [op for op in kept if op]
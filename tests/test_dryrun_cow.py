@@ -0,0 +1,113 @@
+import copy
+import random
+
+from src.manifest.document import parse_manifest
+from src.patch.dryrun import _json_pointer_exists, apply_batch, dry_run_apply, dry_run_batch
+
+
+def _legacy_apply_single_op(doc, op):
+    """The pre copy-on-write implementation (deepcopy per op), kept as the reference."""
+    new_doc = copy.deepcopy(doc)
+    o, path, val = op.get("op"), op.get("path"), op.get("value")
+    if o not in ("add", "replace"):
+        return False, doc, f"unsupported op: {o}"
+    exists, parent, key, reason = _json_pointer_exists(new_doc, path)
+    if o == "replace":
+        if not exists:
+            return False, doc, f"replace path not found: {reason or path}"
+        if isinstance(parent, list):
+            try:
+                idx = int(key)
+            except ValueError:
+                return False, doc, f"invalid list index: {key}"
+            parent[idx] = val
+        elif isinstance(parent, dict):
+            parent[key] = val
+        else:
+            return False, doc, "replace parent is not list/dict"
+    elif o == "add":
+        if exists:
+            return False, doc, "add would overwrite existing value"
+        if parent is None:
+            return False, doc, "cannot add at root via pointer"
+        if isinstance(parent, list):
+            try:
+                idx = int(key)
+            except ValueError:
+                return False, doc, f"invalid list index for add: {key}"
+            if idx == len(parent):
+                parent.append(val)
+            elif 0 <= idx < len(parent):
+                return False, doc, "add at existing list index forbidden"
+            else:
+                return False, doc, "add index out of range"
+        elif isinstance(parent, dict):
+            if key in parent:
+                return False, doc, "add key already exists"
+            parent[key] = val
+        else:
+            return False, doc, "add parent is not list/dict"
+    return True, new_doc, ""
+
+
+def _legacy_batch(docs, ops):
+    docs = list(docs)  # the old engine deep-copied per op, never the input
+    results = []
+    for op in ops:
+        last = "no doc matched"
+        for i in range(len(docs)):
+            ok, new_doc, reason = _legacy_apply_single_op(docs[i], op)
+            if ok:
+                docs[i] = new_doc
+                break
+            last = reason
+        else:
+            results.append((False, f"dry-run failed: {last}"))
+            continue
+        results.append((True, ""))
+    return docs, results
+
+
+def _docs(n):
+    return [{"kind": "Deployment", "metadata": {"name": f"d{i}", "labels": {"a": "1"}},
+             "spec": {"template": {"spec": {"containers": [{"name": "c", "image": "x"},
+                                                           {"name": "s", "resources": {}}]}}}}
+            for i in range(n)] + [None, "scalar"]
+
+
+PATHS = ["/metadata/name", "/metadata/labels/a", "/metadata/labels/b", "/metadata/annotations",
+         "/spec/template/spec/containers/0/resources", "/spec/template/spec/containers/1/resources",
+         "/spec/template/spec/containers/1/resources/limits", "/spec/template/spec/containers/2",
+         "/spec/template/spec/containers/x", "/spec//template", "/", "nope", "/status/x"]
+
+
+def test_cow_matches_legacy_semantics():
+    rng = random.Random(7)
+    for _ in range(200):
+        docs = _docs(rng.randint(1, 3))
+        ops = [{"op": rng.choice(["add", "replace", "remove"]), "path": rng.choice(PATHS),
+                "value": rng.choice([1, {"k": "v"}, [1, 2]])} for _ in range(rng.randint(1, 12))]
+        before = copy.deepcopy(docs)
+        assert apply_batch(docs, ops) == _legacy_batch(docs, ops)
+        assert docs == before  # inputs are never mutated
+
+
+def test_ops_inside_inserted_values_do_not_mutate_the_op():
+    value = {"requests": {"cpu": "1"}}
+    ops = [{"op": "add", "path": "/spec/template/spec/containers/0/resources", "value": value},
+           {"op": "add", "path": "/spec/template/spec/containers/0/resources/limits", "value": {}}]
+    docs, results = apply_batch(_docs(1), ops)
+    assert results == [(True, ""), (True, "")]
+    assert value == {"requests": {"cpu": "1"}}
+    assert docs[0]["spec"]["template"]["spec"]["containers"][0]["resources"]["limits"] == {}
+
+
+def test_dry_run_batch_and_apply():
+    m = parse_manifest("kind: Pod\nspec: {a: 1}\n---\nkind: Pod\nspec: {}\n")
+    ops = [{"op": "add", "path": "/spec/b", "value": 1},
+           {"op": "replace", "path": "/spec/zz", "value": 1},
+           {"op": "add", "path": "/spec/b", "value": 2}]
+    results = dry_run_batch(m, ops)
+    assert [ok for ok, _ in results] == [True, False, True]  # 3rd lands in doc 1
+    assert dry_run_apply(m, ops) == (False, results[1][1])
+    assert dry_run_batch("a: [", ops)[0][1].startswith("yaml parse error")
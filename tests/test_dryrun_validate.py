@@ -0,0 +1,52 @@
+import pytest
+
+from src.manifest import document
+from src.patch.dryrun import dry_run_validate
+
+POD = "kind: Pod\nmetadata:\n  name: {name}\nspec:\n  replicas: 1\n"
+
+
+def _envelopes(n_files, per_file, bad=()):
+    out = []
+    for i in range(per_file):
+        for f in range(n_files):
+            path = "/spec/replicas" if (f, i) not in bad else "/spec/missing"
+            out.append({"file": f"f{f}.yml", "resource": {"kind": "Pod", "name": f"p{f}"},
+                        "ops": [{"op": "replace", "path": path, "value": i}]})
+    return out
+
+
+def _tree(tmp_path, n_files):
+    for f in range(n_files):
+        (tmp_path / f"f{f}.yml").write_text(POD.format(name=f"p{f}"), encoding="utf-8")
+
+
+def test_each_file_parsed_once(tmp_path, monkeypatch):
+    _tree(tmp_path, 3)
+    calls = []
+    real = document.parse_manifest
+    monkeypatch.setattr(document, "parse_manifest", lambda text, path=None, **kw: calls.append(path) or real(text, path, **kw))
+    results = dry_run_validate(_envelopes(3, 50), manifests_root=str(tmp_path))
+    assert len(results) == 150 and all(r["success"] for r in results)
+    assert sorted(calls) == [str(tmp_path / f"f{f}.yml") for f in range(3)]
+
+
+def test_parallel_matches_serial_order(tmp_path):
+    _tree(tmp_path, 6)
+    patches = _envelopes(7, 4, bad={(2, 1), (5, 3)})  # f6.yml does not exist
+    serial = dry_run_validate(patches, manifests_root=str(tmp_path))
+    assert dry_run_validate(patches, manifests_root=str(tmp_path), jobs=3) == serial
+    assert [r["file"] for r in serial] == [str(tmp_path / p["file"]) for p in patches]
+    assert [r["details"] for r in serial if not r["success"]].count("file not found") == 4
+    assert sum(1 for r in serial if r["details"].startswith("dry-run failed")) == 2
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_strict_fails_fast_in_envelope_order(tmp_path, jobs):
+    _tree(tmp_path, 3)
+    patches = _envelopes(3, 3, bad={(1, 1)})
+    patches.append({"file": "missing.yml", "ops": []})
+    with pytest.raises(RuntimeError, match="f1.yml"):
+        dry_run_validate(patches, manifests_root=str(tmp_path), strict=True, jobs=jobs)
+    with pytest.raises(FileNotFoundError):
+        dry_run_validate(patches[-1:], manifests_root=str(tmp_path), strict=True, jobs=jobs)
@@ -0,0 +1,61 @@
+import pytest
+
+from src.manifest.document import parse_manifest
+from src.patch.dryrun import dry_run_batch
+from src.patch.pointer import PointerError, compile_pointer, format_pointer
+from src.patch.validator import is_forbidden_path, path_exists_in_yaml, validate_patch_ops
+
+ANNOTATED = """apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: web
+  annotations:
+    appgw.ingress.kubernetes.io/ssl-redirect: "true"
+    a~b: x
+spec:
+  rules: []
+"""
+SSL = "/metadata/annotations/appgw.ingress.kubernetes.io~1ssl-redirect"
+
+
+def test_compile_unescapes_and_is_memoized():
+    ptr = compile_pointer("/a~1b/m~0n/~01/0/07/")
+    assert ptr.parts == ("a/b", "m~n", "~1", "0", "07")
+    assert ptr.indices == (None, None, None, 0, None)
+    assert compile_pointer("/a~1b/m~0n/~01/0/07/") is ptr
+    assert compile_pointer("/a~1b/m~0n/~01/0/07") == ptr
+    assert format_pointer(ptr.parts) == "/a~1b/m~0n/~01/0/07"
+    for bad in ("nope", "", "/a~2", "/a~", None):
+        with pytest.raises(PointerError):
+            compile_pointer(bad)
+
+
+def test_resolve_and_parent():
+    doc = {"a": [{"b": 1}], "c/d": {"e~f": 2}}
+    assert compile_pointer("/a/0/b").resolve(doc) == (True, 1)
+    assert compile_pointer("/c~1d/e~0f").resolve(doc) == (True, 2)
+    assert not compile_pointer("/a/1").exists(doc)
+    assert not compile_pointer("/a/x").exists(doc)
+    assert compile_pointer("/c~1d/new").parent(doc) == (False, doc["c/d"], "new", "final step missing")
+    assert compile_pointer("/a/0/b").parent(doc) == (True, doc["a"][0], "b", "")
+    assert compile_pointer("/a/x/b").parent(doc) == (False, None, None, "non-int index x")
+
+
+def test_escaped_annotation_keys_in_dry_run_and_validation():
+    m = parse_manifest(ANNOTATED)
+    assert path_exists_in_yaml(m, SSL)
+    assert path_exists_in_yaml(m, "/metadata/annotations/a~0b")
+    assert not path_exists_in_yaml(m, "/metadata/annotations/appgw.ingress.kubernetes.io/ssl-redirect")
+    ops = [{"op": "replace", "path": SSL, "value": "false"},
+           {"op": "add", "path": "/metadata/annotations/kubernetes.io~1ingress.class", "value": "azure"}]
+    assert dry_run_batch(m, ops) == [(True, ""), (True, "")]
+    assert m.locate(0, SSL) == (6, 5)
+
+
+def test_forbidden_paths_compare_tokens():
+    assert is_forbidden_path("/status")
+    assert is_forbidden_path("/status/")
+    assert is_forbidden_path("/metadata/managedFields/0")
+    assert not is_forbidden_path("/statusx")
+    assert is_forbidden_path("status")
+    assert validate_patch_ops([{"op": "add", "path": "/a~2", "value": 1}]) == (False, "invalid path")
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.manifest import loader
+from src.manifest.document import parse_manifest
+from src.manifest.prefilter import SkippedDocument, split_documents, scan_kind
+from src.scan.worker import RELEVANT_KINDS, run_inspections
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CONFIGMAP = """apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: big
+data:
+  blob: |
+    kind: Pod
+    ---
+    not a document boundary
+"""
+PVC = """apiVersion: v1
+kind: PersistentVolumeClaim
+metadata:
+  name: data
+spec:
+  storageClassName: local-path
+"""
+
+
+@pytest.mark.parametrize("text", [
+    "", "# only a comment\n", "a: 1", "---\na: 1", "a: 1\n---\n",
+    "a: 1\n---\n# c\n---\nb: 2\n", "---\n---\n", "# head\n---\na: 1\n",
+    "--- # comment\na: 1\n",
+])
+def test_split_matches_loader_document_count(text):
+    assert len(split_documents(text)) == len(loader.load_all(text))
+
+
+def test_scan_kind():
+    assert scan_kind(CONFIGMAP) == "ConfigMap"
+    assert scan_kind('kind: "Pod"  # quoted\n') == "Pod"
+    assert scan_kind("{kind: ConfigMap}") is None  # flow style -> parse
+    assert scan_kind("kind: A\nkind: B\n") is None  # ambiguous -> parse
+
+
+def test_irrelevant_kinds_are_not_parsed():
+    text = CONFIGMAP + "---\n" + PVC
+    m = parse_manifest(text, kinds=RELEVANT_KINDS)
+    assert isinstance(m.docs[0], SkippedDocument)
+    assert m.skipped_bytes == len(CONFIGMAP.rstrip("\n").encode("utf-8"))
+    assert m.docs[1] == parse_manifest(text).docs[1]
+    assert run_inspections(m) == run_inspections(parse_manifest(text))
+
+
+def test_unsplittable_streams_fall_back_to_full_parse():
+    text = "%YAML 1.1\n---\n" + CONFIGMAP
+    m = parse_manifest(text, kinds=RELEVANT_KINDS)
+    assert m.skipped_bytes == 0
+    assert m.docs == parse_manifest(text).docs
+
+
+@pytest.mark.parametrize("path", sorted([*ROOT.glob("examples/**/*.yml"), *ROOT.glob("tests/fixtures/*.yml")]), ids=lambda p: p.name)
+def test_prefilter_keeps_violations(path):
+    text = path.read_text(encoding="utf-8")
+    assert run_inspections(parse_manifest(text, kinds=RELEVANT_KINDS)) == run_inspections(parse_manifest(text))
+
+
+def test_summary_reports_skipped_bytes(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({"llm": "stub"}))
+    (tmp_path / "cm.yml").write_text(CONFIGMAP + "---\n" + PVC)
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["fix", str(tmp_path / "cm.yml")])
+    assert result.exit_code == 0, result.stdout
+    assert f"Kind pre-filter: {len(CONFIGMAP.rstrip(chr(10)).encode())} bytes skipped" in result.stdout
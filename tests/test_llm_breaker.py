@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from src.llm import http as llm_http
+from src.llm.client import LLMUnavailable
+from src.llm.http import CircuitBreaker
+from src.llm.providers import ollama_generate
+from src.rag.embedder import _ollama_embed
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker_events():
+    with open("logs/llm.jsonl", encoding="utf-8") as f:
+        return [(e["from"], e["to"], e["reason"]) for e in map(json.loads, f) if e.get("event") == "llm.breaker"]
+
+
+def test_opens_after_consecutive_failures_and_probes_after_cooldown(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    clock = _Clock()
+    probes = []
+    health = {"ok": False}
+
+    def probe():
+        probes.append(clock.now)
+        return health["ok"]
+
+    b = CircuitBreaker(threshold=3, cooldown=10, probe=probe, clock=clock)
+    b.failure("x")
+    b.success()  # resets the streak
+    for _ in range(3):
+        b.allow()
+        b.failure("refused")
+    assert b.state == b.OPEN
+    with pytest.raises(LLMUnavailable):
+        b.allow()
+    assert probes == []  # no probe during the cooldown
+
+    clock.now = 11
+    with pytest.raises(LLMUnavailable):
+        b.allow()  # probe fails: open again, cooldown restarts
+    assert probes == [11] and b.state == b.OPEN
+    clock.now = 15
+    with pytest.raises(LLMUnavailable):
+        b.allow()
+    clock.now = 22
+    health["ok"] = True
+    b.allow()
+    assert b.state == b.CLOSED and b.failures == 0
+    assert _breaker_events() == [
+        ("closed", "open", "refused"),
+        ("open", "half_open", "cooldown elapsed, probing"),
+        ("half_open", "open", "probe failed"),
+        ("open", "half_open", "cooldown elapsed, probing"),
+        ("half_open", "closed", "probe ok"),
+    ]
+    assert b.rejected == 3
+
+
+def test_unreachable_backend_fails_fast(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://127.0.0.1:9")  # discard port: refused
+    monkeypatch.setattr(llm_http, "_cfg", lambda: {"llm_breaker_threshold": 2,
+                                                   "llm_breaker_cooldown_seconds": 3600})
+    llm_http.close_session()
+    llm_http.reset_breaker()
+    sent = []
+    session = llm_http.get_session()
+    real_post = session.post
+    monkeypatch.setattr(session, "post", lambda *a, **kw: sent.append(a) or real_post(*a, **kw))
+    try:
+        results = [ollama_generate("m", f"p{i}") for i in range(10)]
+        assert results == [""] * 10
+        assert len(sent) == 2  # the rest skipped the network
+        assert _ollama_embed(["a"], "e") == []  # embeddings share the breaker
+        assert len(sent) == 2
+        assert llm_http.get_breaker().state == CircuitBreaker.OPEN
+        assert [e[:2] for e in _breaker_events()] == [("closed", "open")]
+    finally:
+        llm_http.close_session()
+        llm_http.reset_breaker()
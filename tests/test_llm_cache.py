@@ -0,0 +1,179 @@
+from src.llm import cache as llm_cache
+from src.llm.cache import LLMCache, cached_generate
+from src.patch.llm import runner
+
+
+class _Provider:
+    def __init__(self, response="out"):
+        self.calls = 0
+        self.response = response
+
+    def __call__(self, model, prompt):
+        self.calls += 1
+        return self.response
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(tmp_path, **kw):
+    kw.setdefault("max_bytes", 1 << 20)
+    kw.setdefault("ttl_seconds", 3600)
+    return LLMCache(str(tmp_path / "llm.sqlite"), **kw)
+
+
+def test_repeat_prompt_is_served_from_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    gen = _Provider()
+    c = _cache(tmp_path)
+    assert cached_generate("m", "p", gen, cache=c) == "out"
+    c.close()
+    c = _cache(tmp_path)  # next run
+    assert cached_generate("m", "p", gen, cache=c) == "out"
+    assert gen.calls == 1
+    assert (c.hits, c.misses) == (1, 0)
+    # model and options are part of the key
+    cached_generate("m2", "p", gen, cache=c)
+    cached_generate("m", "p", gen, options={"temperature": 0}, cache=c)
+    assert gen.calls == 3
+    c.close()
+
+
+def test_empty_response_is_not_cached(tmp_path):
+    gen = _Provider("")
+    c = _cache(tmp_path)
+    cached_generate("m", "p", gen, cache=c)
+    cached_generate("m", "p", gen, cache=c)
+    assert gen.calls == 2 and c.stored == 0
+
+
+def test_ttl_expiry(tmp_path):
+    clock = _Clock()
+    gen = _Provider()
+    c = _cache(tmp_path, ttl_seconds=60, clock=clock)
+    cached_generate("m", "p", gen, cache=c)
+    clock.now += 30
+    cached_generate("m", "p", gen, cache=c)
+    assert gen.calls == 1
+    clock.now += 61
+    cached_generate("m", "p", gen, cache=c)
+    assert gen.calls == 2 and c.expired == 1
+
+
+def test_lru_eviction_by_size(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    c = _cache(tmp_path, max_bytes=250)
+    for p in ("a", "b", "c"):
+        cached_generate("m", p, _Provider("x" * 100), cache=c)
+    cached_generate("m", "a", _Provider(), cache=c)  # touch a: b is now least recently used
+    c.close()
+    c = _cache(tmp_path, max_bytes=250)
+    assert c.get(c.key_for("m", "a")) is not None
+    assert c.get(c.key_for("m", "b")) is None
+    assert c.get(c.key_for("m", "c")) is not None
+
+
+def test_refresh_bypasses_reads_but_stores(tmp_path):
+    cached_generate("m", "p", _Provider("old"), cache=_cache(tmp_path))
+    c = _cache(tmp_path, refresh=True)
+    gen = _Provider("new")
+    assert cached_generate("m", "p", gen, cache=c) == "new"
+    assert gen.calls == 1
+    c.refresh = False
+    assert cached_generate("m", "p", gen, cache=c) == "new"
+    assert gen.calls == 1
+
+
+def test_sc002_second_run_makes_no_llm_calls(tmp_path, monkeypatch):
+    ops = '[{"op": "add", "path": "<CONTAINER_PATH>/resources", "value": ' \
+        '{"requests": {"cpu": "100m", "memory": "128Mi"}, "limits": {"cpu": "200m", "memory": "256Mi"}}}]'
+    gen = _Provider(ops)
+    monkeypatch.setattr(runner, "ollama_generate", gen)
+    monkeypatch.setattr(runner, "get_config", lambda: {"llm": "ollama", "llm_model": "m"})
+    monkeypatch.chdir(tmp_path)
+    text = "apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n  - name: c\n    image: x\n"
+    for _ in range(2):
+        monkeypatch.setattr(llm_cache, "_cache", _cache(tmp_path))
+        monkeypatch.setattr(llm_cache, "_opened", True)
+        out, reason = runner.suggest_sc002_ops("Pod", 0, text, "pod.yaml")
+        assert reason == "" and out[0]["path"] == "/spec/containers/0/resources"
+        llm_cache.close_llm_cache()
+    assert gen.calls == 1
+
+
+def test_rejected_answers_are_not_cached(tmp_path, monkeypatch):
+    c = _cache(tmp_path)
+    gen = _Provider("prose")
+    accept = lambda out: out.startswith("[")  # noqa: E731
+    cached_generate("m", "p", gen, cache=c, accept=accept)
+    cached_generate("m", "p", gen, cache=c, accept=accept)
+    assert gen.calls == 2 and c.stored == 0
+    # the SC002 lane re-asks the model on the next run after an invalid answer
+    gen = _Provider("Sure, here is the patch")
+    monkeypatch.setattr(runner, "ollama_generate", gen)
+    monkeypatch.setattr(runner, "get_config", lambda: {
+        "llm": "ollama", "llm_model": "m",
+        "sc002": {"cpu_requests": "1", "mem_requests": "1Mi", "cpu_limits": "2", "mem_limits": "2Mi"}})
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(llm_cache, "_cache", c)
+    monkeypatch.setattr(llm_cache, "_opened", True)
+    text = "apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n  - name: c\n    image: x\n"
+    for _ in range(2):
+        assert runner.suggest_sc002_ops("Pod", 0, text, "pod.yaml")[1] == "llm failed, used defaults"
+    assert gen.calls == 4 and c.stored == 0
+
+
+def test_output_cap_is_part_of_the_key(tmp_path, monkeypatch):
+    import src.config
+    from src.llm import providers
+    from src.llm.client import OllamaClient
+    calls = []
+
+    def complete(model, prompt, timeout, max_output, stream=True):
+        calls.append(max_output)
+        return "x" * max_output
+
+    monkeypatch.setattr(providers, "ollama_complete", complete)
+    monkeypatch.setattr(llm_cache, "_cache", _cache(tmp_path))
+    monkeypatch.setattr(llm_cache, "_opened", True)
+    client = OllamaClient(model="m")
+    assert client.generate("p", max_output=10) == "x" * 10
+    assert client.generate("p", max_output=100) == "x" * 100  # a short answer is not reused for a larger cap
+    assert client.generate("p", max_output=10) == "x" * 10
+    assert calls == [10, 100]
+    # SC002/SC003 key on the options ollama_generate runs with
+    monkeypatch.setattr(src.config, "get_config", lambda: {"llm_max_output_chars": 50})
+    assert providers.generate_options()["max_output"] == 50
+
+
+def test_invalid_explain_and_suggest_answers_are_not_cached(tmp_path, monkeypatch):
+    from src.llm import augment, providers
+    answers = {"explain": "   ", "suggest": "not json"}
+    calls = []
+
+    def complete(model, prompt, timeout, max_output, stream=True):
+        kind = "suggest" if "Violation:" in prompt else "explain"
+        calls.append(kind)
+        return answers[kind]
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(providers, "ollama_complete", complete)
+    monkeypatch.setattr(augment, "_llm_cfg", lambda: {"enabled": True, "provider": "ollama", "model": "m"})
+    c = _cache(tmp_path)
+    monkeypatch.setattr(llm_cache, "_cache", c)
+    monkeypatch.setattr(llm_cache, "_opened", True)
+    v = {"id": "SC003", "path": "/spec", "resource": "web"}
+    for _ in range(2):
+        augment.augment_explanation(v)
+        assert augment.generate_suggestion(v)["ops"] == []
+    assert calls == ["explain", "suggest"] * 2 and c.stored == 0
+    answers.update(explain="Because.", suggest='{"type": "patch_suggestion", "ops": []}')
+    for _ in range(2):
+        augment.augment_explanation(v)
+        augment.generate_suggestion(v)
+    assert calls[4:] == ["explain", "suggest"] and c.stored == 2
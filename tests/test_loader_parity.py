@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+
+from src.cli.main import app, _run_inspections
+from src.manifest import loader
+from src.manifest.document import parse_manifest
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPORA = [ROOT / "examples" / "enemy", ROOT / "tests" / "fixtures"]
+
+needs_libyaml = pytest.mark.skipif(
+    loader.LIBYAML not in loader.available_backends(), reason="PyYAML built without libyaml")
+
+
+@pytest.fixture
+def use_backend():
+    prev = loader.backend()
+    yield loader.set_backend
+    loader.set_backend(prev)
+
+
+def _manifest_files():
+    return sorted(p for d in CORPORA for p in [*d.glob("*.yml"), *d.glob("*.yaml")])
+
+
+def _fix_outputs(tmp_path, monkeypatch, corpus, name):
+    work = tmp_path / name / corpus.name
+    work.mkdir(parents=True)
+    (work / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(work)
+    result = CliRunner().invoke(app, ["fix-folder", str(corpus)])
+    assert result.exit_code == 0, result.stdout
+    assert f"YAML loader: {name}" in result.stdout
+    return Path("report.md").read_text(encoding="utf-8"), Path("patch.json").read_text(encoding="utf-8")
+
+
+def test_pure_backend_always_available():
+    assert loader.PURE in loader.available_backends()
+
+
+def test_unknown_backend_rejected(use_backend):
+    with pytest.raises(ValueError):
+        use_backend("nope")
+
+
+@needs_libyaml
+@pytest.mark.parametrize("path", _manifest_files(), ids=lambda p: p.name)
+def test_backends_yield_identical_docs_and_violations(path, use_backend):
+    text = path.read_text(encoding="utf-8")
+    results = {}
+    for name in (loader.PURE, loader.LIBYAML):
+        use_backend(name)
+        m = parse_manifest(text, path=str(path))
+        results[name] = (m.docs, _run_inspections(m))
+    assert results[loader.PURE] == results[loader.LIBYAML]
+
+
+@needs_libyaml
+@pytest.mark.parametrize("corpus", CORPORA, ids=lambda p: p.name)
+def test_backends_yield_identical_report_and_patch(corpus, tmp_path, monkeypatch, use_backend):
+    outputs = {}
+    for name in (loader.PURE, loader.LIBYAML):
+        use_backend(name)
+        outputs[name] = _fix_outputs(tmp_path, monkeypatch, corpus, name)
+    assert outputs[loader.PURE] == outputs[loader.LIBYAML]
@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.manifest import loader
+from src.manifest.document import parse_manifest
+from src.inspect.ingress import inspect_ingress_class
+from src.patch.dryrun import dry_run_apply
+
+
+MULTI = """apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: a
+spec:
+  rules: []
+---
+apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata:
+  name: b
+spec:
+  ingressClassName: web
+"""
+
+
+def test_parse_error_is_captured_not_raised():
+    m = parse_manifest("a: [unclosed")
+    assert not m.ok
+    assert m.docs == []
+    ok, reason = dry_run_apply(m, [{"op": "add", "path": "/x", "value": 1}])
+    assert not ok and reason.startswith("yaml parse error")
+
+
+def test_text_and_parsed_inputs_agree():
+    m = parse_manifest(MULTI)
+    assert inspect_ingress_class(MULTI) == inspect_ingress_class(m)
+    # every Ingress in a multi-doc stream is checked
+    assert [v["resource"] for v in inspect_ingress_class(m)] == ["a"]
+
+
+def test_dry_run_does_not_mutate_shared_manifest():
+    m = parse_manifest(MULTI)
+    ok, _ = dry_run_apply(
+        m, [{"op": "add", "path": "/spec/ingressClassName", "value": "x"}])
+    assert ok
+    assert "ingressClassName" not in m.docs[0]["spec"]
+
+
+def test_fix_parses_each_file_once(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    real = loader.load_all_indexed
+
+    def counting(text):
+        calls.append(1)
+        return real(text)
+
+    monkeypatch.setattr(loader, "load_all_indexed", counting)
+    fixtures = Path(__file__).parent / "fixtures"
+    result = CliRunner().invoke(app, ["fix-folder", str(fixtures)])
+    assert result.exit_code == 0, result.stdout
+    assert len(calls) == len(list(fixtures.glob("*.yml")))
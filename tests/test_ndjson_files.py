@@ -0,0 +1,75 @@
+import json
+
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.patch.suggestions import iter_suggestions, load_suggestions, write_suggestions
+from src.report.stream import is_ndjson, iter_json_records
+
+
+def _sug(i, valid=True):
+    return {"index": i, "rule_id": "SC003", "file": "ing.yml", "resource": {"kind": "Ingress", "name": "web"},
+            "ops": [{"op": "add", "path": f"/metadata/labels/l{i}", "value": "x"}], "valid": valid}
+
+
+def test_reader_detects_format(tmp_path):
+    items = [{"a": 1}, {"b": [1, 2]}]
+    pretty, compact, nd = tmp_path / "p.json", tmp_path / "c.json", tmp_path / "n.ndjson"
+    pretty.write_text(json.dumps(items, indent=2), encoding="utf-8")
+    compact.write_text(json.dumps(items), encoding="utf-8")
+    nd.write_text("\n".join(json.dumps(i) for i in items) + "\n\n", encoding="utf-8")
+    assert [is_ndjson(p) for p in (pretty, compact, nd)] == [False, False, True]
+    for p in (pretty, compact, nd):
+        assert list(iter_json_records(p)) == items
+
+
+def test_suggestions_ndjson_roundtrip(tmp_path):
+    path = tmp_path / "suggestions.ndjson"
+    write_suggestions((_sug(i) for i in range(3)), str(path), rule="SC003", fmt="ndjson")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    header = json.loads(lines[0])
+    assert header["schema_version"] == 1 and header["format"] == "ndjson" and header["rule"] == "SC003"
+    assert len(lines) == 4
+    assert load_suggestions(str(path)) == [_sug(i) for i in range(3)]
+    # a wrapped file written on one line still reads as wrapped
+    one_line = tmp_path / "one.json"
+    one_line.write_text(json.dumps({"schema_version": 1, "suggestions": [_sug(0)]}), encoding="utf-8")
+    assert list(iter_suggestions(str(one_line))) == [_sug(0)]
+
+
+def test_merge_and_apply_keep_ndjson(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sfile = tmp_path / "suggestions.ndjson"
+    write_suggestions([_sug(0), _sug(1, valid=False), _sug(2)], str(sfile), rule="SC003", fmt="ndjson")
+    patch = tmp_path / "patch.json"
+    existing = {"file": "ing.yml", "resource": {"kind": "Ingress", "name": "web"},
+                "ops": [{"op": "replace", "path": "/metadata/name", "value": "web2"}]}
+    patch.write_text(json.dumps(existing) + "\n", encoding="utf-8")
+    runner = CliRunner()
+    res = runner.invoke(app, ["merge-suggestions", str(sfile), "--approve", "0,1,2", "--patch", str(patch)])
+    assert res.exit_code == 2, res.output  # index 1 is invalid
+    assert "merged=2" in res.output and "invalid_requested=1" in res.output
+    assert is_ndjson(patch)
+    envs = list(iter_json_records(patch))
+    assert len(envs) == 1 and [o["path"] for o in envs[0]["ops"]] == [
+        "/metadata/name", "/metadata/labels/l0", "/metadata/labels/l2"]
+
+    (tmp_path / "ing.yml").write_text("kind: Ingress\nmetadata:\n  name: web\n  labels: {}\n", encoding="utf-8")
+    res = runner.invoke(app, ["apply", str(patch), "--root", str(tmp_path)])
+    assert res.exit_code == 0, res.output
+    assert (tmp_path / "ing.yml").read_text(encoding="utf-8") == \
+        "kind: Ingress\nmetadata:\n  name: web2\n  labels: {l0: x, l2: x}\n"
+
+
+def test_patch_command_ndjson(tmp_path):
+    v = [{"rule_id": "SC001", "file": "tests/fixtures/pvc_bad.yml", "path": "/spec/storageClassName",
+          "desired": "standard"}]
+    vfile = tmp_path / "v.json"
+    vfile.write_text(json.dumps(v), encoding="utf-8")
+    out = tmp_path / "patch.ndjson"
+    res = CliRunner().invoke(app, ["patch", str(vfile), "--out", str(out), "--format", "ndjson", "--dry-run"])
+    assert res.exit_code == 0, res.output
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["file"].endswith("pvc_bad.yml")
+    res = CliRunner().invoke(app, ["patch", str(vfile), "--out", str(out), "--format", "xml"])
+    assert res.exit_code == 1
@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.llm import cache as llm_cache
+from src.llm import http as llm_http
+from src.llm.client import LLMTimeout, OllamaClient
+from src.llm.providers import ollama_complete, ollama_generate
+from src.rag.embedder import _ollama_embed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/api/generate" and body.get("stream"):
+            return self._stream(body["prompt"])
+        if self.path == "/api/generate":
+            out = {"response": " echo:" + body["prompt"] + " "}
+        else:
+            out = {"embedding": [float(len(body["prompt"])), 1.0]}
+        data = json.dumps(out).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, prompt):
+        """NDJSON chunks like Ollama; prompts pick a script (delay before each token)."""
+        if prompt == "json":
+            script = [(0, '[{"op": "add", '), (0, '"path": "/a]"}'), (0, "]"), (1.0, " and some prose"), (1.0, "")]
+        elif prompt == "slow":
+            script = [(0, "partial"), (2.0, " more")]
+        elif prompt == "long":
+            script = [(0, "abcd")] * 1000
+        else:
+            script = [(0, " echo:"), (0, prompt), (0, " ")]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for delay, token in script + [(0, None)]:
+                time.sleep(delay)
+                line = {"response": token or "", "done": token is None}
+                data = (json.dumps(line) + "\n").encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped early
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama(tmp_path, monkeypatch):
+    _Handler.connections = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OLLAMA_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.chdir(tmp_path)
+    llm_http.close_session()
+    llm_http.reset_breaker()
+    yield _Handler
+    llm_http.close_session()
+    llm_http.reset_breaker()
+    server.shutdown()
+    server.server_close()
+
+
+def _timing_events():
+    with open("logs/llm.jsonl", encoding="utf-8") as f:
+        return [e for e in map(json.loads, f) if e.get("event") == "http.timing"]
+
+
+def test_generate_and_embed_share_one_kept_alive_connection(ollama):
+    for i in range(5):
+        assert ollama_generate("m", f"p{i}") == f"echo:p{i}"
+    assert _ollama_embed(["a", "bb", "ccc"], "e") == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+    assert ollama.connections == 1
+
+    events = _timing_events()
+    gen = [e for e in events if e["endpoint"] == "generate"]
+    assert len(gen) == 5 and all(e["ok"] for e in gen)
+    assert gen[0]["connect_ms"] > 0  # first call opened the connection
+    assert all(e["connect_ms"] == 0 for e in gen[1:])
+    emb = [e for e in events if e["endpoint"] == "embeddings"]
+    assert emb == [{**emb[0], "texts": 3, "connections": 0}]
+
+
+def test_timeouts_are_split_and_configurable(monkeypatch):
+    monkeypatch.setattr(llm_http, "_cfg", lambda: {"ollama_connect_timeout": 1.5})
+    assert llm_http.timeouts(60) == (1.5, 60)
+    monkeypatch.setattr(llm_http, "_cfg", lambda: {"ollama_read_timeout": 5})
+    assert llm_http.timeouts(60) == (llm_http.DEFAULT_CONNECT_TIMEOUT, 5.0)
+
+
+def test_failed_generate_returns_empty_and_logs(tmp_path, monkeypatch):
+    monkeypatch.setenv("OLLAMA_BASE_URL", "http://127.0.0.1:9")  # discard port: refused
+    monkeypatch.chdir(tmp_path)
+    llm_http.close_session()
+    llm_http.reset_breaker()
+    assert ollama_generate("m", "p") == ""
+    assert _timing_events()[-1]["ok"] is False
+    llm_http.close_session()
+    llm_http.reset_breaker()
+
+
+def test_stream_reuses_connection_and_reports_ttft(ollama):
+    for i in range(3):
+        assert ollama_complete("m", f"p{i}", timeout=5, max_output=100) == f"echo:p{i}"
+    assert ollama.connections == 1
+    events = _timing_events()
+    assert [e["stop"] for e in events] == ["done"] * 3
+    assert all(e["ttft_ms"] is not None and e["ttft_ms"] <= e["total_ms"] for e in events)
+
+
+def test_stream_stops_at_complete_json(ollama):
+    t0 = time.perf_counter()
+    out = ollama_complete("m", "json", timeout=5, max_output=1000)
+    assert time.perf_counter() - t0 < 0.9  # did not wait for the trailing prose
+    assert json.loads(out) == [{"op": "add", "path": "/a]"}]
+    assert _timing_events()[-1]["stop"] == "json"
+
+
+def test_stream_caps_output(ollama):
+    assert ollama_complete("m", "long", timeout=5, max_output=10) == "abcdabcdab"
+    assert _timing_events()[-1]["stop"] == "max_output"
+
+
+def test_deadline_is_enforced_while_streaming(ollama, monkeypatch):
+    t0 = time.perf_counter()
+    with pytest.raises(LLMTimeout):
+        ollama_complete("m", "slow", timeout=0.3, max_output=100)
+    assert time.perf_counter() - t0 < 1.0
+    assert _timing_events()[-1]["stop"] == "timeout"
+    # the client used by explain/suggest surfaces the timeout
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_opened", True)
+    with pytest.raises(LLMTimeout):
+        OllamaClient(model="m", timeout_seconds=0.3).generate("slow")
+
+
+def test_legacy_timeout_default_matches_on_every_path(monkeypatch):
+    import src.config
+    from src.llm import augment
+    from src.llm.providers import generate_options
+    monkeypatch.setattr(src.config, "get_config", lambda: {"llm": "ollama"})
+    monkeypatch.setattr(augment, "get_config", lambda: {"llm": "ollama"})
+    assert augment._llm_cfg()["timeout_seconds"] == generate_options()["timeout"]
+    assert augment._llm_cfg()["max_output_chars"] == generate_options()["max_output"]
+    client = augment.build_client({"enabled": True})  # dict-style config without a timeout
+    assert (client.timeout_seconds, client.max_output_chars) == (8, generate_options()["max_output"])
+    assert generate_options()["timeout"] == 8
+
+
+def test_client_honours_llm_stream_false(ollama, monkeypatch):
+    import src.config
+    monkeypatch.setattr(src.config, "get_config", lambda: {"llm_stream": False, "llm_cache": False})
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_opened", True)
+    assert OllamaClient(model="m").generate("p") == "echo:p"
+    assert "stream" not in _timing_events()[-1]  # single-response request
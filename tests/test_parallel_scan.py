@@ -0,0 +1,49 @@
+import json
+import shutil
+from pathlib import Path
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.scan.worker import resolve_jobs, scan_files
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _tree(tmp_path):
+    src = tmp_path / "manifests"
+    shutil.copytree(ROOT / "examples", src / "examples")
+    shutil.copytree(ROOT / "tests" / "fixtures", src / "fixtures")
+    (src / "broken.yml").write_text("a: [unclosed", encoding="utf-8")
+    return src
+
+
+def _run(tmp_path, monkeypatch, tree, name, *extra):
+    work = tmp_path / name
+    work.mkdir()
+    (work / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(work)
+    result = CliRunner().invoke(app, ["fix-tree", str(tree), *extra])
+    assert result.exit_code == 0, result.stdout
+    return {f: (work / f).read_bytes() for f in ("report.md", "patch.json", "resources.md")}
+
+
+def test_jobs_output_is_byte_identical_to_serial(tmp_path, monkeypatch):
+    tree = _tree(tmp_path)
+    serial = _run(tmp_path, monkeypatch, tree, "serial")
+    pooled = _run(tmp_path, monkeypatch, tree, "pooled", "--jobs", "3")
+    assert serial == pooled
+    assert b"SC001" in serial["report.md"]
+
+
+def test_scan_files_keeps_input_order(tmp_path):
+    tree = _tree(tmp_path)
+    files = sorted(tree.rglob("*.yml"))
+    records = [r for r, _ in scan_files(files, jobs=2)]
+    assert [r["file"] for r in records] == [str(f) for f in files]
+    assert all(isinstance(r["signals"], dict) for r in records)
+
+
+def test_resolve_jobs():
+    assert resolve_jobs(-3) == 1
+    assert resolve_jobs(4) == 4
+    assert resolve_jobs(0) >= 1
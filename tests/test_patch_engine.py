@@ -40,3 +40,17 @@ def test_dry_run_validate_success(tmp_path):
     results = dry_run_validate(patches, manifests_root=None, strict=False)
     assert isinstance(results, list)
     assert results[0]["success"] is True
+
+
+def test_patch_file_ops_have_no_location_keys(tmp_path):
+    v = [{"rule_id": "SC001", "file": "tests/fixtures/pvc_bad.yml", "path": "/spec/storageClassName",
+          "desired": "standard", "doc_index": 0, "line": 7}]
+    patches = build_patch_ops(v)
+    assert patches[0]["ops"][0]["doc_index"] == 0  # kept in memory for dry-run routing
+    assert dry_run_validate(patches)[0]["success"] is True
+    for fmt in ("json", "ndjson"):
+        out = tmp_path / f"patch.{fmt}"
+        write_patch_json(patches, str(out), fmt)
+        text = out.read_text(encoding="utf-8")
+        assert "doc_index" not in text and '"line"' not in text
+        assert '"/spec/storageClassName"' in text
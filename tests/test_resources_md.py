@@ -188,3 +188,17 @@ spec:
     assert "Public IP" in text
     assert "Persistent Volume (Managed Disk / Azure Files)" in text
     assert "Storage Class (Managed)" in text
+
+
+def test_resources_debug_lists_signals_per_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RESOURCES_DEBUG", "1")
+    _prep(tmp_path)
+    (tmp_path / "a.yml").write_text("kind: PersistentVolumeClaim\nmetadata:\n  name: data\nspec: {}\n")
+    (tmp_path / "b.yml").write_text("kind: Ingress\nmetadata:\n  name: web\nspec: {}\n")
+    _run_fix(tmp_path, [tmp_path / "a.yml", tmp_path / "b.yml"])
+    debug = json.loads(Path("resources.debug.json").read_text(encoding="utf-8"))
+    assert "raw" not in debug
+    by_name = {Path(fp).name: s for fp, s in debug["file_signals"].items()}
+    assert by_name["a.yml"]["pvc"] == ["a.yml:PersistentVolumeClaim/data"]
+    assert by_name["b.yml"]["ingress"] == ["b.yml:Ingress/web"]
@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.inspect.ingress import inspect_ingress_class
+from src.inspect.registry import Rule, RuleRegistry, RuleTimings, default_registry
+from src.inspect.requests_limits import inspect_requests_limits
+from src.inspect.storageclass import inspect_storageclass
+from src.manifest.document import parse_manifest
+from src.scan.worker import RELEVANT_KINDS, RULESET_VERSION
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MIXED = """apiVersion: networking.k8s.io/v1
+kind: Ingress
+metadata: {name: web}
+spec: {}
+---
+apiVersion: v1
+kind: Pod
+metadata: {name: p}
+spec:
+  containers: [{name: c}]
+---
+apiVersion: v1
+kind: PersistentVolumeClaim
+metadata: {name: data}
+spec: {storageClassName: local-path}
+"""
+
+
+@pytest.mark.parametrize("path", sorted([*ROOT.glob("examples/**/*.yml"), *ROOT.glob("tests/fixtures/*.yml")]), ids=lambda p: p.name)
+def test_single_pass_matches_inspectors(path):
+    m = parse_manifest(path.read_text(encoding="utf-8"))
+    expected = inspect_storageclass(m) + inspect_requests_limits(m) + inspect_ingress_class(m)
+    found = [{k: v for k, v in f.items() if k not in ("doc_index", "line")}
+             for f in default_registry().run(m)]
+    assert found == expected
+
+
+def test_output_is_grouped_in_rule_order():
+    ids = [v["id"] for v in default_registry().run(parse_manifest(MIXED))]
+    assert ids == ["SC001", "SC002", "SC003"]
+
+
+def test_rules_only_see_their_kinds():
+    seen = []
+    reg = RuleRegistry([Rule("X1", ("Pod",), lambda d: seen.append(d["kind"]) or [{"id": "X1"}])])
+    assert reg.run(parse_manifest(MIXED)) == [{"id": "X1", "doc_index": 1, "line": 6}]
+    assert seen == ["Pod"]
+    assert reg.kinds() == frozenset({"Pod"})
+    with pytest.raises(ValueError):
+        reg.register(Rule("X1", ("Service",), lambda d: []))
+
+
+def test_timings_and_version():
+    timings = RuleTimings()
+    default_registry().run(parse_manifest(MIXED), timings)
+    assert timings.calls == {"SC001": 1, "SC002": 1, "SC003": 1}
+    assert len(timings.lines()) == 3
+    assert default_registry().version() in RULESET_VERSION
+    assert default_registry().kinds() <= RELEVANT_KINDS
+
+
+def test_cli_rule_timings(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({"llm": "stub"}))
+    src = tmp_path / "m"
+    src.mkdir()
+    (src / "mixed.yml").write_text(MIXED)
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["fix-folder", str(src), "--rule-timings"])
+    assert result.exit_code == 0, result.stdout
+    assert "Rule timings" in result.stdout
+    assert "- SC002:" in result.stdout and "over 1 docs" in result.stdout
@@ -0,0 +1,179 @@
+import json
+import threading
+import time
+
+from src.cli import main as cli
+from src.llm import cache as llm_cache
+from src.manifest.document import ManifestStore, parse_manifest
+from src.patch.llm import runner
+from src.patch.llm.runner import PATH_PLACEHOLDER, SC002Lane
+
+
+def _ops(path):
+    return json.dumps([{"op": "add", "path": f"{path}/resources", "value": {
+        "requests": {"cpu": "100m", "memory": "128Mi"}, "limits": {"cpu": "200m", "memory": "256Mi"}}}])
+
+
+class _SlowModel:
+    """Answers the path-free template after `delay` seconds; records calls and overlap."""
+
+    def __init__(self, delay=0.1, fail_kinds=()):
+        self.delay = delay
+        self.fail_kinds = fail_kinds
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, model, prompt):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            kind = prompt.split("Context: A ", 1)[1].split(" ", 1)[0]
+            if kind in self.fail_kinds:
+                raise RuntimeError("boom")
+            return _ops(PATH_PLACEHOLDER)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _setup(monkeypatch, tmp_path, model, concurrency):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(runner, "ollama_generate", model)
+    monkeypatch.setattr(runner, "get_config", lambda: {
+        "llm": "ollama", "llm_model": "m", "llm_concurrency": concurrency,
+        "sc002": {"cpu_requests": "1", "mem_requests": "1Mi", "cpu_limits": "2", "mem_limits": "2Mi"}})
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_opened", True)  # no response cache
+
+
+def _pods(n, files=1):
+    store = ManifestStore()
+    violations = []
+    containers = "".join(f"  - name: c{i}\n    image: x\n" for i in range(n))
+    text = f"apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n{containers}"
+    for f in range(files):
+        store.put(f"pod{f}.yaml", parse_manifest(text, path=f"pod{f}.yaml"))
+        for i in range(n):
+            violations.append({"id": "SC002", "file": f"pod{f}.yaml", "path": f"/spec/containers/{i}/resources"})
+    return violations, store
+
+
+def _events(stage):
+    with open("logs/llm.jsonl", encoding="utf-8") as f:
+        return [e for e in map(json.loads, f) if e.get("stage") == stage]
+
+
+def test_identical_prompts_make_one_call_and_rebind_in_order(tmp_path, monkeypatch):
+    model = _SlowModel(delay=0)
+    _setup(monkeypatch, tmp_path, model, concurrency=4)
+    violations, store = _pods(5, files=40)
+    ops = []
+    cli._sc002_lane(violations, store, ops)
+    assert model.calls == 1
+    assert [(op["file"], op["path"]) for op in ops] == \
+        [(v["file"], v["path"]) for v in violations]
+    assert all(op["value"]["requests"]["cpu"] == "100m" for op in ops)
+    assert len({id(op["value"]) for op in ops}) == len(ops)  # rebound ops are independent copies
+    assert _events("llm_dedup") == [{"rule": "SC002", "stage": "llm_dedup", "requests": 200, "llm_calls": 1}]
+
+
+def test_distinct_prompts_run_concurrently(tmp_path, monkeypatch):
+    model = _SlowModel(delay=0.1)
+    _setup(monkeypatch, tmp_path, model, concurrency=4)
+    _, store = _pods(8)
+    manifest = store.get("pod0.yaml")
+    t0 = time.perf_counter()
+    with SC002Lane() as lane:
+        pending = [lane.submit(f"Kind{i}", i, manifest, "pod0.yaml") for i in range(8)]
+        results = [p.result() for p in pending]
+    elapsed = time.perf_counter() - t0
+    assert model.calls == 8 and model.peak == 4
+    assert elapsed < 8 * 0.1 * 0.75
+    assert [ops[0]["path"] for ops, _ in results] == [f"/spec/containers/{i}/resources" for i in range(8)]
+
+    timing = _events("llm_timing")
+    assert len(timing) == 8
+    assert all(e["latency_ms"] >= 100 for e in timing)
+    assert max(e["queue_ms"] for e in timing) >= 100  # the second wave waited for a free slot
+
+
+def test_failures_fall_back_to_default(tmp_path, monkeypatch):
+    model = _SlowModel(delay=0, fail_kinds=("Job",))
+    _setup(monkeypatch, tmp_path, model, concurrency=2)
+    _, store = _pods(2)
+    manifest = store.get("pod0.yaml")
+    with SC002Lane() as lane:
+        pending = [lane.submit("Pod", 0, manifest, "pod0.yaml"),
+                   lane.submit("Pod", 5, manifest, "pod0.yaml"),  # no such container: rebinding fails validation
+                   lane.submit("Job", 1, manifest, "pod0.yaml")]  # the request raises
+        (ok_ops, r0), (bad_ops, r1), (err_ops, r2) = [p.result() for p in pending]
+    assert r0 == "" and ok_ops[0]["value"]["requests"] == {"cpu": "100m", "memory": "128Mi"}
+    assert bad_ops[0]["path"] == "/spec/containers/5/resources"
+    assert bad_ops[0]["value"]["requests"] == {"cpu": "1", "memory": "1Mi"}  # DEFAULT_OP
+    assert err_ops[0]["value"]["requests"] == {"cpu": "1", "memory": "1Mi"}
+    assert r1 == r2 == "llm failed, used defaults"
+    reasons = [e["reason"] for e in _events("llm_fallback")]
+    assert reasons == ["container path not found", "llm error: boom"]
+
+
+def test_serial_when_concurrency_is_one(tmp_path, monkeypatch):
+    model = _SlowModel(delay=0.01)
+    _setup(monkeypatch, tmp_path, model, concurrency=1)
+    _, store = _pods(3)
+    with SC002Lane() as lane:
+        pending = [lane.submit(k, 0, store.get("pod0.yaml"), "pod0.yaml") for k in ("Pod", "Job", "Pod")]
+        assert len([p.result() for p in pending]) == 3
+    assert model.peak == 1 and model.calls == 2
+
+
+def test_single_suggestion_uses_the_template_prompt(tmp_path, monkeypatch):
+    model = _SlowModel(delay=0)
+    _setup(monkeypatch, tmp_path, model, concurrency=1)
+    _, store = _pods(2)
+    ops, reason = runner.suggest_sc002_ops("Pod", 1, store.get("pod0.yaml"), "pod0.yaml")
+    assert reason == "" and ops[0]["path"] == "/spec/containers/1/resources"
+    assert PATH_PLACEHOLDER in runner.sc002_prompt("Pod")
+    assert "/spec/containers" not in runner.sc002_prompt("Pod")
+
+
+def test_container_with_partial_resources_does_not_reject_the_group_answer(tmp_path, monkeypatch):
+    model = _SlowModel(delay=0)
+    _setup(monkeypatch, tmp_path, model, concurrency=1)
+    partial = parse_manifest(
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: a\nspec:\n  template:\n    spec:\n"
+        "      containers:\n      - name: c\n        image: x\n        resources:\n"
+        "          requests:\n            cpu: 50m\n", path="a.yaml")
+    clean = parse_manifest(
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: b\nspec:\n  template:\n    spec:\n"
+        "      containers:\n      - name: c\n        image: x\n", path="b.yaml")
+    with SC002Lane() as lane:
+        (p_ops, p_reason), (c_ops, c_reason) = [
+            f.result() for f in (lane.submit("Deployment", 0, partial, "a.yaml"),
+                                 lane.submit("Deployment", 0, clean, "b.yaml"))]
+    assert model.calls == 1
+    assert p_reason == "llm failed, used defaults"
+    assert c_reason == "" and c_ops[0]["value"]["requests"] == {"cpu": "100m", "memory": "128Mi"}
+    assert [e["reason"] for e in _events("llm_fallback")] == ["resources already present; no overwrite allowed"]
+
+
+def test_stream_mode_shares_one_lane_across_files(tmp_path, monkeypatch):
+    import src.config
+    model = _SlowModel(delay=0)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(runner, "ollama_generate", model)
+    monkeypatch.setattr(src.config, "_cfg", {**src.config._DEFAULT, "llm": "ollama", "llm_cache": False})
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(llm_cache, "_opened", True)
+    text = "apiVersion: v1\nkind: Pod\nmetadata:\n  name: p\nspec:\n  containers:\n  - name: c\n    image: x\n"
+    files = []
+    for i in range(10):
+        files.append(tmp_path / f"pod{i}.yaml")
+        files[-1].write_text(text, encoding="utf-8")
+    cli._process_stream(files, False, 1, False)
+    assert model.calls == 1
+    assert _events("llm_dedup") == [{"rule": "SC002", "stage": "llm_dedup", "requests": 10, "llm_calls": 1}]
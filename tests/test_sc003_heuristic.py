@@ -22,6 +22,7 @@ def _write_ingress(path, with_class=False, with_tls=False, host="example.com"):
 
 
 def test_sc003_heuristic_adds_class_and_tls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     manifest = tmp_path / "ing.yml"
     _write_ingress(manifest, with_class=False, with_tls=False)
     violations = [
@@ -46,6 +47,7 @@ def test_sc003_heuristic_adds_class_and_tls(tmp_path, monkeypatch):
 
 
 def test_sc003_heuristic_only_class(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     manifest = tmp_path / "ing.yml"
     _write_ingress(manifest, with_class=False, with_tls=True)
     violations = [
@@ -69,6 +71,7 @@ def test_sc003_heuristic_only_class(tmp_path, monkeypatch):
 
 
 def test_sc003_heuristic_only_tls(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     manifest = tmp_path / "ing.yml"
     # ingress already has class but no tls
     _write_ingress(manifest, with_class=True, with_tls=False)
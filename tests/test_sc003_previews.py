@@ -0,0 +1,82 @@
+import threading
+import time
+
+from src.patch.llm import suggest_sc003
+from src.report import writer
+from src.patch.llm.suggest_sc003 import PreviewStage
+from src.report.writer import format_violations
+
+
+def _v(path="/spec", file="ing.yaml"):
+    return {"id": "SC003", "file": file, "resource": "Ingress/web", "path": path,
+            "found": "none", "expected": "ingressClassName", "severity": "warn"}
+
+
+def _llm(monkeypatch, preview, **cfg):
+    monkeypatch.setattr(suggest_sc003, "get_config", lambda: {"llm": "ollama", **cfg})
+    monkeypatch.setattr(suggest_sc003, "suggest_sc003_preview", preview)
+
+
+def test_renderer_does_not_call_the_llm(monkeypatch):
+    def boom(*a, **kw):
+        raise AssertionError("report rendering must not generate previews")
+    monkeypatch.setattr(suggest_sc003, "suggest_sc003_preview", boom)
+    monkeypatch.setattr(writer, "load_explanation", lambda rule_id: {})
+    v = _v()
+    v["llm_preview"] = "ingressClassName: web\nfoo: bar"
+    lines = format_violations([v, _v()])
+    assert "  LLM suggestion (preview only):" in lines
+    assert "    ingressClassName: web" in lines and "    foo: bar" in lines
+    assert lines.count("  LLM suggestion (preview only):") == 1
+
+
+def test_previews_are_memoized_by_shape_and_concurrent(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+    lock = threading.Lock()
+
+    def preview(file_path, kind="Ingress", path="/spec"):
+        with lock:
+            calls.append(path)
+        time.sleep(0.1)
+        return f"ingressClassName: x  # {path}"
+
+    _llm(monkeypatch, preview, llm_concurrency=4)
+    vs = [_v(path=f"/spec/{i % 3}", file=f"f{i}.yaml") for i in range(30)]
+    vs.append({"id": "SC001", "file": "pvc.yaml"})
+    t0 = time.perf_counter()
+    with PreviewStage() as stage:
+        stage.submit(vs)
+        stage.attach()
+    assert time.perf_counter() - t0 < 0.25  # three calls in parallel, not 30 in series
+    assert sorted(calls) == ["/spec/0", "/spec/1", "/spec/2"]
+    assert all(v["llm_preview"].endswith(v["path"]) for v in vs[:30])
+    assert "llm_preview" not in vs[30]
+    assert (stage.requests, stage.calls, stage.late) == (30, 3, 0)
+
+
+def test_budget_bounds_the_stage(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    def preview(file_path, kind="Ingress", path="/spec"):
+        time.sleep(0.05 if path == "/fast" else 1.0)
+        return "ingressClassName: x"
+
+    _llm(monkeypatch, preview, llm_concurrency=2)
+    fast, slow = _v(path="/fast"), _v(path="/slow")
+    t0 = time.perf_counter()
+    with PreviewStage(budget_seconds=0.3) as stage:
+        stage.submit([fast, slow])
+        stage.attach()
+    assert time.perf_counter() - t0 < 0.6
+    assert fast["llm_preview"] == "ingressClassName: x"
+    assert "llm_preview" not in slow and stage.late == 1
+    assert ("Ingress", "/slow") not in stage.memo  # retried by a later run (watch)
+
+
+def test_disabled_llm_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(suggest_sc003, "get_config", lambda: {"llm": "stub"})
+    v = _v()
+    with PreviewStage() as stage:
+        stage.submit([v])
+        stage.attach()
+    assert "llm_preview" not in v and stage.calls == 0
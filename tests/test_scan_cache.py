@@ -0,0 +1,74 @@
+import json
+import shutil
+from pathlib import Path
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.scan.cache import ScanCache
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _setup(tmp_path, monkeypatch):
+    tree = tmp_path / "manifests"
+    shutil.copytree(ROOT / "tests" / "fixtures", tree)
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(work)
+    return tree
+
+
+def _fix_tree(tree, *extra):
+    result = CliRunner().invoke(app, ["fix-tree", str(tree), *extra])
+    assert result.exit_code == 0, result.stdout
+    outputs = {f: Path(f).read_bytes()
+               for f in ("report.md", "patch.json", "resources.md")}
+    return result.stdout, outputs
+
+
+def test_second_run_is_served_from_cache(tmp_path, monkeypatch):
+    tree = _setup(tmp_path, monkeypatch)
+    n = len(list(tree.glob("*.yml")))
+    out1, first = _fix_tree(tree)
+    assert f"Scan cache: 0 hits, {n} misses" in out1
+    out2, second = _fix_tree(tree)
+    assert f"Scan cache: {n} hits, 0 misses" in out2
+    assert first == second
+
+    pvc = tree / "pvc_bad.yml"
+    pvc.write_text(pvc.read_text().replace("local-path", "managed-csi"))
+    out3, third = _fix_tree(tree)
+    assert f"Scan cache: {n - 1} hits, 1 misses" in out3
+    assert third["report.md"].count(b"SC001") < first["report.md"].count(b"SC001")
+
+
+def test_no_cache_flag_bypasses_cache(tmp_path, monkeypatch):
+    tree = _setup(tmp_path, monkeypatch)
+    out, _ = _fix_tree(tree, "--no-cache")
+    assert "Scan cache" not in out
+    assert not Path(".aks-copilot-cache").exists()
+
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    cache = ScanCache(str(tmp_path / "c.sqlite"),
+                      max_bytes=250, config_hash="c", ruleset="1")
+    record = {"file": "x", "error": None, "violations": [],
+              "signals": {"pvc": ["a" * 40]}}
+    keys = [cache.key_for(f"f{i}.yml", b"data") for i in range(4)]
+    for k in keys:
+        assert cache.put(k, record)
+    cache.get(keys[0])  # touch: most recently used now
+    cache.evict()
+    assert cache.total_bytes() <= 250
+    assert cache.get(keys[0]) == record
+    assert cache.get(keys[1]) is None
+    cache.close()
+
+
+def test_records_that_do_not_round_trip_are_not_cached(tmp_path):
+    cache = ScanCache(str(tmp_path / "c.sqlite"),
+                      max_bytes=1 << 20, config_hash="c", ruleset="1")
+    assert not cache.put("k", {"violations": [{"found": {1: "int key"}}]})
+    assert cache.get("k") is None
+    cache.close()
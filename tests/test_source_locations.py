@@ -0,0 +1,100 @@
+import json
+import time
+from pathlib import Path
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.manifest import loader
+from src.manifest.document import parse_manifest
+from src.patch.dryrun import dry_run_apply
+from src.scan.worker import RELEVANT_KINDS, run_inspections
+
+TWO_DEPLOYMENTS = """apiVersion: v1
+kind: ConfigMap
+metadata: {name: cfg}
+data: {a: b}
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata: {name: ok}
+spec:
+  template:
+    spec:
+      containers:
+      - name: app
+        resources: {requests: {cpu: 1}, limits: {cpu: 1}}
+---
+apiVersion: apps/v1
+kind: Deployment
+metadata: {name: bad}
+spec:
+  template:
+    spec:
+      containers:
+      - name: app
+        image: nginx
+"""
+ADD = {"op": "add", "path": "/spec/template/spec/containers/0/resources", "value": {}}
+
+
+def test_marks_match_across_backends_and_prefilter():
+    full = parse_manifest(TWO_DEPLOYMENTS)
+    filtered = parse_manifest(TWO_DEPLOYMENTS, kinds=RELEVANT_KINDS)
+    assert filtered.skipped_bytes > 0
+    assert filtered.marks[0] is None
+    assert filtered.marks[1:] == full.marks[1:]
+    prev = loader.backend()
+    try:
+        for name in loader.available_backends():
+            loader.set_backend(name)
+            assert parse_manifest(TWO_DEPLOYMENTS).marks == full.marks
+    finally:
+        loader.set_backend(prev)
+
+
+def test_violation_carries_doc_index_and_line():
+    (v,) = run_inspections(parse_manifest(TWO_DEPLOYMENTS, kinds=RELEVANT_KINDS))
+    assert v["resource"] == "Deployment/app"
+    assert v["doc_index"] == 2
+    # resources is missing: the nearest existing node is the container item
+    assert v["line"] == 23
+    assert TWO_DEPLOYMENTS.splitlines()[v["line"] - 1].strip() == "- name: app"
+
+
+def test_dry_run_routes_by_doc_index():
+    m = parse_manifest(TWO_DEPLOYMENTS)
+    assert dry_run_apply(m, [dict(ADD, doc_index=2)]) == (True, "")
+    ok, reason = dry_run_apply(m, [dict(ADD, doc_index=1)])
+    assert not ok and "overwrite" in reason
+    assert not dry_run_apply(m, [dict(ADD, doc_index=7)])[0]
+
+
+def test_report_and_validate_show_file_line(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({"llm": "stub"}))
+    f = tmp_path / "apps.yml"
+    f.write_text(TWO_DEPLOYMENTS)
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+    result = runner.invoke(app, ["fix", str(f)])
+    assert result.exit_code == 0, result.stdout
+    assert f"**File:** {f}:23" in Path("report.md").read_text(encoding="utf-8")
+    for op in json.loads(Path("patch.json").read_text(encoding="utf-8")):
+        assert "doc_index" not in op and "line" not in op
+    result = runner.invoke(app, ["validate", str(f)])
+    assert f"- {f}:23 SC002" in result.stdout
+
+
+def test_alias_expansion_is_indexed_once():
+    # each level aliases the previous one 9 times: 9**6 expanded paths
+    lines = ["a0: &a0 {x: 1}"]
+    for i in range(1, 7):
+        lines.append(f"a{i}: &a{i} [" + ", ".join([f"*a{i - 1}"] * 9) + "]")
+    text = "kind: ConfigMap\ndata:\n" + "\n".join("  " + ln for ln in lines) + "\n"
+    t0 = time.perf_counter()
+    m = parse_manifest(text)
+    assert time.perf_counter() - t0 < 1.0
+    index = m.marks[0]
+    assert len(index) < 100
+    assert m.locate(0, "/data/a0/x") == (3, 12)  # at the anchor
+    assert m.locate(0, "/data/a2/4") == (4, 7)  # an alias item has its anchor's mark
+    assert m.locate(0, "/data/a2/4/0/x") == (4, 7)  # inside an alias: nearest indexed ancestor
@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.manifest import loader
+from src.manifest.stream import iter_documents
+
+HELM = """---
+# Source: web/templates/configmap.yaml
+apiVersion: v1
+kind: ConfigMap
+metadata: {name: cfg}
+data: {a: b}
+---
+# Source: web/templates/pvc.yaml
+apiVersion: v1
+kind: PersistentVolumeClaim
+metadata: {name: data}
+spec: {storageClassName: local-path}
+---
+# Source: web/templates/deployment.yaml
+apiVersion: apps/v1
+kind: Deployment
+metadata: {name: web}
+spec:
+  template:
+    spec:
+      containers:
+      - name: app
+        image: nginx
+"""
+
+
+def test_iter_documents_matches_loader():
+    for text in (HELM, "a: 1\n...\n---\nb: 2\n", "# head\n---\na: 1\n", "%YAML 1.1\n---\na: 1\n---\nb: 2\n", "a: 1\n---\n"):
+        docs = [d for sd in iter_documents(text.splitlines(True)) for d in loader.load_all(sd.text)]
+        assert docs == loader.load_all(text), text
+
+
+def test_iter_documents_is_lazy():
+    pulled = []
+
+    def lines():
+        for ln in HELM.splitlines(True):
+            pulled.append(ln)
+            yield ln
+
+    first = next(iter_documents(lines()))
+    assert first.source == "web/templates/configmap.yaml"
+    assert len(pulled) < len(HELM.splitlines())
+
+
+def test_fix_stdin_tags_documents_and_groups_patches(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(app, ["fix", "-"], input=HELM)
+    assert result.exit_code == 0, result.stdout
+    assert "Read 3 documents from stdin" in result.stdout
+    report = Path("report.md").read_text(encoding="utf-8")
+    assert "**File:** <stdin>:12\n- SC001 PersistentVolumeClaim/data" in report
+    assert "  Template: web/templates/deployment.yaml" in report
+    envelopes = json.loads(Path("patch.json").read_text(encoding="utf-8"))
+    assert [e["file"] for e in envelopes] == ["web/templates/pvc.yaml", "web/templates/deployment.yaml"]
+    assert [op["path"] for op in envelopes[0]["ops"]] == ["/spec/storageClassName"]
+    assert envelopes[1]["ops"][0]["path"] == "/spec/template/spec/containers/0/resources"
+    # stream positions are not document indexes in the template files
+    assert not any(k in op for e in envelopes for op in e["ops"] for k in ("doc_index", "line"))
+
+
+def test_validate_stdin():
+    result = CliRunner().invoke(app, ["validate", "-"], input=HELM)
+    assert result.exit_code == 0, result.stdout
+    assert "- <stdin>:12 (web/templates/pvc.yaml) SC001" in result.stdout
+    assert "- <stdin>:22 (web/templates/deployment.yaml) SC002" in result.stdout
+    assert "No violations." in CliRunner().invoke(app, ["validate", "-"], input="kind: ConfigMap\n").stdout
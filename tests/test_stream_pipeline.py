@@ -0,0 +1,70 @@
+import io
+import json
+import shutil
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.report.stream import JsonArrayStream, LineStream
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _KeepOpen(io.StringIO):
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("items", [[], [{"op": "add", "path": "/a", "value": {"x": [1, "two\nlines"]}}, 3, "s"]])
+def test_json_array_stream_matches_json_dumps(items):
+    buf = _KeepOpen()
+    w = JsonArrayStream(buf)
+    for it in items:
+        w.write(it)
+    w.close()
+    assert buf.getvalue() == json.dumps(items, indent=2)
+
+
+def test_line_stream_matches_join():
+    buf = _KeepOpen()
+    w = LineStream(buf)
+    w.write_lines(["a", ""])
+    w.write_lines(["b"])
+    assert buf.getvalue() == "\n".join(["a", "", "b"])
+
+
+def _run(tmp_path, monkeypatch, tree, name, *extra):
+    work = tmp_path / name
+    work.mkdir()
+    (work / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(work)
+    result = CliRunner().invoke(
+        app, ["fix-tree", str(tree), "--no-cache", *extra])
+    assert result.exit_code == 0, result.stdout
+    return {f: (work / f).read_bytes() for f in ("report.md", "patch.json", "resources.md")}
+
+
+def test_stream_mode_matches_batch_mode(tmp_path, monkeypatch):
+    tree = tmp_path / "manifests"
+    shutil.copytree(ROOT / "examples", tree / "examples")
+    shutil.copytree(ROOT / "tests" / "fixtures", tree / "fixtures")
+    batch = _run(tmp_path, monkeypatch, tree, "batch")
+    streamed = _run(tmp_path, monkeypatch, tree, "stream", "--stream")
+    pooled = _run(tmp_path, monkeypatch, tree,
+                  "stream_jobs", "--stream", "--jobs", "2")
+    assert streamed == batch
+    assert pooled == batch
+    ops = json.loads(batch["patch.json"])
+    # SC001 ops come first even though SC002 files sort earlier
+    assert ops[0]["path"] == "/spec/storageClassName"
+
+
+def test_stream_mode_without_violations(tmp_path, monkeypatch):
+    tree = tmp_path / "clean"
+    tree.mkdir()
+    (tree / "svc.yml").write_text((ROOT / "examples/enemy/svc.yml").read_text())
+    batch = _run(tmp_path, monkeypatch, tree, "batch")
+    streamed = _run(tmp_path, monkeypatch, tree, "stream", "--stream")
+    assert streamed == batch
+    assert batch["patch.json"] == b"[]"
@@ -0,0 +1,97 @@
+import json
+
+from src.llm import augment as aug
+
+
+def _ok(i):
+    return {"type": "patch_suggestion", "ops": [{"op": "add", "path": f"/spec/x{i}", "value": i}]}
+
+
+class _Client:
+    """Batch prompts get `answer(items)`; single prompts get a valid suggestion."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+        self.batch_calls = []  # (timeout, answer accepted for caching)
+
+    def generate(self, prompt, *, timeout=None, max_output=None, accept=None):
+        self.prompts.append(prompt)
+        if "Violations: " in prompt:
+            items = json.loads(prompt.split("Violations: ", 1)[1].split("\n", 1)[0])
+            out = self.answer(items)
+            self.batch_calls.append((timeout, accept(out)))
+            return out
+        v = json.loads(prompt.split("Violation: ", 1)[1].split("\n", 1)[0])
+        return json.dumps(_ok(int(v["path"][1:])))
+
+
+def _setup(monkeypatch, tmp_path, client, **cfg):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(aug, "get_config", lambda: {
+        "llm": {"enabled": True, "provider": "ollama"}, "llm_batch_size": 4, **cfg})
+    monkeypatch.setattr(aug, "build_client", lambda c: client)
+
+
+def _violations(n):
+    return [{"id": "SC003", "rule_id": "SC003", "path": f"/{i}", "resource": f"r{i}"} for i in range(n)]
+
+
+def test_batches_and_retries_only_failed_items(tmp_path, monkeypatch):
+    def answer(items):
+        out = []
+        for it in items:
+            i = int(it["path"][1:])
+            if i == 1:
+                out.append({"index": it["index"], "type": "patch_suggestion", "ops": [{"op": "remove"}]})
+            elif i == 2:
+                continue  # missing from the array
+            else:
+                out.append({"index": it["index"], **_ok(i)})
+        return json.dumps(out[::-1])  # order must not matter
+
+    client = _Client(answer)
+    _setup(monkeypatch, tmp_path, client)
+    out = aug.generate_resource_suggestions(_violations(10))
+    assert [r["ops"] for r in out] == [_ok(i)["ops"] for i in range(10)]
+    batch = [p for p in client.prompts if "Violations: " in p]
+    single = [json.loads(p.split("Violation: ", 1)[1].split("\n", 1)[0])["path"]
+              for p in client.prompts if "Violation: " in p]
+    assert len(batch) == 3  # 4 + 4 + 2
+    assert single == ["/1", "/2"]  # only the invalid and the missing item
+    with open("logs/llm.jsonl", encoding="utf-8") as f:
+        events = [e for e in map(json.loads, f) if e.get("event") == "suggest.batch"]
+    assert [(e["size"], e["valid"], e["retried"]) for e in events] == [(4, 2, 2), (4, 4, 0), (2, 2, 0)]
+    # only complete, well-formed answers may be cached
+    assert [ok for _, ok in client.batch_calls] == [False, True, True]
+
+
+def test_unparsable_batch_retries_every_item(tmp_path, monkeypatch):
+    client = _Client(lambda items: "Sure! Here are your patches")
+    _setup(monkeypatch, tmp_path, client)
+    out = aug.generate_resource_suggestions(_violations(3))
+    assert [r["ops"] for r in out] == [_ok(i)["ops"] for i in range(3)]
+    assert len(client.prompts) == 4
+    assert client.batch_calls == [(24, False)]  # 8 s per violation
+
+
+def test_batch_deadline_is_capped(tmp_path, monkeypatch):
+    client = _Client(lambda items: "[]")
+    _setup(monkeypatch, tmp_path, client, llm_batch_size=16)
+    aug.generate_resource_suggestions(_violations(16))
+    assert client.batch_calls[0][0] == aug.MAX_BATCH_TIMEOUT
+
+
+def test_packing_respects_context_budget(tmp_path, monkeypatch):
+    vs = _violations(6)
+    one = len(json.dumps({k: v for k, v in vs[0].items() if k in aug._SUGGEST_FIELDS}))
+    assert aug._pack_batches(vs, 4, max_chars=one * 2) == [[0, 1], [2, 3], [4, 5]]
+    assert aug._pack_batches(vs, 4, max_chars=10**6) == [[0, 1, 2, 3], [4, 5]]
+    assert aug._pack_batches(vs, 4, max_chars=1) == [[i] for i in range(6)]  # oversized items go alone
+
+
+def test_batch_size_one_keeps_per_violation_prompts(tmp_path, monkeypatch):
+    client = _Client(lambda items: "[]")
+    _setup(monkeypatch, tmp_path, client, llm_batch_size=1)
+    aug.generate_resource_suggestions(_violations(3))
+    assert all("Violation: " in p for p in client.prompts) and len(client.prompts) == 3
@@ -4,6 +4,7 @@ from src.cli.main import app
 
 
 def test_suggest_generates_valid_sc003(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
     # violations including an SC003
     violations = [
         {
@@ -4,6 +4,7 @@ from src.cli.main import app
 
 
 def test_merge_suggestions_subset(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
     suggestions = [
         {"index": 0, "rule_id": "SC003", "file": "ing.yml", "resource": {"kind": "Ingress", "name": "web"},
             "ops": [{"op": "add", "path": "/spec/ingressClassName", "value": "web"}], "valid": True},
@@ -24,7 +25,8 @@ def test_merge_suggestions_subset(monkeypatch, tmp_path):
     assert env["ops"] and env["ops"][0]["path"] == "/spec/ingressClassName"
 
 
-def test_merge_suggestions_invalid_requested(tmp_path):
+def test_merge_suggestions_invalid_requested(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     # index 1 is invalid (valid=false) and index 2 does not exist
     suggestions = [
         {"index": 0, "rule_id": "SC003", "file": "ing.yml", "resource": {"kind": "Ingress", "name": "web"},
@@ -49,7 +51,8 @@ def test_merge_suggestions_invalid_requested(tmp_path):
         patch) == 1 and patch[0]["ops"] and patch[0]["ops"][0]["path"] == "/spec/ingressClassName"
 
 
-def test_merge_conflicts_verbose(tmp_path):
+def test_merge_conflicts_verbose(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     # existing patch has an op; suggestion introduces conflicting op (same path different value)
     existing_patch = [
         {"file": "ing.yml", "resource": {"kind": "Ingress", "name": "web"}, "ops": [
@@ -130,8 +133,9 @@ def test_merge_conflicts_verbose(tmp_path):
         assert "/spec/tls" in paths
 
 
-def test_merge_suggestions_auto_approve_notice(tmp_path):
+def test_merge_suggestions_auto_approve_notice(tmp_path, monkeypatch):
     """Verify that running merge-suggestions without --approve shows an auto-approval notice."""
+    monkeypatch.chdir(tmp_path)
     suggestions = {
         "schema_version": 1,
         "generated_at": "t",
@@ -151,3 +155,40 @@ def test_merge_suggestions_auto_approve_notice(tmp_path):
         app, ["merge-suggestions", str(sfile), "--patch", str(patchfile)])
     assert res.exit_code == 0, res.output
     assert "auto-approving all valid suggestions" in res.output
+
+
+def test_merge_index_matches_linear_policy_and_buffers_logs(tmp_path, monkeypatch):
+    import builtins
+    from src.patch.suggestions import merge_suggestions_into_patch
+    from tests.bench_merge import _legacy_merge
+    import random
+    monkeypatch.chdir(tmp_path)
+
+    def sug(file, path, value, op="add"):
+        return {"file": file, "resource": {"kind": "Deployment", "name": "web"},
+                "ops": [{"op": op, "path": path, "value": value}]}
+    existing = [{"file": "a.yml", "resource": {"kind": "Deployment", "name": "web"},
+                 "ops": [{"op": "add", "path": "/spec/replicas", "value": 2}]}]
+    rng = random.Random(3)
+    sugs = [sug(rng.choice(["a.yml", "b.yml"]), rng.choice(["/spec/replicas", "/spec/x", "/spec/y"]),
+                rng.choice([1, 2, {"k": [1, 2]}, {"k": [2, 1]}, [1.0]]), rng.choice(["add", "replace"]))
+            for _ in range(300)]
+    sugs.append(sug("a.yml", "/metadata/uid", "x"))  # rejected by validate_patch_ops
+
+    opens = []
+    real_open = builtins.open
+    monkeypatch.setattr(builtins, "open", lambda f, *a, **k: opens.append(f) or real_open(f, *a, **k))
+    merged, stats = merge_suggestions_into_patch(json.loads(json.dumps(existing)), sugs)
+    monkeypatch.setattr(builtins, "open", real_open)
+    assert opens.count("logs/llm.jsonl") == 1
+
+    events = [json.loads(ln) for ln in (tmp_path / "logs" / "llm.jsonl").read_text().splitlines()]
+    kinds = [e["event"] for e in events]
+    assert kinds.count("merge.conflict") == stats["conflicts"]
+    assert sum(e["count"] for e in events if e["event"] == "merge.add") == stats["merged"]
+    assert sum(e["count"] for e in events if e["event"] == "merge.duplicate") == stats["skipped_duplicates"]
+    assert kinds[-1] == "merge.summary"
+
+    legacy, legacy_stats = _legacy_merge(json.loads(json.dumps(existing)), sugs)
+    assert merged == legacy and stats == legacy_stats
+    assert stats["skipped_duplicates"] and stats["conflicts"]
@@ -0,0 +1,95 @@
+import json
+import shutil
+from pathlib import Path
+import pytest
+from typer.testing import CliRunner
+
+from src.cli.main import app
+from src.cli.watch import Inotify, WatchSession
+from src.scan import worker
+
+ROOT = Path(__file__).resolve().parents[1]
+OUTPUTS = ("report.md", "patch.json", "resources.md")
+
+
+def _setup(tmp_path, monkeypatch):
+    tree = tmp_path / "manifests"
+    shutil.copytree(ROOT / "tests" / "fixtures", tree / "apps")
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "config.json").write_text(json.dumps({"llm": "stub"}))
+    monkeypatch.chdir(work)
+    return tree
+
+
+def _outputs():
+    return {f: Path(f).read_bytes() for f in OUTPUTS}
+
+
+def _fix_tree(tree):
+    result = CliRunner().invoke(app, ["fix-tree", str(tree), "--no-cache"])
+    assert result.exit_code == 0, result.stdout
+    return _outputs()
+
+
+def test_watch_outputs_track_fix_tree(tmp_path, monkeypatch):
+    tree = _setup(tmp_path, monkeypatch)
+    session = WatchSession(tree)
+    changed, _ = session.refresh()
+    assert len(changed) == len(list(tree.rglob("*.yml")))
+    assert _outputs() == _fix_tree(tree)
+
+    scanned = []
+    real = worker._scan
+    monkeypatch.setattr(worker, "_scan", lambda p: scanned.append(p) or real(p))
+    assert session.refresh() == ([], [])
+    assert scanned == []
+
+    pvc = tree / "apps" / "pvc_bad.yml"
+    pvc.write_text(pvc.read_text().replace("local-path", "managed-csi"))
+    (tree / "new.yaml").write_text((tree / "apps" / "deploy_bad.yml").read_text())
+    (tree / "apps" / "statefulset_bad.yml").unlink()
+    changed, removed = session.refresh()
+    assert sorted(scanned) == sorted(changed) == sorted([str(pvc), str(tree / "new.yaml")])
+    assert removed == [str(tree / "apps" / "statefulset_bad.yml")]
+    watched = _outputs()
+    assert watched == _fix_tree(tree)
+    assert b"SC001" not in watched["report.md"]
+
+
+@pytest.mark.skipif(not Inotify.available(), reason="inotify is Linux-only")
+def test_inotify_reports_touched_files(tmp_path, monkeypatch):
+    tree = _setup(tmp_path, monkeypatch)
+    session = WatchSession(tree)
+    notifier = Inotify(tree)
+    try:
+        session.refresh()
+        pvc = tree / "apps" / "pvc_bad.yml"
+        pvc.write_text(pvc.read_text().replace("local-path", "managed-csi"))
+        touched, rescan = notifier.read(2.0)
+        assert str(pvc) in touched and not rescan
+        assert session.refresh(touched=touched) == ([str(pvc)], [])
+        assert _outputs() == _fix_tree(tree)
+        (tree / "sub").mkdir()
+        assert notifier.read(2.0)[1]  # directory events ask for a full rescan
+    finally:
+        notifier.close()
+
+
+def test_every_refresh_gets_jobs(tmp_path, monkeypatch):
+    from src.cli import watch
+    tree = _setup(tmp_path, monkeypatch)
+    seen = []
+    real = WatchSession.refresh
+    monkeypatch.setattr(WatchSession, "refresh",
+                        lambda self, jobs=1, touched=None: seen.append(jobs) or real(self, jobs, touched))
+    sleeps = []
+
+    def sleep(_):
+        sleeps.append(1)
+        if len(sleeps) > 2:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(watch.time, "sleep", sleep)
+    watch.run_watch(tree, live=False, interval=0, jobs=3, poll=True, echo=lambda msg: None)
+    assert seen == [3, 3, 3]